@@ -7,6 +7,8 @@
 # 4. Database Operations
 # 5. User Input Validation
 
+from decimal import Decimal, ROUND_HALF_EVEN
+
 class InvalidPasswordError(Exception):
     """Custom exception for password validation - Used in authentication systems"""
     pass
@@ -15,20 +17,35 @@ class InsufficientFundsError(Exception):
     """Custom exception for banking operations - Used in financial systems"""
     pass
 
+def to_cents(amount):
+    """Convert a dollar amount to whole cents - Money is kept as integers to avoid float rounding errors"""
+    try:
+        text = repr(amount) if isinstance(amount, float) else str(amount)
+        dollars = Decimal(text).quantize(Decimal("0.01"), rounding=ROUND_HALF_EVEN)  # Banker's rounding
+        return int(dollars * 100)
+    except (ArithmeticError, ValueError):
+        raise ValueError(f"Invalid payment amount: {amount!r}") from None
+
 class PaymentProcessor:
     """Example: Payment Processing System"""
     def __init__(self):
-        self.balance = 1000  # Sample account balance
+        self.balance_cents = to_cents(1000)  # Sample account balance, in whole cents
+    
+    @property
+    def balance(self):
+        """Account balance in dollars"""
+        return self.balance_cents / 100
     
     def process_payment(self, amount):
         """Process payment - Used in e-commerce systems"""
         try:
-            if amount <= 0:
+            cents = to_cents(amount)
+            if cents <= 0:
                 raise ValueError("Payment amount must be positive")
-            if amount > self.balance:
+            if cents > self.balance_cents:
                 raise InsufficientFundsError("Insufficient funds in account")
             
-            self.balance -= amount
+            self.balance_cents -= cents
             return {"status": "success", "remaining_balance": self.balance}
             
         except InsufficientFundsError as e:
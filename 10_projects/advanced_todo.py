@@ -6,16 +6,53 @@
 # 3. Priority Levels
 # 4. Data Persistence (JSON)
 # 5. Task Statistics
+# 6. Compact __slots__ Tasks
+# 7. Append-only Change Log with Compaction, Lazily Parsed Tasks
+# 8. Bitmap Indexes for Filtered Views, Due-date Order and Pagination
+# 9. Live Statistics with Completion-time Metrics (O(1) to read)
+# 10. Due-date Reminders from a Background Scheduler, "Due Between" Range Queries
+# 11. Stable Task IDs: O(1) Lookup, Completion and Removal, Batched Bulk Changes
 
 import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
 from datetime import datetime, timedelta
+from itertools import islice
+from types import SimpleNamespace
+
+from state_file import dump_state, load_state
+
+NO_DUE = 2 ** 62  # Due-date sort key of tasks without a due date: after every real one
+REMOVED = -1      # Due-date key of a removed task's position (it is in no index)
+
+def due_timestamp(due_date):
+    """Epoch seconds of an ISO due date (YYYY-MM-DD, optionally HH:MM), or None if it has none or is unreadable"""
+    if not due_date:
+        return None
+    try:
+        return int(datetime.fromisoformat(due_date.strip()).timestamp())
+    except ValueError:
+        return None
 
 class Task:
     """Represents a single task with advanced features"""
+    __slots__ = ("title", "category", "priority", "completed", "created_date",
+                 "due_date", "completion_date")
+
     def __init__(self, title, category="General", priority="Medium", due_date=None):
         self.title = title
-        self.category = category
-        self.priority = priority
+        self.category = sys.intern(category)  # A handful of values shared by every task
+        self.priority = sys.intern(priority)
         self.completed = False
         self.created_date = datetime.now().strftime("%Y-%m-%d %H:%M")
         self.due_date = due_date
@@ -42,78 +79,716 @@ class Task:
         task.completion_date = data["completion_date"]
         return task
 
+class TaskIndex:
+    """Secondary indexes by task position: a bitmap per completion state, category and priority,
+    and the positions sorted by due date. A removed task's position is left as a gap, so positions never shift"""
+    FIELDS = ("completed", "category", "priority")
+
+    def __init__(self):
+        self.bitmaps = {field: {} for field in self.FIELDS}  # Field -> value -> bytearray (bit i: task i)
+        self.due = array("q")       # Due-date key of each task
+        self.by_due = array("q")    # Task positions ordered by due-date key, then position
+        self.due_keys = array("q")  # The keys in that order, for bisect
+        self.bulk = False           # While set, added and removed tasks skip the due-date order until sort_due()
+
+    def set(self, index, task):
+        """Index the task added or changed at index (tasks are added at the next index).
+
+        Returns None for a new task, else the previous value of each field that changed.
+        """
+        known = index < len(self.due) and self.due[index] != REMOVED
+        previous = {} if known else None
+        byte, bit = index >> 3, 1 << (index & 7)
+        for field, bitmaps in self.bitmaps.items():
+            value = getattr(task, field)
+            for other, bitmap in bitmaps.items():
+                if other != value and byte < len(bitmap) and bitmap[byte] & bit:
+                    bitmap[byte] &= ~bit
+                    if previous is not None:
+                        previous[field] = other
+            bitmap = bitmaps.setdefault(value, bytearray())
+            if len(bitmap) <= byte:
+                bitmap.extend(bytes(byte + 1 - len(bitmap)))
+            bitmap[byte] |= bit
+        
+        key = due_timestamp(task.due_date)
+        key = NO_DUE if key is None else key
+        if known:
+            if self.due[index] == key:
+                return previous
+            self._unorder(index)
+            self.due[index] = key
+        else:
+            if index < len(self.due):
+                self.due[index] = key  # A removed task replayed from an already folded log
+            else:
+                self.due.append(key)
+            if self.bulk:
+                return previous
+        position = self._due_position(index, key)
+        self.by_due.insert(position, index)
+        self.due_keys.insert(position, key)
+        return previous
+
+    def _due_position(self, index, key):
+        """Where the task at index goes in the due-date order if its key is key"""
+        # Positions sharing a key (all tasks without a due date, say) are in order, so bisect those too
+        return bisect_left(self.by_due, index, bisect_left(self.due_keys, key), bisect_right(self.due_keys, key))
+
+    def _unorder(self, index):
+        """Take the task at index out of the due-date order"""
+        position = self._due_position(index, self.due[index])
+        del self.by_due[position]
+        del self.due_keys[position]
+
+    def remove(self, index, unorder=True):
+        """Drop the task at index from every index, leaving its position as a gap.
+
+        Returns the value of each field it had, or None if there was no task there.
+        """
+        if index >= len(self.due):
+            self.due.append(REMOVED)  # Read as a gap while loading
+            return None
+        if self.due[index] == REMOVED:
+            return None
+        previous = {}
+        byte, bit = index >> 3, 1 << (index & 7)
+        for field, bitmaps in self.bitmaps.items():
+            for value, bitmap in bitmaps.items():
+                if byte < len(bitmap) and bitmap[byte] & bit:
+                    bitmap[byte] &= ~bit
+                    previous[field] = value
+        if unorder and not self.bulk:
+            self._unorder(index)
+        self.due[index] = REMOVED
+        return previous
+
+    def remove_all(self, indexes):
+        """remove() for many tasks, taking them out of the due-date order in one pass; returns a list of what remove() did"""
+        if len(indexes) < 64 or self.bulk:
+            return [self.remove(index) for index in indexes]
+        removed = [self.remove(index, unorder=False) for index in indexes]
+        order = [i for i in self.by_due if self.due[i] != REMOVED]
+        self.by_due = array("q", order)
+        self.due_keys = array("q", [self.due[i] for i in order])
+        return removed
+
+    def sort_due(self):
+        """Rebuild the due-date order in one sort (after loading many tasks in bulk mode)"""
+        order = sorted((i for i in range(len(self.due)) if self.due[i] != REMOVED), key=self.due.__getitem__)
+        self.by_due = array("q", order)
+        self.due_keys = array("q", [self.due[i] for i in order])
+        self.bulk = False
+
+    def due_between(self, start, end):
+        """Positions of tasks due from start up to (not including) end, both epoch seconds, in due order"""
+        return self.by_due[bisect_left(self.due_keys, start):bisect_left(self.due_keys, end)]
+
+    def is_set(self, field, value, index):
+        """Whether the task at index has value for field"""
+        bitmap = self.bitmaps[field].get(value)
+        return bool(bitmap) and (index >> 3) < len(bitmap) and bool(bitmap[index >> 3] >> (index & 7) & 1)
+
+    def matching(self, count, **filters):
+        """Tasks (of the first count) matching every given field value: a bitmap as bytes, and how many"""
+        match = 0
+        for bitmap in self.bitmaps["completed"].values():
+            match |= int.from_bytes(bitmap, "little")  # Every task is either completed or not; gaps are neither
+        match &= (1 << count) - 1
+        for field, value in filters.items():
+            if value is not None:
+                bitmap = self.bitmaps[field].get(value)
+                match &= int.from_bytes(bitmap, "little") if bitmap else 0
+        return match.to_bytes((count + 7) // 8, "little"), match.bit_count()
+
+    def select(self, flags, by_due=False, start=0, stop=None):
+        """Positions set in flags, in position or due-date order, from the start-th up to the stop-th"""
+        if by_due:
+            found = (i for i in self.by_due if flags[i >> 3] >> (i & 7) & 1)
+        else:
+            # Runs of zero bytes are skipped by the regex engine, not by a Python loop
+            found = (match.start() * 8 + bit for match in re.finditer(rb"[^\x00]", flags)
+                     for bit in range(8) if match.group()[0] >> bit & 1)
+        return list(islice(found, start, stop))
+
+    def to_state(self):
+        """Indexes as plain data (bitmaps as [field, value, bytes], since values include True and False)"""
+        return {"bitmaps": [[field, value, bytes(bitmap)] for field, bitmaps in self.bitmaps.items()
+                            for value, bitmap in bitmaps.items()],
+                "due": self.due.tobytes(), "by_due": self.by_due.tobytes(), "due_keys": self.due_keys.tobytes()}
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild indexes from to_state() output"""
+        index = cls()
+        for field, value, bitmap in state["bitmaps"]:
+            index.bitmaps[field][value] = bytearray(bitmap)
+        for name in ("due", "by_due", "due_keys"):
+            getattr(index, name).frombytes(state[name])
+        return index
+
+class TaskStats:
+    """Task counts and completion-time metrics kept up to date per change, so reading them is O(1)"""
+    RECENT = 100  # Completions in the rolling average
+    DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        self.categories = {}
+        self.priorities = {}
+        # Completion times in hours (created_date to completion_date): Welford's running mean and variance
+        self.timed = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.fastest = None
+        self.slowest = None
+        self.recent = deque(maxlen=self.RECENT)
+        self.recent_sum = 0.0
+
+    def update(self, previous, task):
+        """Count a task that was added (previous is None) or changed (previous: old values from TaskIndex.set)"""
+        if previous is None:
+            previous = {"completed": False}
+            self.total += 1
+            self.categories[task.category] = self.categories.get(task.category, 0) + 1
+            self.priorities[task.priority] = self.priorities.get(task.priority, 0) + 1
+        for field, counts in (("category", self.categories), ("priority", self.priorities)):
+            if field in previous:
+                counts[previous[field]] -= 1
+                new = getattr(task, field)
+                counts[new] = counts.get(new, 0) + 1
+        if previous.get("completed", task.completed) != task.completed:
+            self.completed += 1 if task.completed else -1
+            if task.completed:
+                self._time_completion(task)
+
+    def remove(self, previous):
+        """Stop counting a removed task (previous: its values from TaskIndex.remove; None if there was none).
+        Its completion time, if any, stays in the completion-time metrics"""
+        if previous is None:
+            return
+        self.total -= 1
+        self.categories[previous["category"]] -= 1
+        self.priorities[previous["priority"]] -= 1
+        if previous["completed"]:
+            self.completed -= 1
+
+    def _time_completion(self, task):
+        try:
+            hours = (datetime.strptime(task.completion_date, self.DATE_FORMAT)
+                     - datetime.strptime(task.created_date, self.DATE_FORMAT)).total_seconds() / 3600
+        except (TypeError, ValueError):
+            return  # No usable dates: counted as completed, but not timed
+        self.timed += 1
+        delta = hours - self.mean
+        self.mean += delta / self.timed
+        self.m2 += delta * (hours - self.mean)
+        self.fastest = hours if self.fastest is None else min(self.fastest, hours)
+        self.slowest = hours if self.slowest is None else max(self.slowest, hours)
+        if len(self.recent) == self.RECENT:
+            self.recent_sum -= self.recent[0]
+        self.recent.append(hours)
+        self.recent_sum += hours
+
+    def stddev(self):
+        """Standard deviation of the completion times, in hours"""
+        return (self.m2 / self.timed) ** 0.5 if self.timed else 0.0
+
+    def to_state(self):
+        """Counters as plain data"""
+        state = {name: getattr(self, name) for name in ("total", "completed", "categories", "priorities",
+                                                        "timed", "mean", "m2", "fastest", "slowest", "recent_sum")}
+        state["recent"] = list(self.recent)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild counters from to_state() output"""
+        stats = cls()
+        for name, value in state.items():
+            setattr(stats, name, value)
+        stats.recent = deque(state["recent"], maxlen=cls.RECENT)
+        return stats
+
+class TaskFile:
+    """Tasks stored as a JSON Lines snapshot plus an append-only change log.
+
+    Loading reads only the line offsets and TaskIndex of the snapshot (saved beside it in an .idx
+    file); a Task is parsed when it is read. Tasks added or changed since the snapshot are kept in
+    memory and in the log until compaction folds them into a new snapshot.
+
+    A task's index is its stable ID: removing a task leaves a null line in its place, so the
+    others never move and no index is ever reused. Log records are checksummed like the library
+    journal's, so a torn or corrupt tail is dropped on load.
+    """
+    INDEX_MAGIC = b"TODOIDX1"  # state_file format
+
+    def __init__(self, filename, compact_every=10_000, group_commit=1):
+        self.filename = filename
+        self.log_path = filename + ".log"
+        self.index_path = filename + ".idx"
+        self.compact_every = compact_every  # Log records before the snapshot is rewritten
+        self.group_commit = group_commit    # fsync the log once every N records
+        self.unsynced = 0
+        self.offsets = array("q")  # Start of each snapshot line, then the snapshot's size
+        self.index = TaskIndex()
+        self.stats = TaskStats()
+        self.changed = {}          # Index -> Task added or changed since the snapshot (None: removed)
+        self.count = 0
+        self.logged = 0            # Records in the log
+        self.snapshot = None       # Snapshot opened for reading single lines
+        self.log = None
+        # Guards the files and indexes, and is notified on every change (ReminderScheduler waits on it)
+        self.lock = threading.Condition()
+
+    def load(self):
+        """Open the snapshot and replay the log after it"""
+        self.close()
+        self.offsets, self.index, self.stats, self.changed, self.logged = array("q"), TaskIndex(), TaskStats(), {}, 0
+        try:
+            self.snapshot = open(self.filename, "rb")
+        except FileNotFoundError:
+            self.snapshot = None
+        if self.snapshot and self.snapshot.read(64).lstrip()[:1] == b"[":
+            # Written by the old save_tasks as one JSON array: convert once
+            self.snapshot.seek(0)
+            tasks = [Task.from_dict(data) for data in json.load(self.snapshot)]
+            self.changed = dict(enumerate(tasks))
+            self.count = len(tasks)
+            self.index.bulk = True
+            for index, task in self.changed.items():
+                self._index(index, task)
+            self.index.sort_due()
+            self.snapshot.close()
+            self.snapshot = None
+            self.compact()
+            return
+        if self.snapshot:
+            self._read_index()
+        self.count = max(0, len(self.offsets) - 1)
+        
+        valid = 0
+        try:
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    crc, _, payload = line.rstrip(b"\n").partition(b" ")
+                    if not line.endswith(b"\n") or crc != b"%08x" % zlib.crc32(payload):
+                        break  # Torn or corrupt write from a crash: nothing after it counts
+                    record = json.loads(payload)
+                    # Records name their index, so replaying a log already folded into the snapshot is harmless
+                    self._apply({item["index"]: self._task(item["task"]) for item in record.get("batch", [record])})
+                    valid += len(line)
+                    self.logged += 1
+        except FileNotFoundError:
+            pass
+        self.log = open(self.log_path, "ab")
+        self.log.truncate(valid)
+
+    def _read_index(self):
+        """Line offsets, TaskIndex and TaskStats from the .idx file, or one pass over the snapshot if it does not match"""
+        try:
+            with open(self.index_path, "rb") as f:
+                state = load_state(f.read(), self.INDEX_MAGIC)
+            if state["snapshot"] == self._fingerprint():
+                self.offsets.frombytes(state["offsets"])
+                if self.offsets[0] == 0 and self.offsets[-1] == state["snapshot"][0]:
+                    self.index = TaskIndex.from_state(state["index"])
+                    self.stats = TaskStats.from_state(state["stats"])
+                    return
+        except (OSError, KeyError, TypeError, ValueError, IndexError):
+            pass
+        self.offsets, self.index, self.stats = array("q", [0]), TaskIndex(), TaskStats()
+        self.snapshot.seek(0)
+        self.index.bulk = True
+        for index, line in enumerate(self.snapshot):
+            self.offsets.append(self.offsets[-1] + len(line))
+            self._index(index, self._task(json.loads(line)))
+        self.index.sort_due()
+        self._write_index()
+
+    def _fingerprint(self, edge=4096):
+        """Size, modification time and a CRC32 of the first and last edge bytes of the snapshot:
+        the .idx is only used for the snapshot it was written for"""
+        with open(self.filename, "rb") as f:
+            stat = os.fstat(f.fileno())
+            crc = zlib.crc32(f.read(edge))
+            f.seek(max(0, stat.st_size - edge))
+            return [stat.st_size, stat.st_mtime_ns, zlib.crc32(f.read(edge), crc)]
+
+    def _write_index(self):
+        """Save the snapshot's line offsets, TaskIndex and TaskStats beside it (checksummed, no pickle)"""
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dump_state({"snapshot": self._fingerprint(), "offsets": self.offsets.tobytes(),
+                                "index": self.index.to_state(), "stats": self.stats.to_state()}, self.INDEX_MAGIC))
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def _task(data):
+        """A Task from its stored dict, or None for a removed task's null"""
+        return None if data is None else Task.from_dict(data)
+
+    def __len__(self):
+        """Indexes handed out so far (removed tasks included)"""
+        return self.count
+
+    def __getitem__(self, index):
+        """The task at index (parsed from the snapshot unless it changed since), or None if it was removed"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("task index out of range")
+        with self.lock:
+            if index in self.changed:
+                return self.changed[index]
+            start = self.offsets[index]
+            self.snapshot.seek(start)
+            return self._task(json.loads(self.snapshot.read(self.offsets[index + 1] - start)))
+
+    def items(self):
+        """(index, task) for every task not removed, in order, reading the snapshot front to back"""
+        snapshot = open(self.filename, "rb") if len(self.offsets) > 1 else None
+        try:
+            for index in range(self.count):
+                line = snapshot.readline() if index < len(self.offsets) - 1 else None
+                task = self.changed[index] if index in self.changed else self._task(json.loads(line))
+                if task is not None:
+                    yield index, task
+        finally:
+            if snapshot:
+                snapshot.close()
+
+    def __iter__(self):
+        """Every task not removed, in order"""
+        return (task for _, task in self.items())
+
+    def append(self, task):
+        """Add a task at the end; return its index"""
+        with self.lock:
+            index = self.count
+            self.update_many({index: task})
+            return index
+
+    def update(self, index, task):
+        """Persist a change made to the task at index"""
+        self.update_many({index: task})
+
+    def remove(self, index):
+        """Remove the task at index (the index stays taken)"""
+        self.update_many({index: None})
+
+    def update_many(self, changes):
+        """Persist changes to any number of tasks ({index: task, or None to remove it}) as one log record"""
+        if not changes:
+            return
+        with self.lock:
+            self._apply(changes)
+            self._write(changes)
+            self.lock.notify_all()
+
+    def _apply(self, changes):
+        """Bring the changed tasks, indexes and statistics up to date with changes"""
+        self.changed.update(changes)
+        for index, task in changes.items():
+            if task is not None:
+                self._index(index, task)
+        for previous in self.index.remove_all([index for index, task in changes.items() if task is None]):
+            self.stats.remove(previous)
+        self.count = max(self.count, max(changes, default=-1) + 1)
+
+    def _index(self, index, task):
+        """Bring the indexes and statistics up to date with the task at index (None: removed)"""
+        if task is None:
+            self.stats.remove(self.index.remove(index))
+        else:
+            self.stats.update(self.index.set(index, task), task)
+
+    def select(self, completed=None, category=None, priority=None, by_due=False, start=0, stop=None):
+        """Positions of the matching tasks (from the start-th to the stop-th match) and how many match in all"""
+        with self.lock:
+            flags, total = self.index.matching(self.count, completed=completed, category=category, priority=priority)
+            return self.index.select(flags, by_due, start, stop), total
+
+    def due_between(self, start, end, pending=True):
+        """Positions of tasks due from start up to (not including) end (datetimes), in due order, in O(log n + k)"""
+        with self.lock:
+            found = self.index.due_between(int(start.timestamp()), int(end.timestamp()))
+            return [i for i in found if not (pending and self.index.is_set("completed", True, i))]
+
+    def _write(self, changes):
+        """Append one record to the log (a batch if more than one task changed); fsync according to group_commit,
+        compact every compact_every records"""
+        items = [{"index": index, "task": None if task is None else task.to_dict()} for index, task in changes.items()]
+        payload = json.dumps(items[0] if len(items) == 1 else {"batch": items}, separators=(",", ":")).encode("utf-8")
+        self.log.write(b"%08x %s\n" % (zlib.crc32(payload), payload))
+        self.log.flush()
+        self.logged += 1
+        self.unsynced += 1
+        if self.unsynced >= self.group_commit:
+            self.sync()
+        if self.logged >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Write a new snapshot (unchanged lines are copied as raw bytes) and empty the log"""
+        with self.lock:
+            self._compact()
+
+    def _compact(self):
+        offsets = array("q", [0])
+        tmp_path = self.filename + ".tmp"
+        with open(tmp_path, "wb") as out:
+            old = open(self.filename, "rb") if len(self.offsets) > 1 else None
+            try:
+                for index in range(self.count):
+                    line = old.readline() if index < len(self.offsets) - 1 else None
+                    if index in self.changed:
+                        task = self.changed[index]
+                        data = None if task is None else task.to_dict()
+                        line = json.dumps(data, separators=(",", ":")).encode("utf-8") + b"\n"
+                    out.write(line)
+                    offsets.append(offsets[-1] + len(line))
+            finally:
+                if old:
+                    old.close()
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.filename)
+        # A crash from here on is harmless: the log replays onto the same indexes, the offsets are rescanned
+        self.offsets = offsets
+        self._write_index()
+        if self.snapshot:
+            self.snapshot.close()
+        self.snapshot = open(self.filename, "rb")
+        if self.log is None:
+            self.log = open(self.log_path, "ab")
+        self.log.truncate(0)
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.unsynced = 0
+        self.changed = {}
+        self.logged = 0
+
+    def sync(self):
+        """Force logged records to disk"""
+        with self.lock:
+            if self.log and self.unsynced:
+                self.log.flush()
+                os.fsync(self.log.fileno())
+                self.unsynced = 0
+
+    def close(self):
+        """Sync and close the snapshot and log files"""
+        self.sync()
+        for f in (self.snapshot, self.log):
+            if f:
+                f.close()
+        self.snapshot = self.log = None
+
+class ReminderScheduler:
+    """Calls callback(index, task) on a background thread once each pending task is lead seconds from due.
+
+    The pending reminders are the TaskIndex due-date order itself, walked by a cursor, so nothing is
+    kept per task. While idle the thread sleeps in one timed wait, until the next reminder or a change.
+    Callbacks run after the TaskFile lock is released, so they may call back into the TodoList.
+    """
+    def __init__(self, tasks, callback, lead=3600, clock=time.time):
+        self.tasks = tasks
+        self.callback = callback
+        self.lead = lead
+        self.clock = clock
+        self.fired_through = int(clock())  # Due times up to here are overdue or already reminded
+        self.seen = len(tasks)             # Tasks added later may be due where the cursor has been
+        self.thread = None
+        self.stopped = False
+
+    def start(self):
+        """Start the reminder thread"""
+        self.thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the reminder thread"""
+        with self.tasks.lock:
+            self.stopped = True
+            self.tasks.lock.notify_all()
+        if self.thread:
+            self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.tasks.lock:
+                if self.stopped:
+                    return
+                now = self.clock()
+                reminders = self._collect_due(now)
+                if not reminders:
+                    due = self.next_due()
+                    # Waiting releases the lock; any add or update wakes the thread to look again
+                    self.tasks.lock.wait(None if due is None else max(0.0, due - self.lead - now))
+                    continue
+            # Outside the lock; changes the callbacks make are picked up on the next pass
+            for i, task in reminders:
+                self.callback(i, task)
+
+    def next_due(self):
+        """Due time (epoch seconds) of the next reminder, or None"""
+        keys = self.tasks.index.due_keys
+        position = bisect_right(keys, self.fired_through)
+        return keys[position] if position < len(keys) and keys[position] != NO_DUE else None
+
+    def fire_due(self, now):
+        """Remind every pending task whose reminder time has come; return how many were reminded"""
+        with self.tasks.lock:
+            reminders = self._collect_due(now)
+        for i, task in reminders:
+            self.callback(i, task)
+        return len(reminders)
+
+    def _collect_due(self, now):
+        """(index, task) of every pending task whose reminder time has come, moving the cursor past them
+        (caller holds the lock)"""
+        tasks, index = self.tasks, self.tasks.index
+        reminders = []
+        for i in range(self.seen, len(tasks)):
+            if now < index.due[i] <= self.fired_through and not index.is_set("completed", True, i):
+                reminders.append((i, tasks[i]))
+        self.seen = len(tasks)
+        
+        due = self.next_due()
+        while due is not None and due - self.lead <= now:
+            reminders.extend((i, tasks[i]) for i in index.due_between(due, due + 1)
+                             if not index.is_set("completed", True, i))
+            self.fired_through = due
+            due = self.next_due()
+        return reminders
+
 class TodoList:
     """Advanced Todo List Manager"""
-    def __init__(self, filename="tasks.json"):
+    def __init__(self, filename="tasks.json", compact_every=10_000, group_commit=1):
         self.filename = filename
-        self.tasks = []
+        self.tasks = TaskFile(filename, compact_every, group_commit)
+        self.reminders = None
         self.load_tasks()
 
     def load_tasks(self):
-        """Load tasks from JSON file"""
-        try:
-            with open(self.filename, 'r') as file:
-                data = json.load(file)
-                self.tasks = [Task.from_dict(task_data) for task_data in data]
-        except FileNotFoundError:
-            self.tasks = []
+        """Open the task file (tasks are parsed lazily)"""
+        self.tasks.load()
 
     def save_tasks(self):
-        """Save tasks to JSON file"""
-        with open(self.filename, 'w') as file:
-            data = [task.to_dict() for task in self.tasks]
-            json.dump(data, file, indent=4)
+        """Fold the change log into a fresh snapshot"""
+        self.tasks.compact()
 
     def add_task(self, title, category="General", priority="Medium", due_date=None):
-        """Add a new task"""
+        """Add a new task; return its ID"""
         task = Task(title, category, priority, due_date)
-        self.tasks.append(task)
-        self.save_tasks()
-        print(f"Task '{title}' added successfully!")
-
-    def view_tasks(self, filter_completed=None, category=None, priority=None):
-        """View tasks with optional filters"""
-        filtered_tasks = self.tasks
-        
-        if filter_completed is not None:
-            filtered_tasks = [t for t in filtered_tasks if t.completed == filter_completed]
-        if category:
-            filtered_tasks = [t for t in filtered_tasks if t.category == category]
-        if priority:
-            filtered_tasks = [t for t in filtered_tasks if t.priority == priority]
-
-        if not filtered_tasks:
+        task_id = self.tasks.append(task) + 1
+        print(f"Task '{title}' added successfully! (ID {task_id})")
+        return task_id
+
+    def get_task(self, task_id):
+        """The task with an ID, or None if there is none (IDs are task positions + 1, and never change)"""
+        if isinstance(task_id, int) and 1 <= task_id <= len(self.tasks):
+            return self.tasks[task_id - 1]
+        return None
+
+    def view_tasks(self, filter_completed=None, category=None, priority=None, sort_by_due=False,
+                   page=None, page_size=20):
+        """View tasks with optional filters, in added or due-date order, optionally one page (1-based) at a time;
+        return how many were listed"""
+        if page is not None and (page < 1 or page_size < 1):
+            print("Page and page size must be at least 1!")
+            return 0
+        start = 0 if page is None else (page - 1) * page_size
+        stop = None if page is None else start + page_size
+        indexes, total = self.tasks.select(filter_completed, category or None, priority or None,
+                                           sort_by_due, start, stop)
+
+        if not indexes:
             print("No tasks found matching the criteria!")
-            return
+            return 0
 
         print("\nTasks:")
-        for i, task in enumerate(filtered_tasks, 1):
+        for i in indexes:
+            # Only the tasks shown are read; numbers are task IDs, as complete_task and remove_task take them
+            task = self.tasks[i]
             status = "✓" if task.completed else " "
             due = f", Due: {task.due_date}" if task.due_date else ""
-            print(f"{i}. [{status}] {task.title} ({task.category} - {task.priority}){due}")
+            print(f"{i + 1}. [{status}] {task.title} ({task.category} - {task.priority}){due}")
+        if page is not None:
+            print(f"Page {page} of {max(1, -(-total // page_size))} ({total} tasks)")
+        return len(indexes)
+
+    def view_due(self, start, end):
+        """View the pending tasks due from start up to end (datetimes)"""
+        indexes = self.tasks.due_between(start, end)
+        if not indexes:
+            print("No tasks due in that period!")
+            return
+        print(f"\nTasks due {start:%Y-%m-%d %H:%M} to {end:%Y-%m-%d %H:%M}:")
+        for i in indexes:
+            task = self.tasks[i]
+            print(f"{i + 1}. {task.title} ({task.category} - {task.priority}), Due: {task.due_date}")
+
+    def start_reminders(self, callback=None, lead=3600):
+        """Remind about each pending task lead seconds before it is due (prints unless given a callback)"""
+        self.reminders = ReminderScheduler(self.tasks, callback or self.print_reminder, lead)
+        self.reminders.start()
 
-    def complete_task(self, index):
+    @staticmethod
+    def print_reminder(index, task):
+        """Print one reminder"""
+        print(f"\nReminder: task {index + 1} '{task.title}' is due {task.due_date}")
+
+    def complete_task(self, task_id):
         """Mark a task as completed"""
-        if 1 <= index <= len(self.tasks):
-            task = self.tasks[index-1]
+        task = self.get_task(task_id)
+        if task is not None:
             task.completed = True
             task.completion_date = datetime.now().strftime("%Y-%m-%d %H:%M")
-            self.save_tasks()
+            self.tasks.update(task_id - 1, task)
             print(f"Task '{task.title}' marked as completed!")
         else:
-            print("Invalid task number!")
+            print("Invalid task ID!")
+
+    def complete_tasks(self, task_ids):
+        """Mark many tasks as completed, saved as one batch; return how many were not completed already"""
+        completion_date = datetime.now().strftime("%Y-%m-%d %H:%M")
+        changes = {}
+        for task_id in task_ids:
+            task = self.get_task(task_id)
+            if task is not None and not task.completed:
+                task.completed = True
+                task.completion_date = completion_date
+                changes[task_id - 1] = task
+        self.tasks.update_many(changes)
+        print(f"{len(changes)} tasks marked as completed!")
+        return len(changes)
+
+    def remove_task(self, task_id):
+        """Remove a task (no other task's ID changes)"""
+        task = self.get_task(task_id)
+        if task is not None:
+            self.tasks.remove(task_id - 1)
+            print(f"Task '{task.title}' removed successfully!")
+        else:
+            print("Invalid task ID!")
+
+    def remove_tasks(self, task_ids):
+        """Remove many tasks, saved as one batch; return how many there were"""
+        changes = {task_id - 1: None for task_id in task_ids if self.get_task(task_id) is not None}
+        self.tasks.update_many(changes)
+        print(f"{len(changes)} tasks removed!")
+        return len(changes)
 
     def get_statistics(self):
-        """Get task statistics"""
-        total_tasks = len(self.tasks)
-        completed_tasks = len([t for t in self.tasks if t.completed])
-        categories = {}
-        priorities = {"High": 0, "Medium": 0, "Low": 0}
-        
-        for task in self.tasks:
-            categories[task.category] = categories.get(task.category, 0) + 1
-            if task.priority in priorities:
-                priorities[task.priority] += 1
+        """Get task statistics (kept up to date by every change, so no task is read)"""
+        stats = self.tasks.stats
+        total_tasks = stats.total
+        completed_tasks = stats.completed
+        categories = {category: count for category, count in stats.categories.items() if count}
+        priorities = {priority: stats.priorities.get(priority, 0) for priority in ("High", "Medium", "Low")}
 
         print("\nTask Statistics:")
         print(f"Total Tasks: {total_tasks}")
@@ -125,27 +800,358 @@ class TodoList:
         print("\nTasks by Priority:")
         for priority, count in priorities.items():
             print(f"- {priority}: {count}")
+        if stats.timed:
+            print("\nCompletion Time:")
+            print(f"- Average: {stats.mean:.1f} hours (std dev {stats.stddev():.1f})")
+            print(f"- Fastest: {stats.fastest:.1f} hours, Slowest: {stats.slowest:.1f} hours")
+            print(f"- Last {len(stats.recent)} completions: {stats.recent_sum / len(stats.recent):.1f} hours on average")
+
+def benchmark_memory(num_tasks=100000):
+    """Bytes per Task: the old __dict__ layout against the __slots__ record"""
+    categories = ["General", "Work", "Personal", "Shopping"]
+    priorities = ["High", "Medium", "Low"]
+
+    def plain_task(i):
+        # Attribute layout of Task before __slots__ (fresh strings, as json.load makes them)
+        return SimpleNamespace(title=f"Task {i}", category="".join(categories[i % 4]),
+                               priority="".join(priorities[i % 3]), completed=False,
+                               created_date="2024-01-01 09:00", due_date=None, completion_date=None)
+
+    def slots_task(i):
+        task = Task(f"Task {i}", "".join(categories[i % 4]), "".join(priorities[i % 3]))
+        task.created_date = "2024-01-01 09:00"
+        return task
+
+    def measure(factory):
+        tracemalloc.start()
+        tasks = [factory(i) for i in range(num_tasks)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del tasks
+        return size / num_tasks
+
+    print(f"\nMemory benchmark ({num_tasks} tasks, bytes per task)")
+    print(f"Task (__dict__):  {measure(plain_task):6.0f}")
+    print(f"Task (__slots__): {measure(slots_task):6.0f}")
+
+def benchmark_persistence(num_tasks=500_000, num_changes=1000):
+    """Startup time, memory and per-change cost: rewriting tasks.json against the append log"""
+    categories = ["General", "Work", "Personal", "Shopping"]
+    priorities = ["High", "Medium", "Low"]
+    print(f"\nPersistence benchmark ({num_tasks} tasks)")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.json")
+        with open(path, "w") as f:
+            json.dump([Task(f"Task {i}", categories[i % 4], priorities[i % 3]).to_dict()
+                       for i in range(num_tasks)], f, indent=4)
+        
+        def measure(load):
+            # Time without tracemalloc (it slows allocation down), then memory with it
+            start = time.perf_counter()
+            loaded = load()
+            elapsed = time.perf_counter() - start
+            del loaded
+            tracemalloc.start()
+            loaded = load()
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return loaded, elapsed, memory
+        
+        def load_json():
+            # The old layout: parse everything at startup, rewrite everything on each change
+            with open(path) as f:
+                return [Task.from_dict(data) for data in json.load(f)]
+        
+        tasks, old_load, old_memory = measure(load_json)
+        start = time.perf_counter()
+        tasks.append(Task("One more"))
+        with open(path + ".old", "w") as f:
+            json.dump([task.to_dict() for task in tasks], f, indent=4)
+        old_change = time.perf_counter() - start
+        del tasks
+        
+        TodoList(path).tasks.close()  # Converts the file once
+        todo, new_load, new_memory = measure(lambda: TodoList(path))
+        start = time.perf_counter()
+        for i in range(num_changes):
+            todo.tasks.append(Task(f"New {i}"))
+            task = todo.tasks[i * 97]
+            task.completed = True
+            todo.tasks.update(i * 97, task)
+        new_change = (time.perf_counter() - start) / (2 * num_changes)
+        start = time.perf_counter()
+        todo.save_tasks()
+        compaction = time.perf_counter() - start
+        todo.tasks.close()
+        
+    print(f"tasks.json rewrite: startup {old_load:6.2f}s  {old_memory / 2**20:7.1f} MB  "
+          f"{old_change * 1000:9.3f} ms per change")
+    print(f"Append log:         startup {new_load:6.2f}s  {new_memory / 2**20:7.1f} MB  "
+          f"{new_change * 1000:9.3f} ms per change  (compaction {compaction:.2f}s)")
+
+def benchmark_views(num_tasks=500_000, num_queries=100):
+    """Filtered views: successive list comprehensions over every task against the bitmap indexes"""
+    categories = ["General", "Work", "Personal", "Shopping"]
+    priorities = ["High", "Medium", "Low"]
+    rng = random.Random(42)
+    print(f"\nView benchmark ({num_tasks} tasks, {num_queries} filtered views of one 20-task page)")
+    with tempfile.TemporaryDirectory() as tmp:
+        todo = TodoList(os.path.join(tmp, "tasks.json"), compact_every=num_tasks, group_commit=num_tasks)
+        tasks = []
+        for i in range(num_tasks):
+            task = Task(f"Task {i}", rng.choice(categories), rng.choice(priorities),
+                        f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+            task.completed = rng.random() < 0.3
+            tasks.append(task)
+            todo.tasks.append(task)
+        todo.save_tasks()
+        queries = [(rng.choice((None, False, True)), rng.choice(categories), rng.choice((None, *priorities)))
+                   for _ in range(num_queries)]
+        
+        start = time.perf_counter()
+        for completed, category, priority in queries:
+            # The old view_tasks, plus the sort a due-date view needs
+            filtered = tasks
+            if completed is not None:
+                filtered = [t for t in filtered if t.completed == completed]
+            filtered = [t for t in filtered if t.category == category]
+            if priority:
+                filtered = [t for t in filtered if t.priority == priority]
+            page = sorted(filtered, key=lambda t: t.due_date)[:20]
+        scan = (time.perf_counter() - start) / num_queries
+        
+        start = time.perf_counter()
+        for completed, category, priority in queries:
+            indexes, total = todo.tasks.select(completed, category, priority, by_due=True, stop=20)
+            page = [todo.tasks[i] for i in indexes]
+        indexed = (time.perf_counter() - start) / num_queries
+        todo.tasks.close()
+    print(f"List comprehensions + sort: {scan * 1000:8.2f} ms per view")
+    print(f"Bitmap indexes:             {indexed * 1000:8.2f} ms per view ({scan / indexed:.0f}x faster)")
+
+def benchmark_statistics(num_tasks=500_000, num_reads=10):
+    """get_statistics inputs: recounting every task against reading the live TaskStats"""
+    categories = ["General", "Work", "Personal", "Shopping"]
+    priorities = ["High", "Medium", "Low"]
+    print(f"\nStatistics benchmark ({num_tasks} tasks)")
+    stats = TaskStats()
+    index = TaskIndex()
+    tasks = []
+    start = time.perf_counter()
+    for i in range(num_tasks):
+        task = Task(f"Task {i}", categories[i % 4], priorities[i % 3])
+        task.created_date = "2024-01-01 09:00"
+        tasks.append(task)
+        stats.update(index.set(i, task), task)
+    for i in range(0, num_tasks, 3):
+        task = tasks[i]
+        task.completed = True
+        task.completion_date = f"2024-01-{1 + i % 28:02d} 17:00"
+        stats.update(index.set(i, task), task)
+    upkeep = (time.perf_counter() - start) / (num_tasks + num_tasks // 3)
+    
+    start = time.perf_counter()
+    for _ in range(num_reads):
+        # What the old get_statistics did on every call
+        completed = len([t for t in tasks if t.completed])
+        by_category = {}
+        by_priority = {"High": 0, "Medium": 0, "Low": 0}
+        for task in tasks:
+            by_category[task.category] = by_category.get(task.category, 0) + 1
+            if task.priority in by_priority:
+                by_priority[task.priority] += 1
+    recount = (time.perf_counter() - start) / num_reads
+    
+    start = time.perf_counter()
+    for _ in range(num_reads):
+        snapshot = (stats.total, stats.completed, dict(stats.categories), dict(stats.priorities),
+                    stats.mean, stats.stddev())
+    live = (time.perf_counter() - start) / num_reads
+    same = (completed, by_category) == (stats.completed, stats.categories)
+    print(f"Recount per call: {recount * 1000:10.3f} ms")
+    print(f"Live counters:    {live * 1000:10.3f} ms ({'same counts' if same else 'MISMATCH'}; "
+          f"upkeep {upkeep * 1e6:.1f} us per change, indexes included)")
+
+def benchmark_reminders(num_tasks=200_000, num_queries=100):
+    """Tasks due in the next hour: parsing every due date against the due-date index; scheduler idle cost"""
+    rng = random.Random(42)
+    now = datetime.now().replace(second=0, microsecond=0)
+    print(f"\nReminder benchmark ({num_tasks} tasks with due dates)")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tasks.json")
+        with open(path, "w") as f:
+            for i in range(num_tasks):
+                due = now + timedelta(minutes=rng.randrange(-30 * 24 * 60, 365 * 24 * 60))
+                task = Task(f"Task {i}", due_date=due.strftime("%Y-%m-%d %H:%M"))
+                f.write(json.dumps(task.to_dict()) + "\n")
+        start = time.perf_counter()
+        todo = TodoList(path)  # No .idx yet: one pass parses every due date once
+        build = time.perf_counter() - start
+        
+        windows = [now + timedelta(hours=rng.randrange(24 * 365)) for _ in range(num_queries)]
+        start = time.perf_counter()
+        for window in windows[:5]:
+            # Without the index: parse every task's due date string
+            scanned = [i for i, task in todo.tasks.items()
+                       if window.timestamp() <= (due_timestamp(task.due_date) or NO_DUE) < window.timestamp() + 3600]
+        scan = (time.perf_counter() - start) / 5
+        start = time.perf_counter()
+        for window in windows:
+            found = todo.tasks.due_between(window, window + timedelta(hours=1))
+        indexed = (time.perf_counter() - start) / num_queries
+        same = sorted(todo.tasks.due_between(windows[4], windows[4] + timedelta(hours=1))) == scanned
+        
+        fired = []
+        todo.start_reminders(lambda index, task: fired.append(index), lead=3600)
+        time.sleep(0.5)  # Let it send the reminders already due
+        cpu = time.process_time()
+        time.sleep(2)
+        idle = time.process_time() - cpu
+        todo.reminders.stop()
+        todo.tasks.close()
+    print(f"Index build (one pass): {build:8.2f}s")
+    print(f"Scan every due date:    {scan * 1000:8.1f} ms per query")
+    print(f"due_between:            {indexed * 1000:8.3f} ms per query ({'same tasks' if same else 'MISMATCH'})")
+    print(f"Scheduler: {len(fired)} reminders sent, {idle * 1000:.2f} ms CPU over 2s idle")
+
+def benchmark_task_ids(num_tasks=200_000, num_ops=10_000):
+    """Removing and completing tasks: by position in a list against by stable ID, one by one and in one batch"""
+    rng = random.Random(42)
+    print(f"\nTask ID benchmark ({num_tasks} tasks, {num_ops} tasks removed and {num_ops} completed)")
+    tasks = [Task(f"Task {i}") for i in range(num_tasks)]
+    positions = [rng.randrange(num_tasks - i) for i in range(num_ops)]
+    start = time.perf_counter()
+    for position in positions:
+        # The old way: pop by position, which shifts every later task (and its number) down by one
+        tasks.pop(position)
+    popped = (time.perf_counter() - start) / num_ops
+    del tasks
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        todo = TodoList(os.path.join(tmp, "tasks.json"), compact_every=10 * num_tasks)
+        todo.tasks.update_many({i: Task(f"Task {i}") for i in range(num_tasks)})
+        todo.save_tasks()
+        ids = rng.sample(range(1, num_tasks + 1), 4 * num_ops)
+        quiet = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, quiet
+        try:
+            start = time.perf_counter()
+            for task_id in ids[:num_ops]:
+                todo.remove_task(task_id)
+            removed = (time.perf_counter() - start) / num_ops
+            start = time.perf_counter()
+            for task_id in ids[num_ops:2 * num_ops]:
+                todo.complete_task(task_id)
+            completed = (time.perf_counter() - start) / num_ops
+            logged = todo.tasks.logged
+            start = time.perf_counter()
+            todo.remove_tasks(ids[2 * num_ops:3 * num_ops])
+            todo.complete_tasks(ids[3 * num_ops:])
+            batched = (time.perf_counter() - start) / (2 * num_ops)
+        finally:
+            sys.stdout = stdout
+            quiet.close()
+        stats = todo.tasks.stats
+        same = (stats.total, stats.completed) == (num_tasks - 2 * num_ops, 2 * num_ops)
+        batch_records = todo.tasks.logged - logged
+        todo.tasks.close()
+    print(f"list.pop by position:   {popped * 1e6:8.1f} us per removal (later task numbers shift)")
+    print(f"remove_task by ID:      {removed * 1e6:8.1f} us per removal")
+    print(f"complete_task by ID:    {completed * 1e6:8.1f} us per completion")
+    print(f"remove_tasks + complete_tasks: {batched * 1e6:8.1f} us per task, {batch_records} log records "
+          f"({'counts match' if same else 'COUNT MISMATCH'})")
+
+def check_reminders(num_tasks=4):
+    """Return a list of problems with reminder callbacks that call back into the TodoList"""
+    problems = []
+    due = (datetime.now() + timedelta(minutes=30)).strftime("%Y-%m-%d %H:%M")
+    with tempfile.TemporaryDirectory() as tmp:
+        quiet = open(os.devnull, "w")
+        stdout, sys.stdout = sys.stdout, quiet
+        try:
+            todo = TodoList(os.path.join(tmp, "tasks.json"))
+            for i in range(num_tasks):
+                todo.add_task(f"Task {i}", due_date=due)
+            reminded = []
+            
+            def complete(index, task):
+                reminded.append(index)
+                if index == 0:
+                    todo.add_task("Added by a reminder", due_date=due)  # Reminded on the scheduler's next pass
+                if index % 2:
+                    todo.complete_task(index + 1)
+                    return
+                # Handed to another thread and waited for, as a UI or worker pool would
+                worker = threading.Thread(target=todo.complete_task, args=(index + 1,))
+                worker.start()
+                worker.join(timeout=2)
+                if worker.is_alive():
+                    problems.append(f"completing task {index + 1} from another thread blocked on the task lock")
+            
+            todo.start_reminders(complete, lead=3600)
+            deadline = time.monotonic() + 10
+            while len(reminded) < num_tasks + 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            todo.reminders.stop()
+            if sorted(reminded) != list(range(num_tasks + 1)):
+                problems.append(f"reminded tasks {sorted(reminded)}, expected 0 to {num_tasks}")
+            if todo.tasks.stats.completed != num_tasks + 1:
+                problems.append(f"{todo.tasks.stats.completed} of {num_tasks + 1} tasks completed by their reminders")
+            if todo.reminders.fire_due(time.time()):
+                problems.append("completed tasks were reminded again")
+            todo.tasks.close()
+        finally:
+            sys.stdout = stdout
+            quiet.close()
+    return problems
+
+def run_checks():
+    """Run the todo list self-checks; return whether they all passed"""
+    problems = check_reminders()
+    print("\nTodo list checks")
+    if problems:
+        print(f"FAILED: {len(problems)} problems, e.g. {problems[0]}")
+    else:
+        print("PASSED: all checks")
+    return not problems
+
+def run_benchmarks():
+    """Run all todo list benchmarks"""
+    benchmark_memory()
+    benchmark_persistence()
+    benchmark_views()
+    benchmark_statistics()
+    benchmark_reminders()
+    benchmark_task_ids()
 
 def main():
     todo_list = TodoList()
+    # Reminders fire while input() waits, so queue them and show them before the next menu
+    reminders = deque()
+    todo_list.start_reminders(lambda index, task: reminders.append((index, task)))
     
     while True:
+        while reminders:
+            todo_list.print_reminder(*reminders.popleft())
         print("\n=== Advanced Todo List Manager ===")
         print("1. Add Task")
         print("2. View All Tasks")
         print("3. View Active Tasks")
         print("4. View Completed Tasks")
-        print("5. Mark Task as Completed")
-        print("6. View Statistics")
-        print("7. Exit")
+        print("5. Mark Tasks as Completed")
+        print("6. Remove Tasks")
+        print("7. View Statistics")
+        print("8. View Tasks by Due Date")
+        print("9. View Tasks Due in the Next 24 Hours")
+        print("10. Exit")
         
-        choice = input("\nEnter your choice (1-7): ")
+        choice = input("\nEnter your choice (1-10): ")
         
         if choice == "1":
             title = input("Enter task title: ")
             category = input("Enter category (press Enter for General): ") or "General"
             priority = input("Enter priority (High/Medium/Low, press Enter for Medium): ") or "Medium"
-            due_date = input("Enter due date (YYYY-MM-DD, press Enter for none): ") or None
+            due_date = input("Enter due date (YYYY-MM-DD or YYYY-MM-DD HH:MM, press Enter for none): ") or None
             todo_list.add_task(title, category, priority, due_date)
         
         elif choice == "2":
@@ -157,18 +1163,37 @@ def main():
         elif choice == "4":
             todo_list.view_tasks(filter_completed=True)
         
-        elif choice == "5":
-            todo_list.view_tasks(filter_completed=False)
-            task_num = input("\nEnter task number to mark as completed: ")
+        elif choice in ("5", "6"):
+            todo_list.view_tasks(filter_completed=False if choice == "5" else None)
+            action = "mark as completed" if choice == "5" else "remove"
+            task_ids = input(f"\nEnter task IDs to {action} (separated by spaces or commas): ")
             try:
-                todo_list.complete_task(int(task_num))
+                task_ids = [int(task_id) for task_id in re.split(r"[\s,]+", task_ids.strip()) if task_id]
             except ValueError:
-                print("Please enter a valid number!")
+                print("Please enter valid IDs!")
+                continue
+            if len(task_ids) == 1:
+                (todo_list.complete_task if choice == "5" else todo_list.remove_task)(task_ids[0])
+            elif task_ids:
+                (todo_list.complete_tasks if choice == "5" else todo_list.remove_tasks)(task_ids)
         
-        elif choice == "6":
+        elif choice == "7":
             todo_list.get_statistics()
         
-        elif choice == "7":
+        elif choice == "8":
+            category = input("Category (press Enter for all): ") or None
+            page = 1
+            while todo_list.view_tasks(filter_completed=False, category=category, sort_by_due=True,
+                                       page=page, page_size=20) == 20:
+                if input("\nPress Enter for the next page, or q to stop: ").lower() == "q":
+                    break
+                page += 1
+        
+        elif choice == "9":
+            now = datetime.now()
+            todo_list.view_due(now, now + timedelta(days=1))
+        
+        elif choice == "10":
             print("Thank you for using Todo List Manager!")
             break
         
@@ -176,4 +1201,9 @@ def main():
             print("Invalid choice! Please try again.")
 
 if __name__ == "__main__":
-    main()
+    if "--benchmark" in sys.argv:
+        run_benchmarks()
+    elif "--check" in sys.argv:
+        sys.exit(0 if run_checks() else 1)
+    else:
+        main()
@@ -6,117 +6,983 @@
 # 3. Interest Calculation
 # 4. Account Statement Generation
 # 5. Money Transfer between Accounts
+# 6. Compact __slots__ Accounts with Array-backed Transactions
+# 7. Columnar Ledger: Statements and Analytics Read the Arrays Directly
+# 8. Sequential Account Numbers with Check Digits (shared id_allocator module)
+# 9. Durable Ledger with Binary Snapshots and Tail Replay
+# 10. Atomic, Thread-safe Transfers with Per-account Locks
+# 11. Batch Month-end Interest Accrual (once per period)
+# 12. Streaming, Paginated, Date-range Statements (bisect over the timestamp column)
+# 13. Sharded Batch Settlement of Transfer Files on a Process Pool
+# 14. Integer-cent Money: Exact Balances and Banker's-rounded Interest (shared money module)
+# 15. Point-in-time Balances (binary search over the running-balance column), Single and Batched
+# 16. Per-account Sliding-window Velocity Limits on Withdrawals and Transfers
 
+import csv
 import json
-from datetime import datetime
+import operator
+from datetime import datetime, timedelta
+import os
 import random
-import string
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from multiprocessing import Pool
+from types import SimpleNamespace
+
+from id_allocator import IdAllocator, benchmark_ids
+from money import MAX_CENTS, Money, apply_rate, apply_rate_all, benchmark_money, check_money, exact_rate, to_cents
+from state_file import dump_state, load_state
+
+class TransactionLog:
+    """Transaction history stored column-wise in typed arrays (amounts and balances in cents)"""
+    __slots__ = ("timestamps", "types", "amounts", "balances")
+    TYPES = ["Credit", "Debit"]  # Type code -> name
+    DATE_FORMAT = "%Y-%m-%d %H:%M"
+
+    def __init__(self):
+        self.timestamps = array("q")  # Epoch seconds
+        self.types = array("b")       # Index into TYPES
+        self.amounts = array("q")
+        self.balances = array("q")
+
+    @classmethod
+    def type_code(cls, type_):
+        """Code for a transaction type name, registering new names"""
+        try:
+            return cls.TYPES.index(type_)
+        except ValueError:
+            cls.TYPES.append(type_)
+            return len(cls.TYPES) - 1
+
+    def to_state(self):
+        """Columns as raw bytes, with the type names their codes refer to"""
+        return {"type_names": list(self.TYPES), "timestamps": self.timestamps.tobytes(),
+                "types": self.types.tobytes(), "amounts": self.amounts.tobytes(),
+                "balances": self.balances.tobytes()}
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a log from to_state() output"""
+        log = cls()
+        log.timestamps.frombytes(state["timestamps"])
+        log.types.frombytes(state["types"])
+        log.amounts.frombytes(state["amounts"])
+        log.balances.frombytes(state["balances"])
+        codes = [cls.type_code(name) for name in state["type_names"]]
+        if codes != list(range(len(codes))):  # Names were registered in another order
+            log.types = array("b", (codes[code] for code in log.types))
+        return log
+
+    def append(self, type_, amount, balance, timestamp=None):
+        """Record one transaction; amount and balance are whole cents"""
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            timestamp = self.timestamps[-1]  # Clock stepped back: keep the time index sorted
+        code = self.type_code(type_)
+        self.amounts.append(amount)
+        try:
+            self.balances.append(balance)
+        except OverflowError:
+            self.amounts.pop()  # Keep the columns the same length
+            raise
+        self.timestamps.append(timestamp)
+        self.types.append(code)
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def __getitem__(self, i):
+        """The i-th transaction as a dict (dates are only formatted here)"""
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return {
+            "date": datetime.fromtimestamp(self.timestamps[i]).strftime(self.DATE_FORMAT),
+            "type": self.TYPES[self.types[i]],
+            "amount": Money.from_cents(self.amounts[i]),
+            "balance": Money.from_cents(self.balances[i])
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def pop(self):
+        """Remove the last transaction (to undo a failed operation)"""
+        for column in (self.timestamps, self.types, self.amounts, self.balances):
+            column.pop()
+
+    def rows(self, start=0, stop=None):
+        """Yield (date, type, amount, balance) straight from the columns, formatting each minute once"""
+        dates = {}
+        for timestamp, code, amount, balance in zip(self.timestamps[start:stop], self.types[start:stop],
+                                                    self.amounts[start:stop], self.balances[start:stop]):
+            minute = timestamp // 60
+            if minute not in dates:
+                dates[minute] = datetime.fromtimestamp(timestamp).strftime(self.DATE_FORMAT)
+            yield dates[minute], self.TYPES[code], Money.from_cents(amount), Money.from_cents(balance)
+
+    def between(self, start=None, end=None):
+        """Index range [lo, hi) of transactions from start up to (not including) end, in O(log n)"""
+        lo = 0 if start is None else bisect_left(self.timestamps, int(start.timestamp()))
+        hi = len(self) if end is None else bisect_left(self.timestamps, int(end.timestamp()))
+        return lo, max(lo, hi)
+
+    def balance_at(self, timestamp):
+        """Balance in cents after the last transaction at or before timestamp (epoch seconds), in O(log n);
+        None if there were none yet. Every row carries its running balance, so no walk is needed."""
+        i = bisect_right(self.timestamps, int(timestamp))
+        return self.balances[i - 1] if i else None
+
+    def balances_at(self, timestamps):
+        """balance_at for many timestamps: searched in time order, each search starting where the last ended"""
+        found = [None] * len(timestamps)
+        i = 0
+        for position in sorted(range(len(timestamps)), key=timestamps.__getitem__):
+            i = bisect_right(self.timestamps, int(timestamps[position]), i)
+            if i:
+                found[position] = self.balances[i - 1]
+        return found
+
+    def summary(self, start=0, stop=None):
+        """Count and total amount per transaction type"""
+        counts = [0] * len(self.TYPES)
+        totals = [0] * len(self.TYPES)
+        for code, amount in zip(self.types[start:stop], self.amounts[start:stop]):
+            counts[code] += 1
+            totals[code] += amount
+        return {self.TYPES[code]: {"count": counts[code], "total": Money.from_cents(totals[code])}
+                for code in range(len(self.TYPES)) if counts[code]}
+
+class VelocityLimiter:
+    """Per-account sliding-window caps on debits: at most max_debits and max_amount in any window seconds"""
+    def __init__(self, max_debits=None, max_amount=None, window=3600):
+        self.max_debits = max_debits
+        self.max_cents = None if max_amount is None else to_cents(max_amount)
+        self.window = window
+        # Account -> [deque of (timestamp, cents) in time order, total cents], least recently debited first.
+        # Accounts whose last debit has left the window are dropped, so memory follows recent activity only.
+        self.windows = OrderedDict()
+        self.next_sweep = None  # Idle accounts are swept at most once a second
+        self.lock = threading.Lock()
+
+    def _expire(self, key, now):
+        """Drop debits that have left the window: idle accounts entirely, then key's oldest.
+        Returns key's entry, or None if it has no debits in the window."""
+        horizon = now - self.window
+        windows = self.windows
+        if self.next_sweep is None or now >= self.next_sweep:
+            self.next_sweep = now + 1
+            while windows:
+                idle, (debits, _) = next(iter(windows.items()))
+                if debits[-1][0] > horizon:
+                    break  # Debits can arrive slightly out of time order, so an idle account may wait its turn
+                del windows[idle]
+        entry = windows.get(key)
+        if entry is not None:
+            debits = entry[0]
+            while debits and debits[0][0] <= horizon:
+                entry[1] -= debits.popleft()[1]
+            if not debits:
+                del windows[key]
+                return None
+        return entry
+
+    def _add(self, key, entry, cents, now):
+        if entry is None:
+            entry = self.windows[key] = [deque(), 0]
+        else:
+            self.windows.move_to_end(key)
+            now = max(now, entry[0][-1][0])  # Arrived out of time order: keep the deque sorted
+        entry[0].append((now, cents))
+        entry[1] += cents
+
+    def allow(self, key, cents, now):
+        """Count a debit against key's window if it fits; otherwise return the limit it would break"""
+        with self.lock:
+            entry = self._expire(key, now)
+            count = total = 0
+            if entry is not None:
+                count, total = len(entry[0]), entry[1]
+            if self.max_debits is not None and count >= self.max_debits:
+                return f"Velocity limit reached: at most {self.max_debits} debits per {self.window}s"
+            if self.max_cents is not None and total + cents > self.max_cents:
+                return f"Velocity limit reached: at most ${Money.from_cents(self.max_cents)} per {self.window}s"
+            self._add(key, entry, cents, now)
+            return None
+
+    def record(self, key, cents, now):
+        """Count a debit without checking it (ledger replay, batch settlement)"""
+        with self.lock:
+            self._add(key, self._expire(key, now), cents, now)
+
+    def cancel(self, key):
+        """Take back key's latest debit (the operation it allowed was rolled back)"""
+        with self.lock:
+            entry = self.windows.get(key)
+            if entry is not None:
+                entry[1] -= entry[0].pop()[1]
+                if not entry[0]:
+                    del self.windows[key]
 
 class BankAccount:
     """Base class for bank accounts"""
-    def __init__(self, account_holder, initial_balance=0):
-        self.account_number = self._generate_account_number()
+    __slots__ = ("account_number", "account_holder", "cents", "transactions", "created_date")
+    account_numbers = IdAllocator(width=10)  # Shared by every account: 9 digits + check digit
+
+    def __init__(self, account_holder, initial_balance=0, account_number=None):
+        self.account_number = account_number or self._generate_account_number()
         self.account_holder = account_holder
         self.balance = initial_balance
-        self.transactions = []
+        self.transactions = TransactionLog()
         self.created_date = datetime.now().strftime("%Y-%m-%d %H:%M")
     
     def _generate_account_number(self):
-        """Generate a random 10-digit account number"""
-        return ''.join(random.choices(string.digits, k=10))
+        """Allocate the next 10-digit account number"""
+        return self.account_numbers.next_id()
+    
+    @property
+    def balance(self):
+        """Current balance as Money (stored as whole cents)"""
+        return Money.from_cents(self.cents)
+    
+    @balance.setter
+    def balance(self, amount):
+        self.cents = to_cents(amount)
     
-    def deposit(self, amount):
-        """Deposit money into account"""
-        if amount <= 0:
+    @staticmethod
+    def _cents(amount):
+        """Whole cents in an amount, or None if it is not a valid amount (or too large to store)"""
+        try:
+            return to_cents(amount)
+        except ValueError:
+            return None
+    
+    def deposit(self, amount, timestamp=None):
+        """Deposit money into account (any amount to_cents accepts)"""
+        cents = self._cents(amount)
+        if cents is None or cents <= 0:
             return {"status": "error", "message": "Invalid deposit amount"}
+        if self.cents + cents > MAX_CENTS:
+            return {"status": "error", "message": "Deposit would exceed the largest balance an account can hold"}
         
-        self.balance += amount
-        self._add_transaction("Credit", amount)
-        return {"status": "success", "message": f"Deposited ${amount:.2f}"}
+        self._add_transaction("Credit", cents, self.cents + cents, timestamp)
+        return {"status": "success", "message": f"Deposited ${Money.from_cents(cents)}"}
     
-    def withdraw(self, amount):
-        """Withdraw money from account"""
-        if amount <= 0:
+    def withdraw(self, amount, timestamp=None, velocity=None):
+        """Withdraw money from account (any amount to_cents accepts), within a VelocityLimiter if given"""
+        cents = self._cents(amount)
+        if cents is None or cents <= 0:
             return {"status": "error", "message": "Invalid withdrawal amount"}
-        if amount > self.balance:
+        if cents > self.cents:
             return {"status": "error", "message": "Insufficient funds"}
+        refused = self._over_velocity(velocity, cents, timestamp)
+        if refused:
+            return refused
         
-        self.balance -= amount
-        self._add_transaction("Debit", amount)
-        return {"status": "success", "message": f"Withdrawn ${amount:.2f}"}
-    
-    def _add_transaction(self, type_, amount):
-        """Record a transaction"""
-        transaction = {
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "type": type_,
-            "amount": amount,
-            "balance": self.balance
-        }
-        self.transactions.append(transaction)
+        self._add_transaction("Debit", cents, self.cents - cents, timestamp)
+        return {"status": "success", "message": f"Withdrawn ${Money.from_cents(cents)}"}
     
-    def get_statement(self):
-        """Generate account statement"""
-        statement = f"\nAccount Statement for {self.account_number}"
-        statement += f"\nAccount Holder: {self.account_holder}"
-        statement += f"\nAccount Type: {self.__class__.__name__}"
-        statement += f"\nCreated Date: {self.created_date}"
-        statement += f"\nCurrent Balance: ${self.balance:.2f}"
-        statement += "\n\nTransaction History:"
-        statement += "\nDate                 Type      Amount     Balance"
-        statement += "\n" + "-"*50
+    def _over_velocity(self, velocity, cents, timestamp):
+        """Error result if a debit breaks the account's velocity limits (checked last: it counts the debit)"""
+        if velocity is None:
+            return None
+        message = velocity.allow(self.account_number, cents, time.time() if timestamp is None else timestamp)
+        return {"status": "error", "message": message} if message else None
+    
+    def _add_transaction(self, type_, cents, balance, timestamp=None):
+        """Record a transaction of a whole number of cents, then set the balance it leaves
+        (in that order, so a failed append leaves the account as it was)"""
+        self.transactions.append(type_, cents, balance, timestamp)
+        self.cents = balance
+    
+    def to_state(self):
+        """Every slot as plain data, for snapshots"""
+        state = {"class": type(self).__name__}
+        for klass in type(self).__mro__:
+            for name in getattr(klass, "__slots__", ()):
+                state[name] = getattr(self, name)
+        state["transactions"] = self.transactions.to_state()
+        return state
+    
+    @staticmethod
+    def from_state(state):
+        """Rebuild an account of the right class from to_state() output"""
+        klass = ACCOUNT_CLASSES[state["class"]]
+        account = klass.__new__(klass)
+        for name, value in state.items():
+            if name != "class":
+                setattr(account, name, value)
+        # Ledger "open" records carry no transactions
+        account.transactions = TransactionLog.from_state(state["transactions"]) if "transactions" in state \
+            else TransactionLog()
+        return account
+    
+    def opening_cents(self):
+        """Balance in cents before the first recorded transaction"""
+        log = self.transactions
+        if not len(log):
+            return self.cents
+        sign = -1 if TransactionLog.TYPES[log.types[0]] == "Debit" else 1
+        return log.balances[0] - sign * log.amounts[0]
+    
+    def balance_at(self, when):
+        """Balance as of a datetime, counting every transaction up to and including it"""
+        cents = self.transactions.balance_at(when.timestamp())
+        return Money.from_cents(self.opening_cents() if cents is None else cents)
+    
+    def statement_lines(self, start=None, end=None, page=None, page_size=50):
+        """Yield the statement line by line; start/end (datetimes, end not included) and page (1-based) pick the rows"""
+        if page is not None and page < 1:
+            raise ValueError(f"Statement pages start at 1, not {page}")
+        yield f"Account Statement for {self.account_number}"
+        yield f"Account Holder: {self.account_holder}"
+        yield f"Account Type: {self.__class__.__name__}"
+        yield f"Created Date: {self.created_date}"
+        yield f"Current Balance: ${self.balance:.2f}"
+        yield ""
+        
+        lo, hi = self.transactions.between(start, end)
+        if start is not None or end is not None:
+            since = start.strftime("%Y-%m-%d") if start else "opening"
+            until = (end - timedelta(microseconds=1)).strftime("%Y-%m-%d") if end else "today"  # Last day included
+            yield f"Transaction History ({since} to {until}):"
+        else:
+            yield "Transaction History:"
+        yield "Date                 Type      Amount     Balance"
+        yield "-"*50
         
-        for t in self.transactions:
-            statement += f"\n{t['date']}  {t['type']:<8}  ${t['amount']:<8.2f}  ${t['balance']:.2f}"
+        first, last = lo, hi
+        if page is not None:
+            first = min(hi, lo + (page - 1) * page_size)
+            last = min(hi, first + page_size)
+        for date, type_, amount, balance in self.transactions.rows(first, last):
+            yield f"{date}  {type_:<8}  ${amount:<8.2f}  ${balance:.2f}"
         
-        return statement
+        if page is not None:
+            pages = max(1, -(-(hi - lo) // page_size))
+            yield f"Page {page} of {pages} ({hi - lo} transactions)"
+        else:
+            for type_, totals in self.transactions.summary(lo, hi).items():
+                yield f"Total {type_}: ${totals['total']:.2f} ({totals['count']} transactions)"
+    
+    def write_statement(self, out, **options):
+        """Stream the statement to a file-like object (takes the statement_lines options)"""
+        for line in self.statement_lines(**options):
+            out.write(line + "\n")
+    
+    def get_statement(self, **options):
+        """Generate account statement (takes the statement_lines options)"""
+        return "\n" + "\n".join(self.statement_lines(**options))
 
 class SavingsAccount(BankAccount):
     """Savings account with interest calculation"""
-    def __init__(self, account_holder, initial_balance=0, interest_rate=2.5):
-        super().__init__(account_holder, initial_balance)
+    __slots__ = ("interest_rate",)
+
+    def __init__(self, account_holder, initial_balance=0, interest_rate=2.5, account_number=None):
+        super().__init__(account_holder, initial_balance, account_number=account_number)
         self.interest_rate = interest_rate
     
-    def calculate_interest(self):
-        """Calculate monthly interest"""
-        interest = self.balance * (self.interest_rate / 100 / 12)
-        self.deposit(interest)
-        return {"status": "success", "message": f"Interest credited: ${interest:.2f}"}
+    def monthly_rate(self):
+        """Exact monthly rate for interest_rate (a yearly percentage)"""
+        return exact_rate(self.interest_rate) / 1200
+    
+    def calculate_interest(self, timestamp=None):
+        """Calculate monthly interest, rounded half to even to the cent"""
+        interest = Money.from_cents(apply_rate(self.cents, self.monthly_rate()))
+        self.deposit(interest, timestamp)
+        return {"status": "success", "message": f"Interest credited: ${interest}", "amount": interest}
 
 class CurrentAccount(BankAccount):
     """Current account with overdraft facility"""
-    def __init__(self, account_holder, initial_balance=0, overdraft_limit=1000):
-        super().__init__(account_holder, initial_balance)
+    __slots__ = ("overdraft_limit",)
+
+    def __init__(self, account_holder, initial_balance=0, overdraft_limit=1000, account_number=None):
+        super().__init__(account_holder, initial_balance, account_number=account_number)
         self.overdraft_limit = overdraft_limit
     
-    def withdraw(self, amount):
+    def withdraw(self, amount, timestamp=None, velocity=None):
         """Withdraw with overdraft facility"""
-        if amount <= 0:
+        cents = self._cents(amount)
+        if cents is None or cents <= 0:
             return {"status": "error", "message": "Invalid withdrawal amount"}
-        if amount > (self.balance + self.overdraft_limit):
+        if cents > (self.cents + to_cents(self.overdraft_limit)):
             return {"status": "error", "message": "Amount exceeds overdraft limit"}
+        refused = self._over_velocity(velocity, cents, timestamp)
+        if refused:
+            return refused
+        
+        self._add_transaction("Debit", cents, self.cents - cents, timestamp)
+        return {"status": "success", "message": f"Withdrawn ${Money.from_cents(cents)}"}
+
+ACCOUNT_CLASSES = {klass.__name__: klass for klass in (BankAccount, SavingsAccount, CurrentAccount)}
+
+class BankLedger:
+    """Append-only, checksummed log of every balance-changing operation"""
+    def __init__(self, path="bank.ledger", group_commit=1):
+        self.path = path
+        self.group_commit = group_commit  # fsync once every N records
+        self.seq = 0                      # Sequence number of the last record
+        self.records = 0                  # Records since the last snapshot
+        self.unsynced = 0
+        self.file = None
+        self.lock = threading.Lock()  # Serializes numbering and writes
+
+    @staticmethod
+    def replay(path):
+        """Yield valid records from a ledger file, then truncate any torn tail"""
+        try:
+            f = open(path, "rb+")
+        except FileNotFoundError:
+            return
+        with f:
+            valid_end = 0
+            for line in f:
+                crc, _, payload = line.rstrip(b"\n").partition(b" ")
+                if not line.endswith(b"\n") or crc != b"%08x" % zlib.crc32(payload):
+                    break  # Torn or corrupt write from a crash: nothing after it counts
+                valid_end += len(line)
+                yield json.loads(payload)
+            f.truncate(valid_end)
+
+    def open(self, seq, records):
+        """Open the ledger for appending after record seq"""
+        self.file = open(self.path, "ab")
+        self.seq = seq
+        self.records = records
+
+    def append(self, record):
+        """Number and write one record; fsync according to group_commit"""
+        with self.lock:
+            self.seq += 1
+            record["seq"] = self.seq
+            payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+            self.file.write(b"%08x %s\n" % (zlib.crc32(payload), payload))
+            self.records += 1
+            self.unsynced += 1
+            if self.unsynced >= self.group_commit:
+                self._sync()
+
+    def _sync(self):
+        if self.file and self.unsynced:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.unsynced = 0
+
+    def sync(self):
+        """Force pending records to disk"""
+        with self.lock:
+            self._sync()
+
+    def truncate(self):
+        """Drop every record; call only once a snapshot holds them"""
+        with self.lock:
+            self.file.truncate(0)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.records = 0
+
+    def close(self):
+        """Sync and close the ledger"""
+        with self.lock:
+            self._sync()
+            if self.file:
+                self.file.close()
+                self.file = None
+
+def read_transfers(path, chunk_size=100_000):
+    """Stream a CSV (from,to,amount header) or JSON Lines transfer file as lists of (from, to, cents)"""
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        chunk = []
+        for record in records:
+            try:
+                cents = to_cents(record["amount"].strip() if isinstance(record["amount"], str) else record["amount"])
+            except ValueError:
+                cents = 0  # Declined, like any other invalid amount
+            chunk.append((str(record["from"]).strip(), str(record["to"]).strip(), cents))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+def _settle_shard(task):
+    """Settle one shard's transfers in file order (runs in a pool worker).
+
+    A transfer needs funds in its source account (withdraw's check) and room below MAX_CENTS in its
+    destination (deposit's check). A shard judges the sides it holds; others has the verdicts of the
+    shards holding the other side of its cross-shard transfers, where known.
+    Returns (decisions, verdicts, done, balances, entries): the outcome of every transfer this shard could
+    decide, its verdict on its side of each cross-shard transfer it could judge, how many leading rows are
+    fully settled, the balances after them, and the transaction rows they add to each account. The next
+    round resumes from there.
+    """
+    balances, limits, rows, others = task
+    low = dict(balances)    # Balance if undecided credits fail and undecided debits go through
+    high = dict(balances)   # Balance if undecided credits go through and undecided debits fail
+    entries = {}
+    decisions = {}
+    verdicts = {}
+    done, settled = len(rows), None
+    for position, (index, src, dst, amount) in enumerate(rows):
+        # Whole cents, so the bounds compare exactly. A check passes or fails only if both bounds agree;
+        # otherwise (None) a later round, knowing more, will decide it (with nothing undecided low == high)
+        verdict = True
+        if src in balances:
+            if amount > high[src] + limits[src]:  # Exactly what withdraw() checks
+                verdict = False
+            elif amount > low[src] + limits[src]:
+                verdict = None
+        if verdict is not False and dst in balances and dst != src:  # Exactly what deposit() checks
+            if low[dst] + amount > MAX_CENTS:
+                verdict = False
+            elif high[dst] + amount > MAX_CENTS:
+                verdict = None
+        ok = verdict
+        if src not in balances or dst not in balances:
+            if verdict is not None:
+                verdicts[index] = verdict
+            other = others.get(index)  # The other shard's verdict on its side
+            if verdict is not False and other is not True:
+                ok = other
         
-        self.balance -= amount
-        self._add_transaction("Debit", amount)
-        return {"status": "success", "message": f"Withdrawn ${amount:.2f}"}
+        if ok is None:
+            if settled is None:
+                done, settled = position, dict(low)
+            if src in balances:
+                low[src] -= amount
+            if dst in balances:
+                high[dst] += amount
+            continue
+        decisions[index] = ok
+        if not ok:
+            continue
+        if src in balances:
+            low[src] -= amount
+            high[src] -= amount
+            if settled is None:
+                entries.setdefault(src, []).append(("Debit", amount, low[src]))
+        if dst in balances:
+            low[dst] += amount
+            high[dst] += amount
+            if settled is None:
+                entries.setdefault(dst, []).append(("Credit", amount, low[dst]))
+    return decisions, verdicts, done, low if settled is None else settled, entries
+
+class AccountLocks:
+    """Context manager holding several account locks, acquired in the given order"""
+    __slots__ = ("locks",)
+
+    def __init__(self, locks):
+        self.locks = locks
+
+    def __enter__(self):
+        for lock in self.locks:
+            lock.acquire()
+
+    def __exit__(self, *exc):
+        for lock in reversed(self.locks):
+            lock.release()
 
 class Bank:
     """Bank management system"""
-    def __init__(self):
+    SNAPSHOT_MAGIC = b"BANKSNP2"  # state_file format: JSON plus raw transaction columns
+    ACCOUNT_TYPES = {"savings": SavingsAccount, "current": CurrentAccount}
+
+    def __init__(self, ledger_path="bank.ledger", snapshot_path="bank.snapshot", snapshot_every=10000,
+                 group_commit=1, velocity=None):
         self.accounts = {}
+        self.ledger = BankLedger(ledger_path, group_commit)
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every  # Ledger records between snapshots
+        # One lock per account, always taken in account-number order, so transfers between
+        # disjoint accounts never wait on each other and no two transfers can deadlock
+        self.locks = {}
+        self.open_lock = threading.Lock()  # Keeps new accounts out of a snapshot in progress
+        self.accrued_periods = set()       # "YYYY-MM" periods whose interest is already credited
+        self.snapshot_lock = threading.Lock()
+        self.velocity = velocity           # VelocityLimiter for withdrawals and transfers, or None
+        self.recover()
+    
+    def recover(self):
+        """Load the latest snapshot, then replay only the ledger records after it"""
+        seq = self.load_snapshot()
+        replayed = 0
+        for record in BankLedger.replay(self.ledger.path):
+            if record["seq"] > seq:  # Older records are already in the snapshot
+                self._apply(record)
+                seq = record["seq"]
+                replayed += 1
+        for number in self.accounts:
+            BankAccount.account_numbers.observe(number)
+        if self.ledger.file is None:
+            self.ledger.open(seq, replayed)
+    
+    def load_snapshot(self):
+        """Read the snapshot into self.accounts; return the last ledger seq it includes"""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0
+        try:
+            snapshot = load_state(data, self.SNAPSHOT_MAGIC)
+        except ValueError as error:
+            raise ValueError(f"Corrupt bank snapshot: {self.snapshot_path} ({error})") from None
+        self.accounts = {state["account_number"]: BankAccount.from_state(state) for state in snapshot["accounts"]}
+        self.accrued_periods = set(snapshot.get("accrued_periods", ()))
+        return snapshot["seq"]
+    
+    def _locked(self, *acc_nums):
+        """Hold the locks of the given accounts, in global (account-number) order"""
+        return AccountLocks([self.locks.setdefault(number, threading.Lock()) for number in sorted(set(acc_nums))])
+    
+    def snapshot(self):
+        """Write every account to a binary snapshot, then empty the ledger it replaces"""
+        if not self.snapshot_lock.acquire(blocking=False):
+            return  # Another thread is already snapshotting
+        try:
+            with self.open_lock, self._locked(*self.accounts):
+                # Every record up to ledger.seq is applied and nothing else is, while all accounts are held
+                self.ledger.sync()
+                self._write_snapshot({"seq": self.ledger.seq,
+                                      "accounts": [account.to_state() for account in self.accounts.values()],
+                                      "accrued_periods": sorted(self.accrued_periods)})
+                self.ledger.truncate()  # A crash before this is harmless: replay skips records up to seq
+        finally:
+            self.snapshot_lock.release()
+    
+    def _write_snapshot(self, snapshot):
+        """Atomically replace the snapshot file"""
+        # Plain data with the columns as raw bytes, checksummed; its seq says which ledger records it holds
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dump_state(snapshot, self.SNAPSHOT_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+    
+    def close(self):
+        """Sync and close the ledger"""
+        self.ledger.close()
+    
+    def _log(self, op, **fields):
+        """Append a successful operation to the ledger (call while holding its accounts)"""
+        self.ledger.append({"op": op, **fields})
+    
+    def _commit(self):
+        """Snapshot every snapshot_every records (call with no account locks held)"""
+        if self.ledger.records >= self.snapshot_every:
+            self.snapshot()
+    
+    def _apply(self, record):
+        """Redo one ledger record against the accounts"""
+        op, ts = record["op"], record.get("ts")
+        amount = Money.from_cents(record["cents"]) if "cents" in record else None  # Whole cents
+        if op == "open":
+            account = BankAccount.from_state(record["account"])
+            self.accounts[account.account_number] = account
+        elif op == "deposit":
+            self.accounts[record["account"]].deposit(amount, ts)
+        elif op == "withdraw":
+            self.accounts[record["account"]].withdraw(amount, ts)
+            self._count_debit(record["account"], amount, ts)
+        elif op == "transfer":
+            self.accounts[record["from"]].withdraw(amount, ts)
+            self.accounts[record["to"]].deposit(amount, ts)
+            self._count_debit(record["from"], amount, ts)
+        elif op == "accrue":
+            self._accrue(record["period"], ts)
+        elif op == "settle":
+            for src, dst, cents in record["transfers"]:
+                amount = Money.from_cents(cents)
+                self.accounts[src].withdraw(amount, ts)
+                self.accounts[dst].deposit(amount, ts)
+                self._count_debit(src, amount, ts)
+    
+    def _count_debit(self, acc_num, amount, ts):
+        """Add an already-made debit to its account's velocity window (replay passed the check once already)"""
+        if self.velocity is not None:
+            self.velocity.record(acc_num, to_cents(amount), ts)
+    
+    def _open(self, account):
+        """Register and log a new account (call while holding open_lock)"""
+        self.accounts[account.account_number] = account
+        state = account.to_state()
+        del state["transactions"]  # Always empty on opening
+        self._log("open", account=state)
     
     def create_account(self, account_type, holder_name, initial_balance):
         """Create a new bank account"""
-        if account_type.lower() == "savings":
-            account = SavingsAccount(holder_name, initial_balance)
-        elif account_type.lower() == "current":
-            account = CurrentAccount(holder_name, initial_balance)
-        else:
+        if account_type.lower() not in self.ACCOUNT_TYPES:
             return {"status": "error", "message": "Invalid account type"}
         
-        self.accounts[account.account_number] = account
+        account = self.ACCOUNT_TYPES[account_type.lower()](holder_name, initial_balance)
+        with self.open_lock:
+            self._open(account)
+        self._commit()
         return {"status": "success", "message": f"Account created successfully!", "account_number": account.account_number}
     
+    def create_accounts(self, account_type, holders):
+        """Open many accounts from one reserved block of account numbers; holders are (name, initial balance)"""
+        if account_type.lower() not in self.ACCOUNT_TYPES:
+            return {"status": "error", "message": "Invalid account type"}
+        
+        account_class = self.ACCOUNT_TYPES[account_type.lower()]
+        numbers = BankAccount.account_numbers.reserve(len(holders))
+        with self.open_lock:
+            for (holder_name, initial_balance), number in zip(holders, numbers):
+                self._open(account_class(holder_name, initial_balance, account_number=number))
+        self._commit()
+        return {"status": "success", "message": f"{len(numbers)} accounts created", "account_numbers": numbers}
+    
+    def deposit(self, acc_num, amount):
+        """Deposit into an account"""
+        if acc_num not in self.accounts:
+            return {"status": "error", "message": "Invalid account number"}
+        with self._locked(acc_num):
+            ts = int(time.time())  # Taken under the lock, so each account sees its operations in time order
+            result = self.accounts[acc_num].deposit(amount, ts)
+            if result["status"] == "success":
+                self._log("deposit", ts=ts, account=acc_num, cents=to_cents(amount))
+        self._commit()
+        return result
+    
+    def withdraw(self, acc_num, amount):
+        """Withdraw from an account"""
+        if acc_num not in self.accounts:
+            return {"status": "error", "message": "Invalid account number"}
+        with self._locked(acc_num):
+            ts = int(time.time())
+            result = self.accounts[acc_num].withdraw(amount, ts, self.velocity)
+            if result["status"] == "success":
+                self._log("withdraw", ts=ts, account=acc_num, cents=to_cents(amount))
+        self._commit()
+        return result
+    
+    def balance_at(self, acc_num, when):
+        """Balance of one account as of a datetime"""
+        if acc_num not in self.accounts:
+            return {"status": "error", "message": "Invalid account number"}
+        with self._locked(acc_num):
+            balance = self.accounts[acc_num].balance_at(when)
+        return {"status": "success", "message": f"Balance at {when:%Y-%m-%d %H:%M}: ${balance}", "balance": balance}
+    
+    def balances_at(self, queries):
+        """Balances for many (account number, datetime) pairs at once, in query order (None for unknown accounts)"""
+        by_account = {}
+        for position, (acc_num, when) in enumerate(queries):
+            by_account.setdefault(acc_num, []).append(position)
+        results = [None] * len(queries)
+        for acc_num, positions in by_account.items():
+            account = self.accounts.get(acc_num)
+            if account is None:
+                continue
+            with self._locked(acc_num):
+                found = account.transactions.balances_at([queries[position][1].timestamp() for position in positions])
+                opening = account.opening_cents()
+            for position, cents in zip(positions, found):
+                results[position] = Money.from_cents(opening if cents is None else cents)
+        return results
+    
+    def calculate_interest(self, acc_num):
+        """Credit a savings account's monthly interest"""
+        account = self.accounts.get(acc_num)
+        if not isinstance(account, SavingsAccount):
+            return {"status": "error", "message": "Interest calculation is only available for savings accounts!"}
+        with self._locked(acc_num):
+            ts = int(time.time())
+            result = account.calculate_interest(ts)
+            self._log("deposit", ts=ts, account=acc_num, cents=result["amount"].cents)  # Replays as the exact amount
+        self._commit()
+        return result
+    
+    def accrue_interest(self, period=None):
+        """Credit one month of interest to every savings account in a single batch; reruns are no-ops.
+        period is "YYYY-MM" (default: this month)"""
+        try:
+            month = datetime.strptime(period, "%Y-%m") if period else datetime.now()
+        except ValueError:
+            return {"status": "error", "message": "Enter the period as YYYY-MM"}
+        period = f"{month.year:04d}-{month.month:02d}"  # The idempotency key: one spelling per month
+        with self.open_lock, self._locked(*self.accounts):
+            ts = int(time.time())
+            if period in self.accrued_periods:
+                return {"status": "error", "message": f"Interest for {period} has already been credited"}
+            count, total = self._accrue(period, ts)
+            # Replay recomputes the same amounts: it reaches this record with the same balances
+            self._log("accrue", ts=ts, period=period)
+        
+        self._commit()
+        return {"status": "success", "message": f"Interest for {period} credited to {count} accounts: ${total}",
+                "accounts": count, "total": total}
+    
+    def _accrue(self, period, ts):
+        """Compute and credit a period's interest (call while holding every account)"""
+        accounts = [account for account in self.accounts.values()
+                    if isinstance(account, SavingsAccount) and account.cents > 0]
+        balances = array("q", [account.cents for account in accounts])
+        by_rate = {}  # interest_rate -> positions in accounts; usually a single rate
+        for position, account in enumerate(accounts):
+            by_rate.setdefault(account.interest_rate, []).append(position)
+        interest = array("q", [0]) * len(accounts)
+        for positions in by_rate.values():
+            # One banker's-rounded pass per rate, the same rounding as calculate_interest
+            rate = accounts[positions[0]].monthly_rate()
+            column = apply_rate_all(array("q", [balances[position] for position in positions]), rate)
+            for position, cents in zip(positions, column):
+                interest[position] = cents
+        new_balances = array("q", map(operator.add, balances, interest))
+        
+        credit = TransactionLog.type_code("Credit")
+        count = 0
+        for account, cents, balance in zip(accounts, interest, new_balances):
+            if cents <= 0:
+                continue  # Rounds to nothing: calculate_interest would not credit it either
+            account.cents = balance
+            log = account.transactions
+            log.timestamps.append(ts)
+            log.types.append(credit)
+            log.amounts.append(cents)
+            log.balances.append(balance)
+            count += 1
+        self.accrued_periods.add(period)
+        return count, Money.from_cents(sum(interest))
+    
+    def settle_transfers(self, path, processes=None, chunk_size=100_000, progress=None):
+        """Settle a transfer file with the same results as calling transfer_money on each row in order.
+
+        Velocity limits are not checked for the file's rows (it is one authorized bulk job, and shards could
+        not check them without knowing each other's decisions), but settled rows count toward the windows.
+        """
+        shards = processes or os.cpu_count() or 1
+        pool = Pool(shards) if shards > 1 else None
+        totals = {"rows": 0, "settled": 0, "declined": 0}
+        start = time.perf_counter()
+        try:
+            for rows in read_transfers(path, chunk_size):
+                touched = {number for src, dst, _ in rows for number in (src, dst) if number in self.accounts}
+                with self._locked(*touched):
+                    ts = int(time.time())
+                    settled = self._settle_chunk(rows, shards, pool.map if pool else map, ts)
+                    self._log("settle", ts=ts, transfers=settled)
+                    for src, _, cents in settled:
+                        self._count_debit(src, Money.from_cents(cents), ts)
+                self._commit()
+                totals["rows"] += len(rows)
+                totals["settled"] += len(settled)
+                totals["declined"] += len(rows) - len(settled)
+                if progress:
+                    progress(f"{totals['rows']} rows settled")
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        
+        elapsed = time.perf_counter() - start
+        rate = totals["rows"] / elapsed if elapsed else 0.0
+        return {"status": "success", "rows_per_sec": rate, **totals,
+                "message": f"{totals['settled']} transfers settled, {totals['declined']} declined ({rate:,.0f} rows/sec)"}
+    
+    def _settle_chunk(self, rows, shards, mapper, ts):
+        """Settle rows across shards of accounts; return the transfers that went through, in order"""
+        # Every round, each shard judges the sides of the transfers it holds; a transfer between two shards
+        # goes through once both sides pass, and each shard learns the other's verdict in the next round.
+        shard_of = {}
+        tasks = [({}, {}, []) for _ in range(shards)]  # balances, overdraft limits, rows
+        crossing = [[] for _ in range(shards)]         # (row index, other shard) of rows shared with another shard
+        undecided = []
+        for index, (src, dst, amount) in enumerate(rows):
+            if src not in self.accounts or dst not in self.accounts or amount <= 0:
+                continue  # Declined, like transfer_money; shards rely on every amount being positive
+            for number in (src, dst):
+                if number not in shard_of:
+                    shard = shard_of[number] = len(shard_of) % shards
+                    account = self.accounts[number]
+                    tasks[shard][0][number] = account.cents
+                    tasks[shard][1][number] = to_cents(getattr(account, "overdraft_limit", 0))
+            row = (index, src, dst, amount)
+            undecided.append(index)
+            tasks[shard_of[src]][2].append(row)
+            if shard_of[dst] != shard_of[src]:
+                tasks[shard_of[dst]][2].append(row)
+                crossing[shard_of[src]].append((index, shard_of[dst]))
+                crossing[shard_of[dst]].append((index, shard_of[src]))
+        
+        known = {}   # Row index -> whether the transfer goes through
+        judged = {}  # (shard, row index) -> that shard's verdict on its side of a cross-shard transfer
+        codes = {name: TransactionLog.type_code(name) for name in ("Credit", "Debit")}
+        waiting = [shard for shard in range(shards) if tasks[shard][2]]
+        while waiting:
+            batch = [(*tasks[shard], {index: judged[other, index] for index, other in crossing[shard]
+                                      if (other, index) in judged})
+                     for shard in waiting]
+            for shard, (decisions, verdicts, done, balances, entries) in zip(waiting, mapper(_settle_shard, batch)):
+                known.update(decisions)
+                judged.update(((shard, index), verdict) for index, verdict in verdicts.items())
+                # The settled prefix is final: record it and resume after it next round
+                _, limits, remaining = tasks[shard]
+                tasks[shard] = (balances, limits, remaining[done:])
+                for number, added in entries.items():
+                    log = self.accounts[number].transactions
+                    for type_, amount, after in added:
+                        log.timestamps.append(ts)
+                        log.types.append(codes[type_])
+                        log.amounts.append(amount)
+                        log.balances.append(after)
+            waiting = [shard for shard in waiting if tasks[shard][2]]
+            still = [index for index in undecided if index not in known]
+            if waiting and len(still) * 2 > len(undecided):
+                # Under half decided: a chain of transfers through several shards, which would take a round
+                # per hop. Settle what is left here instead, in one pass in file order
+                self._settle_in_order(tasks, shard_of, known, codes, ts)
+                break
+            undecided = still
+        
+        for balances, _, _ in tasks:
+            for number, balance in balances.items():
+                self.accounts[number].cents = balance
+        return [rows[index] for index in sorted(index for index, ok in known.items() if ok)]
+    
+    def _settle_in_order(self, tasks, shard_of, known, codes, ts):
+        """Settle the rows every shard has left in file order, as transfer_money would, adding them to known"""
+        balances, limits, left = {}, {}, {}
+        for shard, (shard_balances, shard_limits, remaining) in enumerate(tasks):
+            balances.update(shard_balances)
+            limits.update(shard_limits)
+            for row in remaining:
+                left.setdefault(row[0], [row, set()])[1].add(shard)  # Shards still to apply the row
+        
+        for index in sorted(left):
+            (_, src, dst, amount), holders = left[index]
+            ok = known.get(index)
+            if ok is None:  # Neither side is settled yet, so both balances are exact here
+                ok = known[index] = (amount <= balances[src] + limits[src]
+                                     and (dst == src or balances[dst] + amount <= MAX_CENTS))
+            if not ok:
+                continue
+            for number, type_, change in ((src, "Debit", -amount), (dst, "Credit", amount)):
+                if shard_of[number] in holders:
+                    balances[number] += change
+                    log = self.accounts[number].transactions
+                    log.timestamps.append(ts)
+                    log.types.append(codes[type_])
+                    log.amounts.append(amount)
+                    log.balances.append(balances[number])
+        
+        for shard, (shard_balances, shard_limits, _) in enumerate(tasks):
+            tasks[shard] = ({number: balances[number] for number in shard_balances}, shard_limits, [])
+    
     def transfer_money(self, from_acc_num, to_acc_num, amount):
         """Transfer money between accounts"""
         if from_acc_num not in self.accounts or to_acc_num not in self.accounts:
@@ -125,14 +991,534 @@ class Bank:
         from_account = self.accounts[from_acc_num]
         to_account = self.accounts[to_acc_num]
         
-        # Try withdrawal first
-        withdrawal = from_account.withdraw(amount)
-        if withdrawal["status"] == "error":
-            return withdrawal
+        with self._locked(from_acc_num, to_acc_num):
+            ts = int(time.time())
+            # Try withdrawal first
+            withdrawal = from_account.withdraw(amount, ts, self.velocity)
+            if withdrawal["status"] == "error":
+                return withdrawal
+            
+            # If withdrawal successful, deposit to recipient; undo the withdrawal if that fails
+            cents = to_cents(amount)
+            deposit = to_account.deposit(amount, ts)
+            if deposit["status"] == "error":
+                from_account.cents += cents
+                from_account.transactions.pop()
+                if self.velocity is not None:
+                    self.velocity.cancel(from_acc_num)
+                return deposit
+            self._log("transfer", ts=ts, **{"from": from_acc_num, "to": to_acc_num, "cents": cents})
+        
+        self._commit()
+        return {"status": "success", "message": f"Transferred ${Money.from_cents(cents)} successfully"}
+
+def benchmark_memory(num_accounts=20000, transactions_per_account=50):
+    """Bytes per account: the old __dict__ layout against __slots__ with a TransactionLog"""
+    def plain_account(i):
+        # Attribute layout of BankAccount before __slots__: one dict per transaction
+        account = SimpleNamespace(account_number=f"{i:010d}", account_holder=f"Holder {i}",
+                                  balance=0.0, transactions=[], created_date="2024-01-01 09:00")
+        for j in range(transactions_per_account):
+            account.balance += 10.0
+            account.transactions.append({"date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                         "type": "Credit", "amount": 10.0, "balance": account.balance})
+        return account
+
+    def slots_account(i):
+        account = BankAccount(f"Holder {i}")
+        for j in range(transactions_per_account):
+            account._add_transaction("Credit", 1000, account.cents + 1000)
+        return account
+
+    def measure(factory):
+        tracemalloc.start()
+        accounts = [factory(i) for i in range(num_accounts)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del accounts
+        return size / num_accounts
+
+    print(f"\nMemory benchmark ({num_accounts} accounts x {transactions_per_account} transactions, bytes per account)")
+    print(f"BankAccount (__dict__):  {measure(plain_account):8.0f}")
+    print(f"BankAccount (__slots__): {measure(slots_account):8.0f}")
+
+def benchmark_ledger(num_transactions=1_000_000):
+    """Per-transaction memory and append speed: a list of dicts against the columnar TransactionLog"""
+    def dict_ledger():
+        transactions = []
+        balance = 0.0
+        for i in range(num_transactions):
+            balance += 10.0
+            transactions.append({"date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                                 "type": "Credit", "amount": 10.0, "balance": balance})
+        return transactions
+
+    def columnar_ledger():
+        transactions = TransactionLog()
+        append = transactions.append
+        balance = 0
+        for i in range(num_transactions):
+            balance += 1000  # Cents
+            append("Credit", 1000, balance)
+        return transactions
+
+    def measure(factory):
+        start = time.perf_counter()
+        factory()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        ledger = factory()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del ledger
+        return size / num_transactions, num_transactions / elapsed
+
+    print(f"\nLedger benchmark ({num_transactions} transactions)")
+    dict_bytes, dict_rate = measure(dict_ledger)
+    array_bytes, array_rate = measure(columnar_ledger)
+    print(f"list of dicts:   {dict_bytes:6.1f} bytes/txn  {dict_rate:12,.0f} appends/sec")
+    print(f"TransactionLog:  {array_bytes:6.1f} bytes/txn  {array_rate:12,.0f} appends/sec")
+    print(f"Memory {dict_bytes / array_bytes:.1f}x smaller, appends {array_rate / dict_rate:.1f}x faster")
+
+    account = BankAccount("Benchmark")
+    account.transactions = columnar_ledger()
+    start = time.perf_counter()
+    account.get_statement()
+    print(f"get_statement:   {time.perf_counter() - start:.2f}s for {num_transactions} rows")
+
+def benchmark_recovery(histories=(50_000, 100_000, 200_000), num_accounts=1000, snapshot_every=10_000):
+    """Recovery time as history grows: snapshot + tail replay against replaying the whole ledger"""
+    print(f"\nRecovery benchmark ({num_accounts} accounts, snapshot every {snapshot_every} records)")
+    for operations in histories:
+        times = []
+        for every in (snapshot_every, operations * 2):  # The second never snapshots
+            with tempfile.TemporaryDirectory() as tmp:
+                paths = {"ledger_path": os.path.join(tmp, "bank.ledger"),
+                         "snapshot_path": os.path.join(tmp, "bank.snapshot")}
+                bank = Bank(snapshot_every=every, group_commit=1000, **paths)
+                numbers = bank.create_accounts("savings", [(f"Holder {i}", 1000.0) for i in range(num_accounts)])["account_numbers"]
+                for i in range(operations):
+                    bank.deposit(numbers[i % num_accounts], 10.0)
+                bank.close()
+                balances = {number: account.balance for number, account in bank.accounts.items()}
+                
+                start = time.perf_counter()
+                recovered = Bank(**paths)
+                times.append(time.perf_counter() - start)
+                recovered.close()
+                assert {number: account.balance for number, account in recovered.accounts.items()} == balances
+        print(f"{operations:>8} operations: snapshot + tail {times[0]:.3f}s, full replay {times[1]:.3f}s")
+
+def statement_period(since, until):
+    """start/end for statement_lines from YYYY-MM-DD strings (either may be empty); until's day is included"""
+    start = datetime.strptime(since, "%Y-%m-%d") if since else None
+    end = datetime.strptime(until, "%Y-%m-%d") + timedelta(days=1) if until else None
+    return start, end
+
+def check_money_conservation(bank, expected_total):
+    """Return a list of problems: money created or destroyed, balances out of step with their ledgers"""
+    problems = []
+    total = Money.from_cents(sum(account.cents for account in bank.accounts.values()))
+    if total != expected_total:  # Whole cents: exact, no tolerance
+        problems.append(f"total balance {total} != {Money(expected_total)}")
+    for number, account in bank.accounts.items():
+        log = account.transactions
+        if len(log) and log.balances[-1] != account.cents:
+            problems.append(f"account {number}: balance {account.balance} != last ledger balance "
+                            f"{Money.from_cents(log.balances[-1])}")
+    return problems
+
+def benchmark_transfers(thread_counts=(1, 2, 4, 8), transfers=40_000, num_accounts=1000):
+    """Transfers/sec from 1..N threads, checking after each run that no money was created or lost"""
+    print(f"\nTransfer benchmark ({transfers} transfers, {num_accounts} accounts)")
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # Switch threads often to expose races
+    try:
+        for num_threads in thread_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                bank = Bank(os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"),
+                            snapshot_every=20_000, group_commit=1000)
+                numbers = bank.create_accounts("current", [(f"Holder {i}", 100.0) for i in range(num_accounts)])["account_numbers"]
+                expected = 100.0 * num_accounts
+
+                def worker(seed):
+                    rng = random.Random(seed)
+                    for _ in range(transfers // num_threads):
+                        # Large amounts run accounts into their overdraft limit, so some transfers are declined
+                        bank.transfer_money(rng.choice(numbers), rng.choice(numbers), rng.choice((5.0, 50.0, 500.0)))
+
+                threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(num_threads)]
+                start = time.perf_counter()
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+                elapsed = time.perf_counter() - start
+                bank.close()
+
+                problems = check_money_conservation(bank, expected)
+                recovered = Bank(os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"))
+                problems += check_money_conservation(recovered, expected)
+                if any(recovered.accounts[n].balance != bank.accounts[n].balance for n in numbers):
+                    problems.append("recovered balances do not match the in-memory state")
+                recovered.close()
+            status = "conserved" if not problems else f"FAILED: {problems[0]}"
+            print(f"{num_threads} thread(s): {transfers / elapsed:10,.0f} transfers/sec  ({status})")
+    finally:
+        sys.setswitchinterval(old_interval)
+
+def benchmark_interest(num_accounts=200_000):
+    """Month-end interest: one calculate_interest call per account against one accrue_interest batch"""
+    print(f"\nInterest benchmark ({num_accounts} savings accounts)")
+    times = []
+    totals = []
+    for batch in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            bank = Bank(os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"),
+                        snapshot_every=10 * num_accounts, group_commit=1000)
+            numbers = bank.create_accounts("savings", [(f"Holder {i}", 100.0 + i) for i in range(num_accounts)])["account_numbers"]
+            start = time.perf_counter()
+            if batch:
+                bank.accrue_interest("2024-01")
+            else:
+                for number in numbers:
+                    bank.calculate_interest(number)
+            times.append(time.perf_counter() - start)
+            totals.append(sum(account.cents for account in bank.accounts.values()))
+            rerun = bank.accrue_interest("2024-01")["status"] if batch else None
+            bank.close()
+    print(f"Per account:   {times[0]:.2f}s")
+    print(f"Batch accrual: {times[1]:.2f}s ({times[0] / times[1]:.1f}x faster, "
+          f"{'same' if totals[0] == totals[1] else 'DIFFERENT'} balances, rerun: {rerun})")
+
+def benchmark_statements(years=10, transactions_per_day=200):
+    """One month's page from a long history against rendering the whole statement"""
+    account = BankAccount("Benchmark")
+    first_day = datetime(2015, 1, 1).timestamp()
+    days = years * 365
+    for i in range(days * transactions_per_day):
+        account.cents += 1000
+        account.transactions.append("Credit", 1000, account.cents,
+                                    first_day + i * 86400 // transactions_per_day)
+    print(f"\nStatement benchmark ({len(account.transactions)} transactions over {years} years)")
+
+    start = time.perf_counter()
+    account.get_statement()
+    full = time.perf_counter() - start
+
+    month = (datetime(2020, 6, 1), datetime(2020, 7, 1))
+    start = time.perf_counter()
+    for page in range(1, 11):
+        for _ in account.statement_lines(*month, page=page):
+            pass
+    paged = (time.perf_counter() - start) / 10
+    lines = sum(1 for _ in account.statement_lines(*month, page=1))
+    print(f"Full statement:        {full * 1000:9.1f} ms")
+    print(f"One month, one page:   {paged * 1000:9.3f} ms ({lines} lines)")
+
+def benchmark_point_in_time(num_accounts=1000, transactions_per_account=2000, num_queries=200_000):
+    """Balance-at-T lookups: walking each history against binary search, one by one and batched"""
+    print(f"\nPoint-in-time benchmark ({num_accounts} accounts x {transactions_per_account} transactions, "
+          f"{num_queries} queries)")
+    rng = random.Random(7)
+    first_day = datetime(2020, 1, 1).timestamp()
+    span = 3 * 365 * 86400
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = Bank(os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"))
+        numbers = bank.create_accounts("current", [(f"Holder {i}", 100.0) for i in range(num_accounts)])["account_numbers"]
+        for number in numbers:
+            account = bank.accounts[number]
+            for ts in sorted(rng.randrange(span) + first_day for _ in range(transactions_per_account)):
+                cents = rng.randrange(1, 10_000)
+                type_ = "Credit" if rng.random() < 0.6 else "Debit"
+                account.cents += cents if type_ == "Credit" else -cents
+                account.transactions.append(type_, cents, account.cents, ts)
+        queries = [(rng.choice(numbers), datetime.fromtimestamp(first_day + rng.randrange(span)))
+                   for _ in range(num_queries)]
+        bank.close()
+    
+    def walk(account, when):
+        # What a flat history allows: scan rows until one is after when
+        cents = account.opening_cents()
+        log = account.transactions
+        for ts, balance in zip(log.timestamps, log.balances):
+            if ts > when.timestamp():
+                break
+            cents = balance
+        return Money.from_cents(cents)
+    
+    sample = queries[:1000]
+    start = time.perf_counter()
+    walked = [walk(bank.accounts[number], when) for number, when in sample]
+    walk_rate = len(sample) / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    single = [bank.balance_at(number, when)["balance"] for number, when in queries]
+    single_rate = num_queries / (time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    batched = bank.balances_at(queries)
+    batch_rate = num_queries / (time.perf_counter() - start)
+    
+    same = single == batched and walked == batched[:len(sample)]
+    print(f"Linear walk:       {walk_rate:12,.0f} queries/sec")
+    print(f"balance_at:        {single_rate:12,.0f} queries/sec")
+    print(f"balances_at batch: {batch_rate:12,.0f} queries/sec ({'same answers' if same else 'MISMATCH'})")
+
+def benchmark_velocity(num_accounts=1_000_000, num_debits=2_000_000, hours=24, window=3600):
+    """Velocity checks/sec and accounts held in memory: VelocityLimiter against rebuilt per-account lists"""
+    print(f"\nVelocity benchmark ({num_debits} debits over {hours}h across {num_accounts} accounts, {window}s window)")
+    rng = random.Random(3)
+    start_ts = 1_700_000_000
+    step = hours * 3600 / num_debits
+    debits = [(f"{rng.randrange(num_accounts):010d}", rng.randrange(100, 50_000)) for _ in range(num_debits)]
+    
+    def naive(sample):
+        # The RateLimiter approach, one list per account: rebuilt on every call and never forgotten
+        calls = {}
+        refused = 0
+        for i, (key, cents) in enumerate(sample):
+            now = start_ts + i * step
+            recent = [(ts, c) for ts, c in calls.get(key, ()) if now - ts < window]
+            if len(recent) >= 3 or sum(c for _, c in recent) + cents > 100_000:
+                refused += 1
+            else:
+                recent.append((now, cents))
+            calls[key] = recent
+        return refused, len(calls)
+    
+    def limited(sample):
+        limiter = VelocityLimiter(max_debits=3, max_amount=1000, window=window)
+        refused = peak = 0
+        for i, (key, cents) in enumerate(sample):
+            if limiter.allow(key, cents, start_ts + i * step):
+                refused += 1
+            if not i % 1000:
+                peak = max(peak, len(limiter.windows))
+        return refused, peak
+    
+    for name, check in (("rebuilt lists", naive), ("VelocityLimiter", limited)):
+        start = time.perf_counter()
+        refused, held = check(debits)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16} {num_debits / elapsed:12,.0f} checks/sec  {refused:8} refused  {held:9,} accounts held")
+
+def benchmark_settlement(num_rows=200_000, num_accounts=5000, process_counts=(1, 2, 4)):
+    """Rows/sec settling a transfer file: transfer_money row by row against settle_transfers"""
+    print(f"\nSettlement benchmark ({num_rows} transfers, {num_accounts} accounts)")
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        def open_bank(name):
+            return Bank(os.path.join(tmp, name + ".ledger"), os.path.join(tmp, name + ".snapshot"),
+                        snapshot_every=10 * num_rows, group_commit=1000)
+        
+        reference = open_bank("reference")
+        numbers = reference.create_accounts("savings", [(f"Holder {i}", 100.0) for i in range(num_accounts // 2)])["account_numbers"]
+        numbers += reference.create_accounts("current", [(f"Holder {i}", 0.0) for i in range(num_accounts // 2)])["account_numbers"]
+        states = [account.to_state() for account in reference.accounts.values()]
+        
+        path = os.path.join(tmp, "transfers.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["from", "to", "amount"])
+            for _ in range(num_rows):
+                writer.writerow([rng.choice(numbers), rng.choice(numbers), rng.choice((10, 25.5, 80, 400))])
         
-        # If withdrawal successful, deposit to recipient
-        deposit = to_account.deposit(amount)
-        return {"status": "success", "message": f"Transferred ${amount:.2f} successfully"}
+        start = time.perf_counter()
+        for rows in read_transfers(path):
+            for src, dst, cents in rows:
+                reference.transfer_money(src, dst, Money.from_cents(cents))
+        print(f"transfer_money loop:      {num_rows / (time.perf_counter() - start):10,.0f} rows/sec")
+        
+        def columns(account):
+            log = account.transactions
+            return account.cents, log.types.tobytes(), log.amounts.tobytes(), log.balances.tobytes()
+        expected = {number: columns(account) for number, account in reference.accounts.items()}
+        reference.close()
+        
+        for processes in process_counts:
+            bank = open_bank(f"batch{processes}")
+            bank.accounts = {state["account_number"]: BankAccount.from_state(state) for state in states}
+            result = bank.settle_transfers(path, processes=processes, chunk_size=50_000)
+            same = {number: columns(account) for number, account in bank.accounts.items()} == expected
+            bank.close()
+            print(f"settle_transfers ({processes} proc): {result['rows_per_sec']:10,.0f} rows/sec  "
+                  f"({'same balances and transaction order' if same else 'MISMATCH'} as sequential)")
+
+def check_statements():
+    """Return a list of problems with date-range and paged statements"""
+    problems = []
+    account = SavingsAccount("Check", account_number="0000000000")
+    day = datetime(2024, 3, 5)
+    for hour in (9, 13, 17):
+        account.deposit(10, (day + timedelta(hours=hour)).timestamp())
+    lines = list(account.statement_lines(*statement_period("2024-03-05", "2024-03-05")))
+    if sum(line.startswith("2024-03-05") for line in lines) != 3:
+        problems.append("a one-day statement does not list that day's 3 transactions")
+    if "Transaction History (2024-03-05 to 2024-03-05):" not in lines:
+        problems.append("a one-day statement is not headed with that day")
+    for page in (0, -1):
+        try:
+            list(account.statement_lines(page=page))
+            problems.append(f"statement page {page} was not refused")
+        except ValueError:
+            pass
+    return problems
+
+def check_amounts():
+    """Return a list of problems with amounts too large to store: refused, with nothing changed"""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = Bank(os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"))
+        acc_num = bank.create_account("savings", "Check", 100)["account_number"]
+        account = bank.accounts[acc_num]
+        for amount in (100000000000000000, "1e30", float(2 ** 70), MAX_CENTS // 100):
+            for operation in (bank.deposit, bank.withdraw):
+                result = operation(acc_num, amount)
+                if result["status"] != "error":
+                    problems.append(f"{operation.__name__}({amount!r}) was not refused")
+            if account.cents != 10000 or len(account.transactions) != 0:
+                problems.append(f"refusing {amount!r} changed the account: {account.balance}, "
+                                f"{len(account.transactions)} transactions")
+        try:
+            Money("1e30")
+            problems.append("Money('1e30') was accepted")
+        except ValueError:
+            pass
+        try:
+            TransactionLog().append("Credit", 1, 2 ** 63)
+            problems.append("TransactionLog accepted a balance past the int64 range")
+        except OverflowError:
+            pass
+        bank.close()
+    return problems
+
+def check_velocity():
+    """Return a list of problems with velocity windows fed debits out of time order, and with unchecked records"""
+    problems = []
+    limiter = VelocityLimiter(max_debits=3, window=10)
+    try:
+        limiter.allow("A", 1, 101)
+        limiter.allow("B", 1, 100)  # Older than A's debit, yet added after it
+        limiter.allow("B", 1, 110)
+        limiter.record("C", 1, 120)
+        limiter.record("C", 1, 115)
+        limiter.cancel("C")
+        limiter.allow("C", 1, 200)
+    except IndexError as error:
+        problems.append(f"out-of-order debits raised IndexError: {error}")
+    refused = [limiter.allow("D", 1, now) for now in (300, 299, 298, 301)]
+    if refused[:3] != [None, None, None] or refused[3] is None:
+        problems.append(f"4 debits in one window (some out of order) gave {refused}")
+    if limiter.allow("D", 1, 312) is not None:
+        problems.append("a debit after the window passed was refused")
+    
+    limiter = VelocityLimiter(max_amount=1000, window=60)
+    for now in range(100_000):
+        limiter.record("E", 1, now)
+    if len(limiter.windows["E"][0]) > 60 or limiter.windows["E"][1] != len(limiter.windows["E"][0]):
+        problems.append(f"record() kept {len(limiter.windows['E'][0])} debits for a 60s window")
+    return problems
+
+def check_accrual():
+    """Return a list of problems with accruing interest for the same month written different ways"""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = Bank(os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"))
+        number = bank.create_account("savings", "Check", 1000)["account_number"]
+        if bank.accrue_interest("2024-01")["status"] != "success":
+            problems.append("interest for 2024-01 was not credited")
+        balance = bank.accounts[number].cents
+        for period in ("2024-01", "2024-1", "2024-01 ", "Jan 2024", "2024-13", "2024/01"):
+            if bank.accrue_interest(period)["status"] != "error":
+                problems.append(f"period {period!r} credited interest again")
+        if bank.accounts[number].cents != balance:
+            problems.append(f"balance moved from {balance} to {bank.accounts[number].cents} cents on reruns")
+        bank.close()
+    return problems
+
+def check_settlement(chain=2000):
+    """Return a list of problems with settling a file that is one long chain of dependent transfers,
+    ending in credits that would take a balance past MAX_CENTS"""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        bank = Bank(os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"),
+                    snapshot_every=10 * chain, group_commit=chain)
+        holders = [("Holder 0", 100)] + [(f"Holder {i}", 0) for i in range(1, chain + 1)]
+        numbers = bank.create_accounts("savings", holders)["account_numbers"]
+        full = bank.create_account("savings", "Full", Money.from_cents(MAX_CENTS - 50))["account_number"]
+        path = os.path.join(tmp, "transfers.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["from", "to", "amount"])
+            for src, dst in zip(numbers, numbers[1:]):
+                writer.writerow([src, dst, 100])  # Each account passes on what it was just paid
+            writer.writerow([numbers[-1], full, 100])  # Past MAX_CENTS: declined, as by transfer_money
+            writer.writerow([numbers[-1], full, 0.5])
+        start = time.perf_counter()
+        result = bank.settle_transfers(path, processes=4)
+        elapsed = time.perf_counter() - start
+        if (result["settled"], result["declined"]) != (chain + 1, 1):
+            problems.append(f"settled {result['settled']} and declined {result['declined']} of the chain")
+        if (bank.accounts[numbers[-1]].cents, bank.accounts[full].cents) != (9950, MAX_CENTS):
+            problems.append(f"chain ended with balances {bank.accounts[numbers[-1]].cents} and "
+                            f"{bank.accounts[full].cents} cents")
+        if elapsed > 5:
+            problems.append(f"a {chain}-transfer chain took {elapsed:.1f}s to settle")
+        bank.close()
+    return problems
+
+def check_snapshots():
+    """Return a list of problems reloading a snapshot plus ledger, and refusing a corrupt snapshot"""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = (os.path.join(tmp, "bank.ledger"), os.path.join(tmp, "bank.snapshot"))
+        bank = Bank(*paths, snapshot_every=5)
+        acc_num = bank.create_account("savings", "Check", 100)["account_number"]
+        for _ in range(12):
+            bank.deposit(acc_num, "0.25")
+        bank.close()
+        reloaded = Bank(*paths)
+        if reloaded.accounts[acc_num].cents != 10300 or len(reloaded.accounts[acc_num].transactions) != 12:
+            problems.append("snapshot + ledger did not reload to the same account")
+        reloaded.close()
+        
+        with open(paths[1], "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+        try:
+            Bank(*paths).close()
+            problems.append("a snapshot with a flipped byte loaded")
+        except ValueError:
+            pass
+    return problems
+
+def run_checks():
+    """Run the banking self-checks; return whether they all passed"""
+    problems = (check_statements() + check_amounts() + check_money() + check_velocity() + check_accrual()
+                + check_settlement() + check_snapshots())
+    print("\nBanking checks")
+    if problems:
+        print(f"FAILED: {len(problems)} problems, e.g. {problems[0]}")
+    else:
+        print("PASSED: all checks")
+    return not problems
+
+def run_benchmarks():
+    """Run all banking benchmarks"""
+    benchmark_memory()
+    benchmark_ledger()
+    benchmark_recovery()
+    benchmark_transfers()
+    benchmark_interest()
+    benchmark_statements()
+    benchmark_settlement()
+    benchmark_point_in_time()
+    benchmark_velocity()
+    benchmark_ids()
+    benchmark_money()
 
 def main():
     bank = Bank()
@@ -146,15 +1532,16 @@ def main():
         print("5. Check Balance")
         print("6. Account Statement")
         print("7. Calculate Interest (Savings)")
-        print("8. Exit")
+        print("8. Month-end Interest (all Savings)")
+        print("9. Exit")
         
-        choice = input("\nEnter your choice (1-8): ")
+        choice = input("\nEnter your choice (1-9): ")
         
         if choice == "1":
             name = input("Enter account holder name: ")
             acc_type = input("Enter account type (savings/current): ")
             try:
-                initial = float(input("Enter initial deposit amount: "))
+                initial = Money(input("Enter initial deposit amount: "))
                 result = bank.create_account(acc_type, name, initial)
                 print(f"\n{result['message']}")
                 if result['status'] == 'success':
@@ -172,16 +1559,16 @@ def main():
             
             if choice == "2":
                 try:
-                    amount = float(input("Enter deposit amount: "))
-                    result = account.deposit(amount)
+                    amount = Money(input("Enter deposit amount: "))
+                    result = bank.deposit(acc_num, amount)
                     print(f"\n{result['message']}")
                 except ValueError:
                     print("Please enter a valid amount!")
             
             elif choice == "3":
                 try:
-                    amount = float(input("Enter withdrawal amount: "))
-                    result = account.withdraw(amount)
+                    amount = Money(input("Enter withdrawal amount: "))
+                    result = bank.withdraw(acc_num, amount)
                     print(f"\n{result['message']}")
                 except ValueError:
                     print("Please enter a valid amount!")
@@ -189,26 +1576,44 @@ def main():
             elif choice == "4":
                 to_acc = input("Enter recipient's account number: ")
                 try:
-                    amount = float(input("Enter transfer amount: "))
+                    amount = Money(input("Enter transfer amount: "))
                     result = bank.transfer_money(acc_num, to_acc, amount)
                     print(f"\n{result['message']}")
                 except ValueError:
                     print("Please enter a valid amount!")
             
             elif choice == "5":
-                print(f"\nCurrent Balance: ${account.balance:.2f}")
+                when = input("As of (YYYY-MM-DD HH:MM, press Enter for now): ")
+                if not when:
+                    print(f"\nCurrent Balance: ${account.balance:.2f}")
+                else:
+                    try:
+                        result = bank.balance_at(acc_num, datetime.strptime(when, "%Y-%m-%d %H:%M"))
+                        print(f"\n{result['message']}")
+                    except ValueError:
+                        print("Please enter the time as YYYY-MM-DD HH:MM!")
             
             elif choice == "6":
-                print(account.get_statement())
+                try:
+                    since = input("From date (YYYY-MM-DD, press Enter for all history): ")
+                    until = input("Up to date (YYYY-MM-DD, press Enter for today): ") if since else ""
+                    print()
+                    start, end = statement_period(since, until)
+                    account.write_statement(sys.stdout, start=start, end=end)
+                except ValueError:
+                    print("Please enter dates as YYYY-MM-DD!")
             
             elif choice == "7":
-                if isinstance(account, SavingsAccount):
-                    result = account.calculate_interest()
-                    print(f"\n{result['message']}")
-                else:
-                    print("Interest calculation is only available for savings accounts!")
+                result = bank.calculate_interest(acc_num)
+                print(f"\n{result['message']}")
         
         elif choice == "8":
+            period = input("Enter period (YYYY-MM, press Enter for this month): ") or None
+            result = bank.accrue_interest(period)
+            print(f"\n{result['message']}")
+        
+        elif choice == "9":
+            bank.close()
             print("Thank you for using our Banking System!")
             break
         
@@ -216,4 +1621,9 @@ def main():
             print("Invalid choice! Please try again.")
 
 if __name__ == "__main__":
-    main()
+    if "--benchmark" in sys.argv:
+        run_benchmarks()
+    elif "--check" in sys.argv:
+        sys.exit(0 if run_checks() else 1)
+    else:
+        main()
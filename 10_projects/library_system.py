@@ -6,22 +6,80 @@
 # 3. Fine Calculation
 # 4. Search Functionality
 # 5. Book Recommendations
+# 6. Indexed Search (token and trigram postings)
+# 7. Append-only Journal with Snapshot Compaction
+# 8. Optional SQLite Storage Backend
+# 9. Due-date Index with Batch Overdue/Fine Processing
+# 10. Co-borrowing Recommendation Engine
+# 11. Compact __slots__ Records
+# 12. Bulk Catalog Import (CSV / JSON Lines)
+# 13. Thread-safe Mode with Striped Locks
+# 14. Fuzzy, Ranked Search (n-gram candidates + edit distance)
+# 15. Book Ratings with Per-category Top-rated Leaderboards
+# 16. Sequential Member IDs with Check Digits (shared id_allocator module)
 
 from datetime import datetime, timedelta
+import csv
 import json
+import os
 import random
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import heapq
+import math
+import zlib
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left, insort
+from contextlib import contextmanager, nullcontext
+from multiprocessing import Pool
+from types import SimpleNamespace
+
+from id_allocator import IdAllocator
 
 class Book:
     """Represents a book in the library"""
+    __slots__ = ("title", "author", "isbn", "category", "total_copies",
+                 "available_copies", "borrowers", "rating_count", "rating_sum", "rating_histogram")
+    
     def __init__(self, title, author, isbn, category, copies=1):
         self.title = title
-        self.author = author
+        self.author = sys.intern(author)      # Authors and categories repeat across the catalog
         self.isbn = isbn
-        self.category = category
+        self.category = sys.intern(category)
         self.total_copies = copies
         self.available_copies = copies
         self.borrowers = []  # List of current borrowers
-        self.ratings = []    # List of ratings (1-5 stars)
+        self.ratings = []    # Kept as running aggregates, not one entry per rating
+    
+    @property
+    def ratings(self):
+        """All ratings (1-5 stars), rebuilt from the histogram in ascending order"""
+        return [stars for stars in range(1, 6) for _ in range(self.rating_histogram[stars - 1])]
+    
+    @ratings.setter
+    def ratings(self, values):
+        self.rating_histogram = array("q", [0] * 5)  # Count of 1..5 star ratings
+        self.rating_count = 0
+        self.rating_sum = 0
+        for stars in values:
+            self.add_rating(stars)
+    
+    def add_rating(self, stars):
+        """Fold one rating into the aggregates"""
+        self.rating_histogram[stars - 1] += 1
+        self.rating_count += 1
+        self.rating_sum += stars
+    
+    @property
+    def average_rating(self):
+        """Mean rating, or 0.0 if unrated"""
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
     
     def to_dict(self):
         """Convert book to dictionary for JSON storage"""
@@ -32,8 +90,8 @@ class Book:
             "category": self.category,
             "total_copies": self.total_copies,
             "available_copies": self.available_copies,
-            "borrowers": self.borrowers,
-            "ratings": self.ratings
+            "borrowers": list(self.borrowers),
+            "rating_histogram": list(self.rating_histogram)
         }
     
     @classmethod
@@ -41,18 +99,48 @@ class Book:
         """Create book from dictionary"""
         book = cls(data["title"], data["author"], data["isbn"], data["category"], data["total_copies"])
         book.available_copies = data["available_copies"]
-        book.borrowers = data["borrowers"]
-        book.ratings = data["ratings"]
+        book.borrowers = [sys.intern(member_id) for member_id in data["borrowers"]]
+        book.rating_histogram = array("q", data["rating_histogram"])
+        book.rating_count = sum(book.rating_histogram)
+        book.rating_sum = sum(stars * count for stars, count in enumerate(book.rating_histogram, 1))
         return book
 
+class BorrowRecord:
+    """One completed borrow; reads like the dict it replaces (record["title"])"""
+    __slots__ = ("isbn", "title", "borrow_date", "return_date", "fine")
+    
+    def __init__(self, isbn, title, borrow_date, return_date, fine):
+        self.isbn = isbn
+        self.title = title
+        self.borrow_date = sys.intern(borrow_date)  # Dates repeat across records
+        self.return_date = sys.intern(return_date)
+        self.fine = fine
+    
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def to_dict(self):
+        """Convert record to dictionary for JSON storage"""
+        return {key: getattr(self, key) for key in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Create record from dictionary"""
+        return cls(data["isbn"], data["title"], data["borrow_date"], data["return_date"], data["fine"])
+
 class Member:
     """Represents a library member"""
+    __slots__ = ("name", "member_id", "borrowed_books", "history", "fines", "accrued_fines")
+    
     def __init__(self, name, member_id):
         self.name = name
-        self.member_id = member_id
+        self.member_id = sys.intern(member_id)  # Shared with every Book.borrowers entry
         self.borrowed_books = {}  # ISBN: borrow_date
-        self.history = []        # List of past borrows
+        self.history = []        # List of past borrows (BorrowRecord)
         self.fines = 0.0        # Total unpaid fines
+        self.accrued_fines = {}  # ISBN: fine already charged on a current loan
     
     def to_dict(self):
         """Convert member to dictionary for JSON storage"""
@@ -60,8 +148,9 @@ class Member:
             "name": self.name,
             "member_id": self.member_id,
             "borrowed_books": {k: v.strftime("%Y-%m-%d") for k, v in self.borrowed_books.items()},
-            "history": self.history,
-            "fines": self.fines
+            "history": [record.to_dict() for record in self.history],
+            "fines": self.fines,
+            "accrued_fines": dict(self.accrued_fines)
         }
     
     @classmethod
@@ -70,128 +159,823 @@ class Member:
         member = cls(data["name"], data["member_id"])
         member.borrowed_books = {k: datetime.strptime(v, "%Y-%m-%d") 
                                for k, v in data["borrowed_books"].items()}
-        member.history = data["history"]
+        member.history = [BorrowRecord.from_dict(record) for record in data["history"]]
         member.fines = data["fines"]
+        member.accrued_fines = data.get("accrued_fines", {})
         return member
 
-class Library:
-    """Library management system"""
-    def __init__(self, name):
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j-1] + 1, previous[j-1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+def fuzzy_score(query, text):
+    """Similarity in [0, 1]: trigram overlap blended with edit distance to the closest words"""
+    query, text = query.lower(), text.lower()
+    query_grams = SearchIndex.make_trigrams(" " + query + " ", pad=False)
+    text_grams = SearchIndex.make_trigrams(" " + text + " ", pad=False)
+    overlap = len(query_grams & text_grams) / len(query_grams) if query_grams else 0.0
+    
+    # Compare the query with every run of as many words as it has
+    query_tokens = SearchIndex.tokenize(query)
+    text_tokens = SearchIndex.tokenize(text)
+    width = max(1, len(query_tokens))
+    query_text = " ".join(query_tokens)
+    closeness = 0.0
+    for i in range(max(1, len(text_tokens) - width + 1)):
+        window = " ".join(text_tokens[i:i+width])
+        longest = max(len(query_text), len(window)) or 1
+        if 1 - abs(len(query_text) - len(window)) / longest <= closeness:
+            continue  # The length difference alone rules out beating the best window
+        closeness = max(closeness, 1 - edit_distance(query_text, window) / longest)
+        if closeness == 1:
+            break
+    return (overlap + closeness) / 2
+
+class SearchIndex:
+    """In-memory token and trigram index over book title, author and category"""
+    FIELDS = ("title", "author", "category")
+    PAD = "\x00"  # Marks word-start/end so short values still produce trigrams
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop all postings"""
+        self.docs = []           # doc id: Book (doc ids follow insertion order)
+        self.doc_ids = {}        # ISBN: doc id
+        self.trigrams = {field: {} for field in self.FIELDS}  # field: {trigram: set of doc ids}
+        self.tokens = {field: {} for field in self.FIELDS}    # field: {token: set of doc ids}
+        self.sorted_tokens = {field: [] for field in self.FIELDS}
+        self.stale_fields = set()  # Fields whose sorted token list needs rebuilding
+
+    @staticmethod
+    def tokenize(text):
+        """Split lowercased text into word tokens"""
+        return re.findall(r"\w+", text)
+
+    @classmethod
+    def make_trigrams(cls, text, pad=True):
+        """Return the set of trigrams in lowercased text"""
+        if pad:
+            text = cls.PAD + text + cls.PAD
+        return {text[i:i+3] for i in range(len(text) - 2)}
+
+    def add(self, book):
+        """Index a book (no-op if its ISBN is already indexed)"""
+        if book.isbn in self.doc_ids:
+            return
+        doc_id = len(self.docs)
+        self.docs.append(book)
+        self.doc_ids[book.isbn] = doc_id
+
+        for field in self.FIELDS:
+            text = getattr(book, field).lower()
+            grams = self.trigrams[field]
+            for gram in self.make_trigrams(text):
+                grams.setdefault(gram, set()).add(doc_id)
+            tokens = self.tokens[field]
+            for token in set(self.tokenize(text)):
+                if token not in tokens:
+                    tokens[token] = set()
+                    self.stale_fields.add(field)
+                tokens[token].add(doc_id)
+
+    def _substring_candidates(self, field, query):
+        """Doc ids that may contain query, from trigram postings"""
+        grams = self.trigrams[field]
+        if len(query) >= 3:
+            postings = []
+            for gram in self.make_trigrams(query, pad=False):
+                if gram not in grams:
+                    return set()
+                postings.append(grams[gram])
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting
+                if not candidates:
+                    break
+            return candidates
+
+        # One or two characters: union the postings of every trigram containing them.
+        # This walks the trigram vocabulary, which is bounded by the alphabet, not the catalog.
+        candidates = set()
+        for gram, posting in grams.items():
+            if query in gram:
+                candidates |= posting
+        return candidates
+
+    def _prefix_candidates(self, field, token):
+        """Doc ids with a word in field that starts with token"""
+        if field in self.stale_fields:
+            self.sorted_tokens[field] = sorted(self.tokens[field])
+            self.stale_fields.discard(field)
+        sorted_tokens = self.sorted_tokens[field]
+        tokens = self.tokens[field]
+
+        candidates = set()
+        i = bisect_left(sorted_tokens, token)
+        while i < len(sorted_tokens) and sorted_tokens[i].startswith(token):
+            candidates |= tokens[sorted_tokens[i]]
+            i += 1
+        return candidates
+
+    def search(self, field, query, match="substring"):
+        """Return the set of doc ids whose field matches query"""
+        query = query.lower()
+        if not query:
+            return set(range(len(self.docs)))
+
+        query_tokens = self.tokenize(query)
+        if match == "prefix" and query_tokens:
+            candidates = self._prefix_candidates(field, query_tokens[0])
+            pattern = re.compile(r"\b" + re.escape(query))
+            return {doc_id for doc_id in candidates
+                    if pattern.search(getattr(self.docs[doc_id], field).lower())}
+
+        candidates = self._substring_candidates(field, query)
+        return {doc_id for doc_id in candidates
+                if query in getattr(self.docs[doc_id], field).lower()}
+    
+    @classmethod
+    def fuzzy_trigrams(cls, query):
+        """Trigrams a misspelt query still shares with the indexed text"""
+        grams = set()
+        for token in cls.tokenize(query.lower()):
+            grams |= cls.make_trigrams(token, pad=False)
+            for edge in (" ", cls.PAD):
+                grams.add(edge + token[:2])
+                grams.add(token[-2:] + edge)
+        return grams
+    
+    def fuzzy_search(self, field, query, limit=10, candidate_limit=50):
+        """Return [(score, doc id)] for the best fuzzy matches, highest score first"""
+        grams = self.trigrams[field]
+        postings = sorted((grams[gram] for gram in self.fuzzy_trigrams(query) if gram in grams), key=len)
+        if not postings:
+            return []
+        # Very common trigrams say little about a match; skip them when rarer ones exist
+        max_posting = max(1000, len(self.docs) // 10)
+        useful = [posting for posting in postings if len(posting) <= max_posting] or postings[:1]
+        
+        shared = {}  # doc id: trigrams shared with the query
+        for posting in useful:
+            for doc_id in posting:
+                shared[doc_id] = shared.get(doc_id, 0) + 1
+        
+        candidates = heapq.nlargest(candidate_limit, shared, key=shared.get)
+        scored = ((fuzzy_score(query, getattr(self.docs[doc_id], field)), doc_id) for doc_id in candidates)
+        return heapq.nlargest(limit, scored, key=lambda item: (item[0], -item[1]))
+
+class RatingLeaderboard:
+    """Books ranked by rating, overall and per category, kept sorted as ratings arrive"""
+    PRIOR_MEAN = 3.0   # Shrinks books with few ratings toward an average score
+    PRIOR_WEIGHT = 5
+    
+    def __init__(self):
+        self.clear()
+    
+    def clear(self):
+        """Drop all rankings"""
+        self.boards = {}  # category (None for all books): sorted [(-score, -count, isbn)]
+        self.keys = {}    # ISBN: its current sort key
+    
+    @classmethod
+    def score(cls, book):
+        """Bayesian average, so one 5-star rating doesn't top the chart"""
+        return (book.rating_sum + cls.PRIOR_MEAN * cls.PRIOR_WEIGHT) / (book.rating_count + cls.PRIOR_WEIGHT)
+    
+    def build(self, books):
+        """Rank every rated book with one sort per board"""
+        self.clear()
+        for book in books:
+            if book.rating_count:
+                key = (-self.score(book), -book.rating_count, book.isbn)
+                self.keys[book.isbn] = key
+                self.boards.setdefault(None, []).append(key)
+                self.boards.setdefault(book.category, []).append(key)
+        for board in self.boards.values():
+            board.sort()
+    
+    def update(self, book):
+        """Re-rank a book after its ratings changed"""
+        key = (-self.score(book), -book.rating_count, book.isbn)
+        old_key = self.keys.get(book.isbn)
+        self.keys[book.isbn] = key
+        for category in (None, book.category):
+            board = self.boards.setdefault(category, [])
+            if old_key is not None:
+                del board[bisect_left(board, old_key)]
+            insort(board, key)
+    
+    def top(self, category=None, k=10):
+        """ISBNs of the k best-rated books in O(k)"""
+        return [isbn for _, _, isbn in self.boards.get(category, [])[:k]]
+
+class DueDateIndex:
+    """Min-heap of active loans keyed on the moment each one starts accruing fines"""
+    def __init__(self, loan_period):
+        self.loan_period = loan_period
+        self.clear()
+    
+    def clear(self):
+        """Forget all loans"""
+        self.heap = []     # (overdue_from timestamp, member_id, isbn), may hold returned loans
+        self.pending = {}  # (member_id, isbn): overdue_from, not yet overdue
+        self.overdue = {}  # (member_id, isbn): overdue_from, already overdue
+    
+    def overdue_from(self, borrow_date):
+        """Timestamp at which a loan borrowed on borrow_date owes its first day of fine"""
+        return (borrow_date + timedelta(days=self.loan_period + 1)).timestamp()
+    
+    def build(self, members):
+        """Rebuild from every member's current loans in O(n)"""
+        self.clear()
+        for member in members:
+            for isbn, borrow_date in member.borrowed_books.items():
+                self.pending[(member.member_id, isbn)] = self.overdue_from(borrow_date)
+        self.heap = [(when, member_id, isbn) for (member_id, isbn), when in self.pending.items()]
+        heapq.heapify(self.heap)
+    
+    def add(self, member_id, isbn, borrow_date):
+        """Track a new loan"""
+        when = self.overdue_from(borrow_date)
+        self.pending[(member_id, isbn)] = when
+        heapq.heappush(self.heap, (when, member_id, isbn))
+    
+    def remove(self, member_id, isbn):
+        """Stop tracking a returned loan (its heap entry is dropped lazily)"""
+        key = (member_id, isbn)
+        self.pending.pop(key, None)
+        self.overdue.pop(key, None)
+        if len(self.heap) > 2 * len(self.pending) + 1024:
+            # Mostly returned loans left in the heap: rebuild it from the live ones
+            self.heap = [(when, m, i) for (m, i), when in self.pending.items()]
+            heapq.heapify(self.heap)
+    
+    def advance(self, now):
+        """Move every loan that has become overdue by now out of the heap"""
+        cutoff = now.timestamp()
+        while self.heap and self.heap[0][0] <= cutoff:
+            when, member_id, isbn = heapq.heappop(self.heap)
+            key = (member_id, isbn)
+            if self.pending.get(key) == when:
+                del self.pending[key]
+                self.overdue[key] = when
+    
+    def overdue_loans(self, now):
+        """Return (overdue_from, member_id, isbn) for every overdue loan, oldest first"""
+        self.advance(now)
+        return sorted((when, member_id, isbn) for (member_id, isbn), when in self.overdue.items())
+
+# Shared with Pool workers (inherited on fork, or set by the initializer)
+_co_borrow_state = {}
+
+def _init_co_borrow_worker(baskets, item_members, top_k):
+    """Pool initializer: install the co-borrow data in a worker process"""
+    _co_borrow_state.update(baskets=baskets, item_members=item_members, top_k=top_k)
+
+def _similar_items_chunk(isbns):
+    """Pool task: top-K similar ISBNs for a chunk of ISBNs"""
+    return {isbn: similar_items(isbn, _co_borrow_state["baskets"], _co_borrow_state["item_members"],
+                                _co_borrow_state["top_k"])
+            for isbn in isbns}
+
+def similar_items(isbn, baskets, item_members, top_k):
+    """Top-K ISBNs by cosine similarity of their borrower sets"""
+    readers = item_members.get(isbn)
+    if not readers:
+        return []
+    co_counts = {}  # ISBN: members who borrowed both
+    for member_id in readers:
+        for other in baskets[member_id]:
+            co_counts[other] = co_counts.get(other, 0) + 1
+    co_counts.pop(isbn, None)
+    
+    norm = len(readers)
+    scored = ((count / math.sqrt(norm * len(item_members[other])), other)
+              for other, count in co_counts.items())
+    return [(other, score) for score, other in heapq.nlargest(top_k, scored)]
+
+class Recommender:
+    """Item-to-item recommendations from a sparse co-borrow matrix with a per-ISBN cache"""
+    def __init__(self, top_k=10):
+        self.top_k = top_k
+        self.baskets = {}       # member_id: set of ISBNs returned
+        self.item_members = {}  # ISBN: set of member_ids who returned it
+        self.similar = {}       # ISBN: [(ISBN, score)], cached top-K
+        self.cited_by = {}      # ISBN: ISBNs whose cached top-K lists it
+        self.builds = []        # Per running build: (ISBNs to recompute, ISBNs whose reader count grew)
+    
+    def load(self, borrows):
+        """Load (member_id, isbn) pairs from borrow history"""
+        for member_id, isbn in borrows:
+            self.baskets.setdefault(member_id, set()).add(isbn)
+            self.item_members.setdefault(isbn, set()).add(member_id)
+        self.similar.clear()
+        self.cited_by.clear()
+    
+    def _cache(self, isbn, neighbours):
+        self.similar[isbn] = neighbours
+        for other, _ in neighbours:
+            self.cited_by.setdefault(other, set()).add(isbn)
+    
+    def _forget(self, isbn):
+        for other, _ in self.similar.pop(isbn, ()):
+            self.cited_by[other].discard(isbn)
+    
+    def record_borrow(self, member_id, isbn):
+        """Add a completed borrow and invalidate only the cache entries it changes"""
+        basket = self.baskets.setdefault(member_id, set())
+        if isbn in basket:
+            return  # Co-borrow pairs are unchanged
+        # Every book this member read gains a co-borrow with isbn. isbn gains a reader, which only
+        # lowers its score against the rest, so only top-K lists that already hold it can change
+        for other in basket:
+            self._forget(other)
+        for other in list(self.cited_by.get(isbn, ())):
+            self._forget(other)
+        self._forget(isbn)
+        for stale, grown in self.builds:
+            stale.update(basket)
+            stale.add(isbn)
+            grown.add(isbn)
+        basket.add(isbn)
+        self.item_members.setdefault(isbn, set()).add(member_id)
+    
+    def begin_build(self):
+        """Copy the co-borrow data for compute() (call under the lock that guards record_borrow)"""
+        changes = (set(), set())
+        self.builds.append(changes)
+        baskets = {member_id: set(basket) for member_id, basket in self.baskets.items()}
+        item_members = {isbn: set(members) for isbn, members in self.item_members.items()}
+        return baskets, item_members, changes
+    
+    def compute(self, snapshot, processes=None, chunk_size=2000):
+        """Top-K for every ISBN of a begin_build() snapshot, spread over a process pool (needs no lock)"""
+        baskets, item_members, _ = snapshot
+        isbns = list(item_members)
+        chunks = [isbns[i:i+chunk_size] for i in range(0, len(isbns), chunk_size)]
+        if len(chunks) <= 1 or processes == 1:
+            return {isbn: similar_items(isbn, baskets, item_members, self.top_k) for isbn in isbns}
+        
+        similar = {}
+        with Pool(processes=processes or os.cpu_count(), initializer=_init_co_borrow_worker,
+                  initargs=(baskets, item_members, self.top_k)) as pool:
+            for result in pool.imap_unordered(_similar_items_chunk, chunks):
+                similar.update(result)
+        return similar
+    
+    def finish_build(self, snapshot, similar):
+        """Cache compute() results, except those that borrows recorded since begin_build() made stale"""
+        stale, grown = snapshot[2]
+        self.builds.remove(snapshot[2])
+        for isbn, neighbours in similar.items():
+            if isbn not in stale and not any(other in grown for other, _ in neighbours):
+                self._forget(isbn)
+                self._cache(isbn, neighbours)
+    
+    def build(self, processes=None, chunk_size=2000):
+        """Precompute top-K for every ISBN, spread over a process pool"""
+        snapshot = self.begin_build()
+        self.finish_build(snapshot, self.compute(snapshot, processes, chunk_size))
+    
+    def recommend(self, isbn, limit=5):
+        """Books most often borrowed by readers of isbn"""
+        if isbn not in self.similar:
+            self._cache(isbn, similar_items(isbn, self.baskets, self.item_members, self.top_k))
+        return self.similar[isbn][:limit]
+    
+    def recommend_for_member(self, member_id, limit=5):
+        """Blend the neighbours of everything a member has read, skipping what they've read"""
+        read = self.baskets.get(member_id, set())
+        scores = {}
+        for isbn in read:
+            for other, score in self.recommend(isbn, self.top_k):
+                if other not in read:
+                    scores[other] = scores.get(other, 0) + score
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+CATALOG_FIELDS = ("title", "author", "isbn", "category", "copies")
+
+def normalize_isbn(isbn):
+    """Strip separators and check an ISBN-10/13 checksum; return None if invalid"""
+    isbn = isbn.replace("-", "").replace(" ", "").upper()
+    if len(isbn) == 13 and isbn.isdigit():
+        total = sum(int(d) * (1 if i % 2 == 0 else 3) for i, d in enumerate(isbn))
+        return isbn if total % 10 == 0 else None
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == "X"):
+        total = sum((10 - i) * (10 if d == "X" else int(d)) for i, d in enumerate(isbn))
+        return isbn if total % 11 == 0 else None
+    return None
+
+def _parse_catalog_chunk(chunk):
+    """Pool task: parse and validate (line_number, raw record) pairs"""
+    file_format, header, records = chunk
+    rows, errors = [], []
+    for line_number, raw in records:
+        try:
+            data = json.loads(raw) if file_format == "jsonl" else dict(zip(header, raw))
+            isbn = normalize_isbn(str(data.get("isbn", "")))
+            if isbn is None:
+                raise ValueError("invalid ISBN")
+            title, author, category = (str(data.get(field) or "").strip()
+                                       for field in ("title", "author", "category"))
+            if not title or not author or not category:
+                raise ValueError("missing title, author or category")
+            copies = int(data.get("copies") or 1)
+            if copies < 1:
+                raise ValueError("copies must be positive")
+        except (ValueError, TypeError, AttributeError) as e:
+            errors.append(f"line {line_number}: {e}")
+            continue
+        rows.append((title, author, isbn, category, copies))
+    return rows, errors
+
+def read_catalog(path, chunk_size=5000):
+    """Stream a CSV or JSON Lines catalog as (format, header, [(line_number, raw record)]) chunks"""
+    file_format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if file_format == "jsonl":
+            header = None
+            records = ((n, line) for n, line in enumerate(f, 1) if line.strip())
+        else:
+            reader = csv.reader(f)
+            header = [name.strip().lower() for name in next(reader, [])]
+            records = ((reader.line_num, row) for row in reader if row)
+        
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield file_format, header, chunk
+                chunk = []
+        if chunk:
+            yield file_format, header, chunk
+
+def linear_search(books, query, search_by="title"):
+    """Reference linear scan over all books (used as the benchmark baseline)"""
+    results = []
+    query = query.lower()
+
+    for book in books.values():
+        if search_by == "title" and query in book.title.lower():
+            results.append(book)
+        elif search_by == "author" and query in book.author.lower():
+            results.append(book)
+        elif search_by == "category" and query in book.category.lower():
+            results.append(book)
+
+    return results
+
+class LibraryJournal:
+    """Append-only, checksummed journal of library operations, each numbered in journal order"""
+    def __init__(self, path="library.journal", group_commit=1):
+        self.path = path
+        self.old_path = path + ".old"  # Journal being folded into a snapshot
+        self.group_commit = group_commit  # fsync once every N records
+        self.records = 0                  # Records in the current journal
+        self.seq = 0                      # Number of the last record queued
+        self.unsynced = 0
+        self.file = None
+        self.lock = threading.Lock()        # Serializes file writes
+        self.queue = []                     # Encoded records waiting to be written
+        self.queue_lock = threading.Lock()  # Held only long enough to number and queue a record
+    
+    @staticmethod
+    def replay(path):
+        """Yield valid records from a journal file, then truncate any torn tail"""
+        try:
+            f = open(path, "rb+")
+        except FileNotFoundError:
+            return
+        with f:
+            valid_end = 0
+            for line in f:
+                crc, _, payload = line.rstrip(b"\n").partition(b" ")
+                if not line.endswith(b"\n") or crc != b"%08x" % zlib.crc32(payload):
+                    break  # Torn or corrupt write from a crash: nothing after it counts
+                valid_end += len(line)
+                yield json.loads(payload)
+            f.truncate(valid_end)
+    
+    def open(self, records=0, seq=0):
+        """Open the journal for appending, numbering new records after seq"""
+        self.file = open(self.path, "ab")
+        self.records = records
+        self.seq = seq
+    
+    def enqueue(self, record):
+        """Number and queue one compact record; its position in the queue is its position in the journal"""
+        with self.queue_lock:
+            self.seq += 1
+            payload = json.dumps({"seq": self.seq, **record}, separators=(",", ":")).encode("utf-8")
+            self.queue.append(b"%08x %s\n" % (zlib.crc32(payload), payload))
+    
+    def flush(self):
+        """Write every queued record; fsync according to group_commit"""
+        with self.lock:
+            with self.queue_lock:
+                lines, self.queue = self.queue, []
+            if not lines:
+                return
+            self.file.write(b"".join(lines))
+            self.file.flush()
+            self.records += len(lines)
+            self.unsynced += len(lines)
+            if self.unsynced >= self.group_commit:
+                os.fsync(self.file.fileno())
+                self.unsynced = 0
+    
+    def append(self, record):
+        """Append one compact record; fsync according to group_commit"""
+        self.enqueue(record)
+        self.flush()
+    
+    def sync(self):
+        """Force pending records to disk"""
+        with self.lock:
+            if self.file and self.unsynced:
+                self.file.flush()
+                os.fsync(self.file.fileno())
+                self.unsynced = 0
+    
+    def rotate(self):
+        """Move current records aside so a snapshot can absorb them"""
+        self.flush()
+        self.sync()
+        with self.lock:
+            self.file.close()
+            if os.path.exists(self.old_path):
+                # A previous compaction never finished, so keep its records too
+                with open(self.path, "rb") as src, open(self.old_path, "ab") as dst:
+                    dst.write(src.read())
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.old_path)
+            self.file = open(self.path, "ab")
+            self.records = 0
+    
+    def close(self):
+        """Sync and close the journal"""
+        if self.file:
+            self.flush()
+        self.sync()
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+class StripedLocks:
+    """Fixed pool of locks; keys hash onto stripes that are always taken in stripe order"""
+    def __init__(self, stripes=64):
+        self.locks = [threading.Lock() for _ in range(stripes)]
+    
+    @contextmanager
+    def hold(self, keys=None):
+        """Hold the stripes for keys (every stripe if keys is None) without risk of deadlock"""
+        if keys is None:
+            indices = range(len(self.locks))
+        else:
+            indices = sorted({hash(key) % len(self.locks) for key in keys})
+        for i in indices:
+            self.locks[i].acquire()
+        try:
+            yield
+        finally:
+            for i in reversed(indices):
+                self.locks[i].release()
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file and rename it over path"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class LibraryBase(ABC):
+    """Lending rules shared by the storage backends; each backend stores books, members and loans its own way"""
+    def __init__(self, name, thread_safe=False):
         self.name = name
-        self.books = {}      # ISBN: Book
-        self.members = {}    # member_id: Member
         self.loan_period = 14  # Days
         self.fine_per_day = 1.0  # Dollar per day
-        self.load_data()
+        self.member_ids = IdAllocator(width=8)  # 7 digits + check digit
+        self.recommender = None  # Built on first use
+        self.index_lock = threading.Lock() if thread_safe else nullcontext()
     
+    @abstractmethod
     def load_data(self):
-        """Load library data from JSON files"""
-        try:
-            # Load books
-            with open("books.json", "r") as f:
-                books_data = json.load(f)
-                self.books = {isbn: Book.from_dict(data) 
-                            for isbn, data in books_data.items()}
-            
-            # Load members
-            with open("members.json", "r") as f:
-                members_data = json.load(f)
-                self.members = {id_: Member.from_dict(data) 
-                              for id_, data in members_data.items()}
-        except FileNotFoundError:
-            pass
+        """Open the library's storage"""
     
+    @abstractmethod
     def save_data(self):
-        """Save library data to JSON files"""
-        # Save books
-        with open("books.json", "w") as f:
-            books_data = {isbn: book.to_dict() 
-                         for isbn, book in self.books.items()}
-            json.dump(books_data, f, indent=4)
-        
-        # Save members
-        with open("members.json", "w") as f:
-            members_data = {id_: member.to_dict() 
-                          for id_, member in self.members.items()}
-            json.dump(members_data, f, indent=4)
+        """Make every change durable"""
+    
+    @abstractmethod
+    def close(self):
+        """Release the library's storage"""
+    
+    @abstractmethod
+    def _locked(self, isbns=(), member_ids=(), everything=False):
+        """Keep the given books and members (or everything) from changing while held"""
+    
+    @abstractmethod
+    def _write(self, isbns=(), member_ids=(), everything=False):
+        """Make the changes to the given books and members inside it one atomic, durable write"""
+    
+    @abstractmethod
+    def _add_copies(self, isbn, copies):
+        """Add copies to a stored book; False if there is no such book"""
+    
+    @abstractmethod
+    def _insert_book(self, book):
+        """Store a new book"""
+    
+    @abstractmethod
+    def _import_batch(self, rows):
+        """Add or merge a batch of validated catalog rows; return (added, merged)"""
+    
+    @abstractmethod
+    def _insert_members(self, pairs):
+        """Store new members given as (member_id, name) pairs"""
+    
+    @abstractmethod
+    def _borrow_state(self, member_id, isbn):
+        """(available copies, member holds isbn, books the member holds, member's fines), or None if either is unknown"""
+    
+    @abstractmethod
+    def _open_loan(self, member_id, isbn, borrow_date):
+        """Lend one copy of a book to a member"""
+    
+    @abstractmethod
+    def _loan(self, member_id, isbn):
+        """(title, borrow date or None if not lent to the member, fine accrued so far), or None if either is unknown"""
+    
+    @abstractmethod
+    def _close_loan(self, member_id, isbn, record, charge):
+        """End a loan: take the copy back, add record to the member's history and charge them"""
+    
+    @abstractmethod
+    def _fines(self, member_id):
+        """A member's outstanding fines, or None if there is no such member"""
+    
+    @abstractmethod
+    def _charge(self, member_id, amount):
+        """Add amount (negative for a payment) to a member's fines"""
+    
+    @abstractmethod
+    def _add_rating(self, isbn, stars):
+        """Record a rating and return the rated Book, or None if there is no such book"""
+    
+    @abstractmethod
+    def _overdue_loans(self, now):
+        """(member_id, isbn, title, borrow_date) for every loan overdue at now, oldest first"""
+    
+    @abstractmethod
+    def _accrued(self, loans):
+        """{(member_id, isbn): fine already charged} covering the given overdue loans"""
+    
+    @abstractmethod
+    def _accrue(self, charges):
+        """Charge (member_id, isbn, fine so far, amount due now) for overdue loans"""
+    
+    @abstractmethod
+    def _member_record(self, member_id):
+        """(name, fines, [(isbn, title, borrow_date)], history dicts) for a member, or None if unknown"""
+    
+    @abstractmethod
+    def top_rated(self, category=None, k=10):
+        """Best-rated books overall or in one category"""
+    
+    @abstractmethod
+    def advanced_search(self, limit=None, offset=0, match="substring", **criteria):
+        """Search on several fields at once (e.g. author AND category) with pagination"""
+    
+    @abstractmethod
+    def _history_pairs(self):
+        """Yield (member_id, isbn) for every completed borrow"""
+    
+    @abstractmethod
+    def _titles(self, isbns):
+        """Map ISBNs to titles"""
+    
+    def _fine(self, borrow_date, now):
+        """Fine for a loan returned at now"""
+        return max(0, (now - borrow_date).days - self.loan_period) * self.fine_per_day
     
     def add_book(self, title, author, isbn, category, copies=1):
         """Add a new book to the library"""
-        if isbn in self.books:
-            self.books[isbn].total_copies += copies
-            self.books[isbn].available_copies += copies
-            return {"status": "success", "message": f"Added {copies} copies of existing book"}
+        with self._write(isbns=[isbn]):
+            existing = self._add_copies(isbn, copies)
+            if not existing:
+                self._insert_book(Book(title, author, isbn, category, copies))
         
-        book = Book(title, author, isbn, category, copies)
-        self.books[isbn] = book
-        self.save_data()
+        if existing:
+            return {"status": "success", "message": f"Added {copies} copies of existing book"}
         return {"status": "success", "message": "Book added successfully"}
     
+    def import_catalog(self, path, batch_size=10000, processes=None, progress=None):
+        """Stream a CSV or JSON Lines catalog into the library, one commit per batch"""
+        start = time.perf_counter()
+        stats = {"rows": 0, "added": 0, "merged": 0, "errors": []}
+        pool = Pool(processes=processes or os.cpu_count()) if processes != 1 else None
+        try:
+            chunks = read_catalog(path, batch_size)
+            parsed = pool.imap(_parse_catalog_chunk, chunks) if pool else map(_parse_catalog_chunk, chunks)
+            for rows, errors in parsed:
+                added, merged = self._import_batch(rows)
+                stats["rows"] += len(rows) + len(errors)
+                stats["added"] += added
+                stats["merged"] += merged
+                stats["errors"] += errors
+                if progress:
+                    elapsed = time.perf_counter() - start
+                    progress(f"{stats['rows']} rows, {stats['rows'] / elapsed:.0f} rows/sec")
+        except FileNotFoundError:
+            return {"status": "error", "message": f"File {path} not found"}
+        finally:
+            if pool:
+                pool.close()
+                pool.join()
+        
+        elapsed = time.perf_counter() - start
+        return {
+            "status": "success",
+            "message": f"Imported {stats['rows']} rows: {stats['added']} new books, "
+                       f"{stats['merged']} merged copies, {len(stats['errors'])} rejected",
+            "rows_per_sec": stats["rows"] / elapsed if elapsed else 0.0,
+            **stats
+        }
+    
     def add_member(self, name):
         """Register a new member"""
-        member_id = str(random.randint(10000, 99999))
-        while member_id in self.members:
-            member_id = str(random.randint(10000, 99999))
-        
-        member = Member(name, member_id)
-        self.members[member_id] = member
-        self.save_data()
+        member_id = self.member_ids.next_id()
+        with self._write(member_ids=[member_id]):
+            self._insert_members([(member_id, name)])
         return {"status": "success", "message": f"Member registered successfully", "member_id": member_id}
     
+    def add_members(self, names):
+        """Register many members from one reserved block of IDs"""
+        member_ids = self.member_ids.reserve(len(names))
+        with self._write(member_ids=member_ids):
+            self._insert_members(list(zip(member_ids, names)))
+        return {"status": "success", "message": f"{len(member_ids)} members registered", "member_ids": member_ids}
+    
     def borrow_book(self, member_id, isbn):
         """Process book borrowing"""
-        if isbn not in self.books or member_id not in self.members:
-            return {"status": "error", "message": "Invalid book or member ID"}
-        
-        book = self.books[isbn]
-        member = self.members[member_id]
-        
-        if book.available_copies == 0:
-            return {"status": "error", "message": "Book not available"}
-        
-        if len(member.borrowed_books) >= 3:
-            return {"status": "error", "message": "Maximum borrow limit reached"}
-        
-        if member.fines > 0:
-            return {"status": "error", "message": f"Please clear outstanding fine of ${member.fines:.2f}"}
-        
-        book.available_copies -= 1
-        book.borrowers.append(member_id)
-        member.borrowed_books[isbn] = datetime.now()
-        
-        self.save_data()
+        with self._write(isbns=[isbn], member_ids=[member_id]):
+            state = self._borrow_state(member_id, isbn)
+            if state is None:
+                return {"status": "error", "message": "Invalid book or member ID"}
+            available, holds_it, borrowed, fines = state
+            
+            if available == 0:
+                return {"status": "error", "message": "Book not available"}
+            
+            if holds_it:
+                return {"status": "error", "message": "Book already borrowed by this member"}
+            
+            if borrowed >= 3:
+                return {"status": "error", "message": "Maximum borrow limit reached"}
+            
+            if fines > 0:
+                return {"status": "error", "message": f"Please clear outstanding fine of ${fines:.2f}"}
+            
+            self._open_loan(member_id, isbn, datetime.now())
         return {"status": "success", "message": "Book borrowed successfully"}
     
     def return_book(self, member_id, isbn):
         """Process book return"""
-        if isbn not in self.books or member_id not in self.members:
-            return {"status": "error", "message": "Invalid book or member ID"}
-        
-        book = self.books[isbn]
-        member = self.members[member_id]
-        
-        if isbn not in member.borrowed_books:
-            return {"status": "error", "message": "Book not borrowed by this member"}
-        
-        # Calculate fine
-        borrow_date = member.borrowed_books[isbn]
-        days_borrowed = (datetime.now() - borrow_date).days
-        fine = max(0, days_borrowed - self.loan_period) * self.fine_per_day
-        
-        book.available_copies += 1
-        book.borrowers.remove(member_id)
-        borrow_record = {
-            "isbn": isbn,
-            "title": book.title,
-            "borrow_date": borrow_date.strftime("%Y-%m-%d"),
-            "return_date": datetime.now().strftime("%Y-%m-%d"),
-            "fine": fine
-        }
-        member.history.append(borrow_record)
-        del member.borrowed_books[isbn]
-        member.fines += fine
+        with self._write(isbns=[isbn], member_ids=[member_id]):
+            loan = self._loan(member_id, isbn)
+            if loan is None:
+                return {"status": "error", "message": "Invalid book or member ID"}
+            
+            title, borrow_date, accrued = loan
+            if borrow_date is None:
+                return {"status": "error", "message": "Book not borrowed by this member"}
+            
+            # Calculate fine
+            now = datetime.now()
+            fine = self._fine(borrow_date, now)
+            record = BorrowRecord(isbn, title, borrow_date.strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d"), fine)
+            self._close_loan(member_id, isbn, record, fine - accrued)  # Part may be charged already
+            with self.index_lock:
+                if self.recommender is not None:
+                    self.recommender.record_borrow(member_id, isbn)
         
-        self.save_data()
         return {
             "status": "success",
             "message": "Book returned successfully",
@@ -200,61 +984,1227 @@ class Library:
     
     def pay_fine(self, member_id, amount):
         """Process fine payment"""
-        if member_id not in self.members:
-            return {"status": "error", "message": "Invalid member ID"}
+        with self._write(member_ids=[member_id]):
+            fines = self._fines(member_id)
+            if fines is None:
+                return {"status": "error", "message": "Invalid member ID"}
+            
+            if amount > fines:
+                return {"status": "error", "message": "Payment amount exceeds fine"}
+            
+            self._charge(member_id, -amount)
+        return {"status": "success", "message": f"Paid ${amount:.2f}"}
+    
+    def rate_book(self, isbn, stars):
+        """Record a 1-5 star rating"""
+        if stars not in (1, 2, 3, 4, 5):
+            return {"status": "error", "message": "Rating must be between 1 and 5 stars"}
         
-        member = self.members[member_id]
-        if amount > member.fines:
-            return {"status": "error", "message": "Payment amount exceeds fine"}
+        with self._write(isbns=[isbn]):
+            book = self._add_rating(isbn, stars)
+        if book is None:
+            return {"status": "error", "message": "Invalid book ID"}
+        return {"status": "success", "message": f"Rated {book.title}: {book.average_rating:.1f} average"}
+    
+    def _rating_entry(self, book):
+        """Leaderboard entry for a book"""
+        return {"isbn": book.isbn, "title": book.title, "author": book.author,
+                "average": book.average_rating, "count": book.rating_count}
+    
+    def list_overdue(self, now=None):
+        """List every overdue loan, oldest first"""
+        now = now or datetime.now()
+        overdue = []
+        for member_id, isbn, title, borrow_date in self._overdue_loans(now):
+            days_overdue = (now - borrow_date).days - self.loan_period
+            overdue.append({
+                "member_id": member_id,
+                "isbn": isbn,
+                "title": title,
+                "borrow_date": borrow_date.strftime("%Y-%m-%d"),
+                "days_overdue": days_overdue,
+                "fine": days_overdue * self.fine_per_day
+            })
+        return overdue
+    
+    def accrue_fines(self, now=None):
+        """Charge the fines owed so far on every overdue loan in one pass"""
+        charges = []  # (member_id, isbn, fine so far, amount due now)
+        total = 0.0
+        with self._write(everything=True):
+            loans = self.list_overdue(now)
+            accrued = self._accrued(loans)
+            for loan in loans:
+                key = (loan["member_id"], loan["isbn"])
+                due = loan["fine"] - accrued.get(key, 0)
+                if due > 0:
+                    charges.append((*key, loan["fine"], due))
+                    total += due
+            
+            if charges:
+                self._accrue(charges)
         
-        member.fines -= amount
-        self.save_data()
-        return {"status": "success", "message": f"Paid ${amount:.2f}"}
+        return {
+            "status": "success",
+            "message": f"Charged ${total:.2f} across {len({member_id for member_id, *_ in charges})} members",
+            "overdue_loans": len(loans),
+            "total": total
+        }
     
-    def search_books(self, query, search_by="title"):
+    def search_books(self, query, search_by="title", limit=None, offset=0, match="substring"):
         """Search books by title, author, or category"""
-        results = []
-        query = query.lower()
-        
-        for book in self.books.values():
-            if search_by == "title" and query in book.title.lower():
-                results.append(book)
-            elif search_by == "author" and query in book.author.lower():
-                results.append(book)
-            elif search_by == "category" and query in book.category.lower():
-                results.append(book)
+        if search_by not in SearchIndex.FIELDS:
+            return []
+        return self.advanced_search(limit=limit, offset=offset, match=match, **{search_by: query})
+    
+    def get_recommender(self):
+        """Return the recommender, loading borrow history into it on first use"""
+        if self.recommender is None:
+            with self._locked(everything=True):
+                if self.recommender is None:
+                    recommender = Recommender()
+                    recommender.load(self._history_pairs())
+                    self.recommender = recommender
+        return self.recommender
+    
+    def build_recommendations(self, processes=None):
+        """Precompute similar books for the whole catalog"""
+        recommender = self.get_recommender()
+        with self.index_lock:
+            snapshot = recommender.begin_build()
+        similar = recommender.compute(snapshot, processes)  # Borrows and returns carry on meanwhile
+        with self.index_lock:
+            recommender.finish_build(snapshot, similar)
+        return {"status": "success", "message": f"Precomputed {len(recommender.similar)} books"}
+    
+    def recommend_books(self, isbn=None, member_id=None, limit=5):
+        """Recommend books similar to isbn, or for a member based on their history"""
+        recommender = self.get_recommender()
+        if member_id is None and isbn is None:
+            return {"status": "error", "message": "Give a book ISBN or a member ID"}
+        with self.index_lock:
+            if member_id is not None:
+                scored = recommender.recommend_for_member(member_id, limit)
+            else:
+                scored = recommender.recommend(isbn, limit)
         
-        return results
+        titles = self._titles([other for other, _ in scored])
+        return {
+            "status": "success",
+            "recommendations": [{"isbn": other, "title": titles.get(other, ""), "score": score}
+                                for other, score in scored]
+        }
     
     def get_member_details(self, member_id):
         """Get detailed information about a member"""
-        if member_id not in self.members:
+        with self._locked(member_ids=[member_id]):
+            record = self._member_record(member_id)
+        if record is None:
             return {"status": "error", "message": "Invalid member ID"}
         
-        member = self.members[member_id]
+        name, fines, loans, history = record
+        now = datetime.now()
         current_borrows = []
-        
-        for isbn, borrow_date in member.borrowed_books.items():
-            book = self.books[isbn]
-            days_remaining = self.loan_period - (datetime.now() - borrow_date).days
+        for isbn, title, borrow_date in loans:
             current_borrows.append({
-                "title": book.title,
+                "title": title,
                 "isbn": isbn,
                 "borrow_date": borrow_date.strftime("%Y-%m-%d"),
-                "days_remaining": days_remaining
+                "days_remaining": self.loan_period - (now - borrow_date).days
             })
         
         return {
             "status": "success",
-            "name": member.name,
-            "member_id": member.member_id,
+            "name": name,
+            "member_id": member_id,
             "current_borrows": current_borrows,
-            "borrow_history": member.history,
-            "fines": member.fines
+            "borrow_history": history,
+            "fines": fines
         }
 
-def main():
-    library = Library("Community Library")
+class Library(LibraryBase):
+    """Library management system: books and members in memory, persisted as JSON snapshots plus a journal"""
+    def __init__(self, name, journal_path="library.journal", group_commit=1, compact_every=10000,
+                 books_file="books.json", members_file="members.json", thread_safe=False, lock_stripes=64):
+        super().__init__(name, thread_safe)
+        self.books = {}      # ISBN: Book
+        self.members = {}    # member_id: Member
+        self.index = SearchIndex()
+        self.due_dates = DueDateIndex(self.loan_period)
+        self.leaderboard = RatingLeaderboard()
+        self.books_file = books_file
+        self.members_file = members_file
+        self.journal = LibraryJournal(journal_path, group_commit)
+        self.compact_every = compact_every  # Journal records before a background snapshot
+        self.compaction = None              # Running compaction thread
+        self.compaction_lock = threading.Lock()
+        # Thread-safe mode: books and members are locked by stripe, the shared indexes by one short lock
+        self.locks = StripedLocks(lock_stripes) if thread_safe else None
+        self.load_data()
+    
+    def load_data(self):
+        """Load the latest snapshot and replay the journal on top of it"""
+        books_through = members_through = 0  # Last journal record each snapshot holds
+        try:
+            # Load books
+            with open(self.books_file, "r") as f:
+                books_data = json.load(f)
+                books_through = books_data["through"]
+                self.books = {isbn: Book.from_dict(data) 
+                            for isbn, data in books_data["books"].items()}
+        except FileNotFoundError:
+            pass
+        
+        try:
+            # Load members
+            with open(self.members_file, "r") as f:
+                members_data = json.load(f)
+                members_through = members_data["through"]
+                self.members = {id_: Member.from_dict(data) 
+                              for id_, data in members_data["members"].items()}
+        except FileNotFoundError:
+            pass
+        
+        # A crash mid-compaction can leave books.json newer than members.json, so each side of a record
+        # is replayed only onto a snapshot that does not hold it yet
+        replayed = 0
+        seq = max(books_through, members_through)
+        for path in (self.journal.old_path, self.journal.path):
+            for record in LibraryJournal.replay(path):
+                self._apply_record(record, books=record["seq"] > books_through,
+                                   members=record["seq"] > members_through)
+                seq = max(seq, record["seq"])
+                if path == self.journal.path:
+                    replayed += 1
+        
+        self.index.clear()
+        for book in self.books.values():
+            self.index.add(book)
+        self.due_dates.build(self.members.values())
+        self.leaderboard.build(self.books.values())
+        for member_id in self.members:
+            self.member_ids.observe(member_id)
+        
+        if self.journal.file is None:
+            self.journal.open(replayed, seq)
+        if os.path.exists(self.journal.old_path):
+            self.compact()  # Finish the compaction a crash interrupted
+    
+    def _apply_record(self, record, books=True, members=True):
+        """Apply one journal record to the in-memory books and members (books or members False skips that side)"""
+        op = record["op"]
+        if op == "add_books":
+            if books:
+                for title, author, isbn, category, copies in record["rows"]:
+                    book = self.books.get(isbn)
+                    if book is None:
+                        self.books[isbn] = Book(title, author, isbn, category, copies)
+                    else:
+                        book.total_copies += copies
+                        book.available_copies += copies
+        elif op == "rate":
+            if books:
+                self.books[record["isbn"]].add_rating(record["stars"])
+        elif op == "add_members":
+            if members:
+                for member_id, name in record["members"]:
+                    self.members[member_id] = Member(name, member_id)
+        elif op == "borrow":
+            if books:
+                book = self.books[record["isbn"]]
+                book.available_copies -= 1
+                book.borrowers.append(record["member_id"])
+            if members:
+                member = self.members[record["member_id"]]
+                member.borrowed_books[record["isbn"]] = datetime.fromisoformat(record["timestamp"])
+        elif op == "return":
+            if books:
+                book = self.books[record["isbn"]]
+                book.available_copies += 1
+                book.borrowers.remove(record["member_id"])
+            if members:
+                isbn = record["isbn"]
+                member = self.members[record["member_id"]]
+                borrow_date = member.borrowed_books.pop(isbn)
+                member.history.append(BorrowRecord(isbn, self.books[isbn].title, borrow_date.strftime("%Y-%m-%d"),
+                                                   record["return_date"], record["fine"]))
+                member.fines += record["fine"] - member.accrued_fines.pop(isbn, 0)  # Part may be charged already
+        elif op == "charge":
+            if members:
+                self.members[record["member_id"]].fines += record["amount"]
+        elif op == "accrue":
+            if members:
+                for member_id, isbn, fine, due in record["charges"]:
+                    member = self.members[member_id]
+                    member.fines += due
+                    member.accrued_fines[isbn] = fine
+    
+    def _locked(self, isbns=(), member_ids=(), everything=False):
+        """Lock the given books and members in thread-safe mode (a no-op otherwise)"""
+        if self.locks is None:
+            return nullcontext()
+        if everything:
+            return self.locks.hold()
+        return self.locks.hold([("book", isbn) for isbn in isbns] +
+                               [("member", member_id) for member_id in member_ids])
+    
+    @contextmanager
+    def _write(self, isbns=(), member_ids=(), everything=False):
+        """Lock the given books and members while they change, then write the journal records they queued"""
+        with self._locked(isbns, member_ids, everything):
+            yield
+        self._commit()
+    
+    def _log(self, op, **fields):
+        """Apply one operation to the books and members and queue its journal record (call while locked)"""
+        record = {"op": op, **fields}
+        self._apply_record(record)
+        self.journal.enqueue(record)
+    
+    def _commit(self):
+        """Write queued journal records, outside any book or member lock"""
+        self.journal.flush()
+        if self.journal.records >= self.compact_every:
+            self.compact(background=True)
+    
+    def compact(self, background=False):
+        """Fold the journal into a fresh snapshot of books.json and members.json"""
+        if not self.compaction_lock.acquire(blocking=not background):
+            return  # Another compaction is already running
+        
+        with self._locked(everything=True):
+            self.journal.rotate()
+            books_data = {"through": self.journal.seq,
+                          "books": {isbn: book.to_dict() for isbn, book in self.books.items()}}
+            members_data = {"through": self.journal.seq,
+                            "members": {id_: member.to_dict() for id_, member in self.members.items()}}
+        
+        def write_snapshot():
+            try:
+                write_json_atomic(self.books_file, books_data)
+                write_json_atomic(self.members_file, members_data)
+                os.remove(self.journal.old_path)
+            finally:
+                self.compaction_lock.release()
+        
+        if background:
+            self.compaction = threading.Thread(target=write_snapshot, daemon=True)
+            self.compaction.start()
+        else:
+            write_snapshot()
+    
+    def save_data(self):
+        """Save library data to JSON files (a full snapshot)"""
+        self.compact()
+    
+    def close(self):
+        """Flush the journal and wait for any running compaction"""
+        if self.compaction is not None:
+            self.compaction.join()
+        self.journal.close()
+    
+    def _add_copies(self, isbn, copies):
+        """Add copies to a book in memory; False if there is no such book"""
+        book = self.books.get(isbn)
+        if book is None:
+            return False
+        self._log("add_books", rows=[(book.title, book.author, isbn, book.category, copies)])
+        return True
+    
+    def _insert_book(self, book):
+        """Add a new book to the catalog and the search index"""
+        self._log("add_books", rows=[(book.title, book.author, book.isbn, book.category, book.total_copies)])
+        with self.index_lock:
+            self.index.add(self.books[book.isbn])
+    
+    def _import_batch(self, rows):
+        """Add or merge a batch of validated catalog rows and commit it as one journal record"""
+        with self._write(everything=True), self.index_lock:
+            added = list(dict.fromkeys(isbn for _, _, isbn, _, _ in rows if isbn not in self.books))
+            self._log("add_books", rows=rows)
+            for isbn in added:
+                self.index.add(self.books[isbn])
+        return len(added), len(rows) - len(added)
+    
+    def _insert_members(self, pairs):
+        """Add new members given as (member_id, name) pairs"""
+        self._log("add_members", members=pairs)
+    
+    def _borrow_state(self, member_id, isbn):
+        """What borrow_book checks, read from memory"""
+        book = self.books.get(isbn)
+        member = self.members.get(member_id)
+        if book is None or member is None:
+            return None
+        return book.available_copies, isbn in member.borrowed_books, len(member.borrowed_books), member.fines
+    
+    def _open_loan(self, member_id, isbn, borrow_date):
+        """Lend a copy and add the loan to the due-date index"""
+        self._log("borrow", member_id=member_id, isbn=isbn, timestamp=borrow_date.isoformat())
+        with self.index_lock:
+            self.due_dates.add(member_id, isbn, borrow_date)
+    
+    def _loan(self, member_id, isbn):
+        """What return_book needs to price a loan, read from memory"""
+        book = self.books.get(isbn)
+        member = self.members.get(member_id)
+        if book is None or member is None:
+            return None
+        return book.title, member.borrowed_books.get(isbn), member.accrued_fines.get(isbn, 0)
+    
+    def _close_loan(self, member_id, isbn, record, charge):
+        """Take a copy back and drop the loan from the due-date index (the charge follows from accrued_fines)"""
+        self._log("return", member_id=member_id, isbn=isbn, return_date=record.return_date, fine=record.fine)
+        with self.index_lock:
+            self.due_dates.remove(member_id, isbn)
+    
+    def _fines(self, member_id):
+        """A member's outstanding fines, or None if there is no such member"""
+        member = self.members.get(member_id)
+        return None if member is None else member.fines
+    
+    def _charge(self, member_id, amount):
+        """Add amount (negative for a payment) to a member's fines"""
+        self._log("charge", member_id=member_id, amount=amount)
+    
+    def _add_rating(self, isbn, stars):
+        """Rate a book in memory and move it on the leaderboards"""
+        book = self.books.get(isbn)
+        if book is None:
+            return None
+        self._log("rate", isbn=isbn, stars=stars)
+        with self.index_lock:
+            self.leaderboard.update(book)
+        return book
+    
+    def _overdue_loans(self, now):
+        """Overdue loans from the due-date index, oldest first"""
+        with self.index_lock:
+            loans = self.due_dates.overdue_loans(now)
+        for _, member_id, isbn in loans:
+            borrow_date = self.members[member_id].borrowed_books.get(isbn)
+            if borrow_date is None:
+                continue  # Returned since the index was read
+            yield member_id, isbn, self.books[isbn].title, borrow_date
+    
+    def _accrued(self, loans):
+        """Fines already charged on the given loans"""
+        return {(loan["member_id"], loan["isbn"]): self.members[loan["member_id"]].accrued_fines.get(loan["isbn"], 0)
+                for loan in loans}
+    
+    def _accrue(self, charges):
+        """Charge overdue fines as one journal record"""
+        self._log("accrue", charges=charges)
+    
+    def _member_record(self, member_id):
+        """A member's details, copied out of memory"""
+        member = self.members.get(member_id)
+        if member is None:
+            return None
+        loans = [(isbn, self.books[isbn].title, borrow_date) for isbn, borrow_date in member.borrowed_books.items()]
+        return member.name, member.fines, loans, [record.to_dict() for record in member.history]
+    
+    def top_rated(self, category=None, k=10):
+        """Best-rated books overall or in one category"""
+        with self.index_lock:
+            isbns = self.leaderboard.top(category, k)
+        return [self._rating_entry(self.books[isbn]) for isbn in isbns]
+    
+    def advanced_search(self, limit=None, offset=0, match="substring", **criteria):
+        """Search on several fields at once (e.g. author AND category) with pagination"""
+        if any(field not in SearchIndex.FIELDS for field in criteria):
+            return []
+        
+        if match == "fuzzy":
+            # Ranked by combined score instead of catalog order
+            end = None if limit is None else offset + limit
+            with self.index_lock:
+                totals = None
+                for field, query in criteria.items():
+                    scores = {doc_id: score for score, doc_id in
+                              self.index.fuzzy_search(field, query, limit=max(end or 0, 50),
+                                                      candidate_limit=max(end or 0, 200))}
+                    totals = scores if totals is None else \
+                        {doc_id: totals[doc_id] + score for doc_id, score in scores.items() if doc_id in totals}
+                ranked = sorted((totals or {}).items(), key=lambda item: (-item[1], item[0]))
+                return [self.index.docs[doc_id] for doc_id, _ in ranked[offset:end]]
+        
+        with self.index_lock:
+            matched = None
+            for field, query in criteria.items():
+                doc_ids = self.index.search(field, query, match)
+                matched = doc_ids if matched is None else matched & doc_ids
+                if not matched:
+                    return []
+            
+            if matched is None:
+                matched = range(len(self.index.docs))
+            ordered = sorted(matched)  # Catalog (insertion) order, like the old linear scan
+            end = None if limit is None else offset + limit
+            return [self.index.docs[doc_id] for doc_id in ordered[offset:end]]
+    
+    def _history_pairs(self):
+        """Yield (member_id, isbn) for every completed borrow"""
+        for member in self.members.values():
+            for record in member.history:
+                yield member.member_id, record["isbn"]
+    
+    def _titles(self, isbns):
+        """Map ISBNs to titles"""
+        return {isbn: self.books[isbn].title for isbn in isbns if isbn in self.books}
+
+class SQLiteLibrary(LibraryBase):
+    """Library backed by a SQLite database instead of in-memory dicts and JSON files"""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS books (
+            isbn TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            category TEXT NOT NULL,
+            total_copies INTEGER NOT NULL,
+            available_copies INTEGER NOT NULL,
+            rating_count INTEGER NOT NULL DEFAULT 0,
+            rating_sum INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS books_title ON books(title COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS books_author ON books(author COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS books_category ON books(category COLLATE NOCASE);
+        -- Leaderboards: read the top K straight off these expression indexes
+        CREATE INDEX IF NOT EXISTS books_rating ON books({score} DESC, rating_count DESC, isbn) WHERE rating_count > 0;
+        CREATE INDEX IF NOT EXISTS books_category_rating ON books(category, {score} DESC, rating_count DESC, isbn)
+            WHERE rating_count > 0;
+
+        CREATE TABLE IF NOT EXISTS rating_histogram (
+            isbn TEXT NOT NULL REFERENCES books(isbn),
+            stars INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (isbn, stars)
+        );
+
+        CREATE TABLE IF NOT EXISTS members (
+            member_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            fines REAL NOT NULL DEFAULT 0
+        );
+
+        CREATE TABLE IF NOT EXISTS loans (
+            member_id TEXT NOT NULL REFERENCES members(member_id),
+            isbn TEXT NOT NULL REFERENCES books(isbn),
+            borrow_date TEXT NOT NULL,
+            accrued REAL NOT NULL DEFAULT 0,  -- Fine already charged on this loan
+            PRIMARY KEY (member_id, isbn)
+        );
+        CREATE INDEX IF NOT EXISTS loans_isbn ON loans(isbn);
+        CREATE INDEX IF NOT EXISTS loans_borrow_date ON loans(borrow_date);
+
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY,
+            member_id TEXT NOT NULL REFERENCES members(member_id),
+            isbn TEXT NOT NULL,
+            title TEXT NOT NULL,
+            borrow_date TEXT NOT NULL,
+            return_date TEXT NOT NULL,
+            fine REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS history_member ON history(member_id);
+
+        -- Trigram full-text index so substring searches don't scan the books table
+        CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+            title, author, category, content='books', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS books_fts_insert AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts(rowid, title, author, category)
+            VALUES (new.rowid, new.title, new.author, new.category);
+        END;
+    """
+    SCORE_SQL = (f"((rating_sum + {RatingLeaderboard.PRIOR_MEAN * RatingLeaderboard.PRIOR_WEIGHT}) "
+                 f"/ (rating_count + {RatingLeaderboard.PRIOR_WEIGHT}))")
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    
+    def __init__(self, name, db_path="library.db", thread_safe=False):
+        super().__init__(name, thread_safe)
+        self.db_path = db_path
+        self.local = threading.local()  # One connection per thread; WAL lets readers run in parallel
+        # SQLite allows one writer at a time, so thread-safe mode serializes write transactions
+        self.write_lock = threading.Lock() if thread_safe else nullcontext()
+        self.load_data()
+    
+    @property
+    def conn(self):
+        """This thread's database connection"""
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self.local.conn = conn
+        return conn
+    
+    @contextmanager
+    def _write(self, isbns=(), member_ids=(), everything=False):
+        """Run a write transaction (committed on success, rolled back on error)"""
+        with self.write_lock, self.conn:
+            yield
+    
+    def _locked(self, isbns=(), member_ids=(), everything=False):
+        """Readers see committed data without locking; holding everything means holding off writers"""
+        return self.write_lock if everything else nullcontext()
+    
+    def load_data(self):
+        """Open the database; nothing is read into memory up front"""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA.replace("{score}", self.SCORE_SQL))
+        # Same-width IDs are zero-padded, so the largest string is the last ID issued
+        last = self.conn.execute("SELECT MAX(member_id) FROM members WHERE length(member_id) = ?",
+                                 (self.member_ids.width,)).fetchone()[0]
+        if last is not None:
+            self.member_ids.observe(last)
+    
+    def save_data(self):
+        """Commit any pending changes"""
+        self.conn.commit()
+    
+    def close(self):
+        """Close this thread's database connection"""
+        self.conn.commit()
+        self.conn.close()
+        self.local.conn = None
+    
+    def _books_from_rows(self, rows):
+        """Build Book objects (with borrowers and ratings) from books rows"""
+        books = {}
+        for row in rows:
+            book = Book(row["title"], row["author"], row["isbn"], row["category"], row["total_copies"])
+            book.available_copies = row["available_copies"]
+            book.rating_count = row["rating_count"]
+            book.rating_sum = row["rating_sum"]
+            books[book.isbn] = book
+        
+        isbns = list(books)
+        for start in range(0, len(isbns), 500):
+            chunk = isbns[start:start+500]
+            marks = ",".join("?" * len(chunk))
+            for isbn, member_id in self.conn.execute(
+                    f"SELECT isbn, member_id FROM loans WHERE isbn IN ({marks}) ORDER BY rowid", chunk):
+                books[isbn].borrowers.append(member_id)
+            for isbn, stars, count in self.conn.execute(
+                    f"SELECT isbn, stars, count FROM rating_histogram WHERE isbn IN ({marks})", chunk):
+                books[isbn].rating_histogram[stars - 1] = count
+        return list(books.values())
+    
+    def get_book(self, isbn):
+        """Fetch a single book by ISBN, or None"""
+        rows = self.conn.execute("SELECT * FROM books WHERE isbn = ?", (isbn,)).fetchall()
+        books = self._books_from_rows(rows)
+        return books[0] if books else None
+    
+    def _add_copies(self, isbn, copies):
+        """Add copies to a stored book; False if there is no such book"""
+        return self.conn.execute(
+            "UPDATE books SET total_copies = total_copies + ?, available_copies = available_copies + ? "
+            "WHERE isbn = ?", (copies, copies, isbn)).rowcount > 0
+    
+    def _insert_book(self, book):
+        """Insert a new books row"""
+        self.conn.execute(
+            "INSERT INTO books (isbn, title, author, category, total_copies, available_copies) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (book.isbn, book.title, book.author, book.category, book.total_copies, book.available_copies))
+    
+    def _import_batch(self, rows):
+        """Add or merge a batch of validated catalog rows in one transaction"""
+        with self._write(everything=True):
+            added = self.conn.executemany(
+                "INSERT OR IGNORE INTO books (isbn, title, author, category, total_copies, available_copies) "
+                "VALUES (?, ?, ?, ?, 0, 0)",
+                ((isbn, title, author, category) for title, author, isbn, category, _ in rows)).rowcount
+            self.conn.executemany(
+                "UPDATE books SET total_copies = total_copies + ?, available_copies = available_copies + ? "
+                "WHERE isbn = ?", ((copies, copies, isbn) for _, _, isbn, _, copies in rows))
+        return added, len(rows) - added
+    
+    def _insert_members(self, pairs):
+        """Insert new members rows"""
+        self.conn.executemany("INSERT INTO members (member_id, name) VALUES (?, ?)", pairs)
+    
+    def _borrow_state(self, member_id, isbn):
+        """What borrow_book checks, in three indexed lookups"""
+        book = self.conn.execute(
+            "SELECT available_copies FROM books WHERE isbn = ?", (isbn,)).fetchone()
+        member = self.conn.execute(
+            "SELECT fines FROM members WHERE member_id = ?", (member_id,)).fetchone()
+        if book is None or member is None:
+            return None
+        borrowed, holds_it = self.conn.execute(
+            "SELECT COUNT(*), IFNULL(SUM(isbn = ?), 0) FROM loans WHERE member_id = ?", (isbn, member_id)).fetchone()
+        return book["available_copies"], bool(holds_it), borrowed, member["fines"]
+    
+    def _open_loan(self, member_id, isbn, borrow_date):
+        """Insert the loan and take a copy off the shelf"""
+        self.conn.execute(
+            "INSERT INTO loans (member_id, isbn, borrow_date) VALUES (?, ?, ?)",
+            (member_id, isbn, borrow_date.strftime(self.DATE_FORMAT)))
+        self.conn.execute(
+            "UPDATE books SET available_copies = available_copies - 1 WHERE isbn = ?", (isbn,))
+    
+    def _loan(self, member_id, isbn):
+        """What return_book needs to price a loan"""
+        book = self.conn.execute("SELECT title FROM books WHERE isbn = ?", (isbn,)).fetchone()
+        member = self.conn.execute(
+            "SELECT 1 FROM members WHERE member_id = ?", (member_id,)).fetchone()
+        if book is None or member is None:
+            return None
+        
+        loan = self.conn.execute(
+            "SELECT borrow_date, accrued FROM loans WHERE member_id = ? AND isbn = ?",
+            (member_id, isbn)).fetchone()
+        if loan is None:
+            return book["title"], None, 0
+        return book["title"], datetime.strptime(loan["borrow_date"], self.DATE_FORMAT), loan["accrued"]
+    
+    def _close_loan(self, member_id, isbn, record, charge):
+        """Move the loan to history and put the copy back on the shelf"""
+        self.conn.execute("DELETE FROM loans WHERE member_id = ? AND isbn = ?", (member_id, isbn))
+        self.conn.execute(
+            "UPDATE books SET available_copies = available_copies + 1 WHERE isbn = ?", (isbn,))
+        self.conn.execute(
+            "INSERT INTO history (member_id, isbn, title, borrow_date, return_date, fine) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (member_id, isbn, record.title, record.borrow_date, record.return_date, record.fine))
+        self.conn.execute("UPDATE members SET fines = fines + ? WHERE member_id = ?", (charge, member_id))
+    
+    def _fines(self, member_id):
+        """A member's outstanding fines, or None if there is no such member"""
+        member = self.conn.execute(
+            "SELECT fines FROM members WHERE member_id = ?", (member_id,)).fetchone()
+        return None if member is None else member["fines"]
+    
+    def _charge(self, member_id, amount):
+        """Add amount (negative for a payment) to a member's fines"""
+        self.conn.execute("UPDATE members SET fines = fines + ? WHERE member_id = ?", (amount, member_id))
+    
+    def _add_rating(self, isbn, stars):
+        """Update the rating aggregates and histogram"""
+        updated = self.conn.execute(
+            "UPDATE books SET rating_count = rating_count + 1, rating_sum = rating_sum + ? WHERE isbn = ?",
+            (stars, isbn)).rowcount
+        if not updated:
+            return None
+        self.conn.execute(
+            "INSERT INTO rating_histogram (isbn, stars, count) VALUES (?, ?, 1) "
+            "ON CONFLICT (isbn, stars) DO UPDATE SET count = count + 1", (isbn, stars))
+        return self.get_book(isbn)
+    
+    def top_rated(self, category=None, k=10):
+        """Best-rated books overall or in one category"""
+        sql = "SELECT * FROM books WHERE rating_count > 0"
+        params = []
+        if category is not None:
+            sql += " AND category = ?"
+            params.append(category)
+        sql += f" ORDER BY {self.SCORE_SQL} DESC, rating_count DESC, isbn LIMIT ?"
+        return [self._rating_entry(book) for book in self._books_from_rows(self.conn.execute(sql, params + [k]))]
+    
+    def _history_pairs(self):
+        """Yield (member_id, isbn) for every completed borrow"""
+        yield from self.conn.execute("SELECT member_id, isbn FROM history")
+    
+    def _titles(self, isbns):
+        """Map ISBNs to titles"""
+        isbns = list(isbns)
+        marks = ",".join("?" * len(isbns))
+        return dict(self.conn.execute(f"SELECT isbn, title FROM books WHERE isbn IN ({marks})", isbns).fetchall())
+    
+    def _overdue_loans(self, now):
+        """Overdue loans, oldest first (a range scan on loans_borrow_date)"""
+        cutoff = (now - timedelta(days=self.loan_period + 1)).strftime(self.DATE_FORMAT)
+        return [(row["member_id"], row["isbn"], row["title"], datetime.strptime(row["borrow_date"], self.DATE_FORMAT))
+                for row in self.conn.execute(
+                    "SELECT loans.member_id, loans.isbn, loans.borrow_date, books.title FROM loans "
+                    "JOIN books ON books.isbn = loans.isbn WHERE loans.borrow_date <= ? "
+                    "ORDER BY loans.borrow_date", (cutoff,))]
+    
+    def _accrued(self, loans):
+        """Fines already charged, for every loan that has any"""
+        return {(row["member_id"], row["isbn"]): row["accrued"]
+                for row in self.conn.execute("SELECT member_id, isbn, accrued FROM loans WHERE accrued > 0")}
+    
+    def _accrue(self, charges):
+        """Charge overdue fines in two batched updates"""
+        self.conn.executemany("UPDATE loans SET accrued = ? WHERE member_id = ? AND isbn = ?",
+                              [(fine, member_id, isbn) for member_id, isbn, fine, _ in charges])
+        self.conn.executemany("UPDATE members SET fines = fines + ? WHERE member_id = ?",
+                              [(due, member_id) for member_id, _, _, due in charges])
+    
+    def advanced_search(self, limit=None, offset=0, match="substring", **criteria):
+        """Search on several fields at once (e.g. author AND category) with pagination"""
+        conditions = []
+        params = []
+        patterns = {}
+        for field, query in criteria.items():
+            if field not in SearchIndex.FIELDS:
+                return []
+            query = query.lower()
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            conditions.append(f"books_fts.{field} LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+            if match == "prefix" and SearchIndex.tokenize(query):
+                patterns[field] = re.compile(r"\b" + re.escape(query))
+        
+        if match == "fuzzy":
+            return self._fuzzy_search(criteria, limit, offset)
+        
+        sql = "SELECT books.* FROM books JOIN books_fts ON books_fts.rowid = books.rowid"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY books.rowid"
+        
+        if not patterns:
+            # Plain substring matches can be paginated inside SQLite
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+            return self._books_from_rows(self.conn.execute(sql, params))
+        
+        # Word-prefix matches: the trigram index finds candidates, then the word boundary is checked here
+        rows = [row for row in self.conn.execute(sql, params)
+                if all(pattern.search(row[field].lower()) for field, pattern in patterns.items())]
+        end = None if limit is None else offset + limit
+        return self._books_from_rows(rows[offset:end])
+    
+    def _fuzzy_search(self, criteria, limit=None, offset=0, candidate_limit=50):
+        """Rank FTS trigram candidates by fuzzy_score"""
+        end = None if limit is None else offset + limit
+        totals = None
+        for field, query in criteria.items():
+            grams = [gram for gram in SearchIndex.fuzzy_trigrams(query) if SearchIndex.PAD not in gram]
+            if not grams:
+                return []
+            match_expr = " OR ".join('"' + gram.replace('"', '""') + '"' for gram in grams)
+            rows = self.conn.execute(
+                f"SELECT books.rowid, books.{field} FROM books_fts JOIN books ON books.rowid = books_fts.rowid "
+                f"WHERE books_fts MATCH ? ORDER BY books_fts.rank LIMIT ?",
+                (f"{field} : ({match_expr})", max(candidate_limit, end or 0))).fetchall()
+            scores = {rowid: fuzzy_score(query, text) for rowid, text in rows}
+            totals = scores if totals is None else \
+                {rowid: totals[rowid] + score for rowid, score in scores.items() if rowid in totals}
+        
+        ranked = [rowid for rowid, _ in sorted((totals or {}).items(), key=lambda item: (-item[1], item[0]))]
+        page = ranked[offset:end]
+        if not page:
+            return []
+        marks = ",".join("?" * len(page))
+        rows = {row["rowid"]: row for row in self.conn.execute(
+            f"SELECT rowid, * FROM books WHERE rowid IN ({marks})", page)}
+        return self._books_from_rows([rows[rowid] for rowid in page])
+    
+    def _member_record(self, member_id):
+        """A member's details in three queries"""
+        member = self.conn.execute(
+            "SELECT name, fines FROM members WHERE member_id = ?", (member_id,)).fetchone()
+        if member is None:
+            return None
+        
+        loans = [(row["isbn"], row["title"], datetime.strptime(row["borrow_date"], self.DATE_FORMAT))
+                 for row in self.conn.execute(
+                     "SELECT books.title, loans.isbn, loans.borrow_date FROM loans "
+                     "JOIN books ON books.isbn = loans.isbn WHERE loans.member_id = ? ORDER BY loans.rowid",
+                     (member_id,))]
+        history = [{"isbn": row["isbn"], "title": row["title"], "borrow_date": row["borrow_date"],
+                    "return_date": row["return_date"], "fine": row["fine"]}
+                   for row in self.conn.execute(
+                       "SELECT * FROM history WHERE member_id = ? ORDER BY id", (member_id,))]
+        return member["name"], member["fines"], loans, history
+    
+    def import_library(self, library):
+        """Copy every book, member, loan and history record from an in-memory Library into an empty database"""
+        with self._write(everything=True):
+            # Refusing a second import keeps history rows from being copied twice
+            if self.conn.execute("SELECT EXISTS (SELECT 1 FROM books) OR EXISTS (SELECT 1 FROM members)").fetchone()[0]:
+                return {"status": "error", "message": f"{self.db_path} already holds a library; nothing was imported"}
+            self.conn.executemany(
+                "INSERT INTO books (isbn, title, author, category, total_copies, available_copies, "
+                "rating_count, rating_sum) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((b.isbn, b.title, b.author, b.category, b.total_copies, b.available_copies,
+                  b.rating_count, b.rating_sum) for b in library.books.values()))
+            self.conn.executemany(
+                "INSERT INTO rating_histogram (isbn, stars, count) VALUES (?, ?, ?)",
+                ((b.isbn, stars, count) for b in library.books.values()
+                 for stars, count in enumerate(b.rating_histogram, 1) if count))
+            self.conn.executemany(
+                "INSERT INTO members (member_id, name, fines) VALUES (?, ?, ?)",
+                ((m.member_id, m.name, m.fines) for m in library.members.values()))
+            self.conn.executemany(
+                "INSERT INTO loans (member_id, isbn, borrow_date, accrued) VALUES (?, ?, ?, ?)",
+                ((m.member_id, isbn, date.strftime(self.DATE_FORMAT), m.accrued_fines.get(isbn, 0))
+                 for m in library.members.values() for isbn, date in m.borrowed_books.items()))
+            self.conn.executemany(
+                "INSERT INTO history (member_id, isbn, title, borrow_date, return_date, fine) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                ((m.member_id, r["isbn"], r["title"], r["borrow_date"], r["return_date"], r["fine"])
+                 for m in library.members.values() for r in m.history))
+        for member_id in library.members:
+            self.member_ids.observe(member_id)
+        return {"status": "success",
+                "message": f"Migrated {len(library.books)} books and {len(library.members)} members to {self.db_path}"}
+
+def migrate_json_to_sqlite(db_path="library.db", journal_path="library.journal",
+                           books_file="books.json", members_file="members.json"):
+    """Import books.json, members.json and the journal into a new SQLite database (running it again changes nothing)"""
+    source = Library("Migration", journal_path=journal_path, books_file=books_file, members_file=members_file)
+    target = SQLiteLibrary(source.name, db_path)
+    result = target.import_library(source)
+    source.close()
+    target.close()
+    return result
+
+def open_library(name, backend="json", **options):
+    """Create a Library on the chosen storage backend ("json" or "sqlite")"""
+    if backend == "sqlite":
+        return SQLiteLibrary(name, **options)
+    return Library(name, **options)
+
+def benchmark_search(num_books=200000, num_queries=200):
+    """Compare indexed search against the linear scan on a synthetic catalog"""
+    rng = random.Random(42)
+    words = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9)))
+             for _ in range(5000)]
+    categories = ["Fiction", "Science", "History", "Poetry", "Travel", "Biography"]
+
+    books = {}
+    index = SearchIndex()
+    start = time.perf_counter()
+    for i in range(num_books):
+        book = Book(" ".join(rng.choices(words, k=rng.randint(2, 5))),
+                    " ".join(rng.choices(words, k=2)),
+                    f"{i:013d}", rng.choice(categories))
+        books[book.isbn] = book
+        index.add(book)
+    build_time = time.perf_counter() - start
+
+    queries = [rng.choice(words)[:rng.randint(3, 6)] for _ in range(num_queries)]
+
+    start = time.perf_counter()
+    for query in queries:
+        linear_search(books, query, "title")
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for query in queries:
+        sorted(index.search("title", query))
+    index_time = time.perf_counter() - start
+
+    # Misspell one letter of a whole word for the fuzzy queries
+    typos = []
+    for _ in range(num_queries):
+        word = rng.choice(words)
+        i = rng.randrange(len(word))
+        typos.append(word[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + word[i+1:])
+    start = time.perf_counter()
+    for query in typos:
+        index.fuzzy_search("title", query)
+    fuzzy_time = time.perf_counter() - start
+
+    print(f"\nSearch benchmark ({num_books} books, {num_queries} queries)")
+    print(f"Index build:  {build_time:.2f}s")
+    print(f"Linear scan:  {scan_time / num_queries * 1000:.3f} ms/query")
+    print(f"Indexed:      {index_time / num_queries * 1000:.3f} ms/query")
+    print(f"Speedup:      {scan_time / index_time:.1f}x")
+    print(f"Fuzzy top-10: {fuzzy_time / num_queries * 1000:.3f} ms/query")
+
+def benchmark_overdue(num_loans=1000000):
+    """Time building the due-date index and listing overdue loans"""
+    rng = random.Random(42)
+    now = datetime.now()
+    members = []
+    for i in range(num_loans // 3):
+        member = Member(f"Member {i}", str(i))
+        for j in range(3):
+            member.borrowed_books[f"{i}-{j}"] = now - timedelta(seconds=rng.randint(0, 30 * 86400))
+        members.append(member)
+
+    due_dates = DueDateIndex(14)
+    start = time.perf_counter()
+    due_dates.build(members)
+    build_time = time.perf_counter() - start
+    active = len(due_dates.pending)
+
+    start = time.perf_counter()
+    overdue = due_dates.overdue_loans(now)
+    scan_time = time.perf_counter() - start
+
+    print(f"\nOverdue benchmark ({active} active loans)")
+    print(f"Index build:   {build_time:.2f}s")
+    print(f"Overdue pass:  {scan_time:.2f}s ({len(overdue)} overdue)")
+
+def benchmark_memory(num_records=100000):
+    """Bytes per Book and Member: the old __dict__ layout against the __slots__ records"""
+    rng = random.Random(42)
+    categories = ["Fiction", "Science", "History", "Poetry", "Travel", "Biography"]
+    authors = [f"Author {i}" for i in range(1000)]
+    history = {"isbn": "0", "title": "Title", "borrow_date": "2024-01-01",
+               "return_date": "2024-01-15", "fine": 0.0}
+
+    def plain_book(i):
+        # Attribute layout of Book before __slots__ (each field is a fresh string, as json.load makes it)
+        return SimpleNamespace(title=f"Title {i}", author="".join(rng.choice(authors)),
+                               isbn=f"{i:013d}", category="".join(rng.choice(categories)),
+                               total_copies=2, available_copies=1, borrowers=[str(i % 90000)],
+                               ratings=[rng.randint(1, 5) for _ in range(10)])
+
+    def slots_book(i):
+        book = Book(f"Title {i}", "".join(rng.choice(authors)), f"{i:013d}",
+                    "".join(rng.choice(categories)), 2)
+        book.available_copies = 1
+        book.borrowers = [sys.intern(str(i % 90000))]
+        book.ratings = [rng.randint(1, 5) for _ in range(10)]
+        return book
+
+    def plain_member(i):
+        return SimpleNamespace(name=f"Member {i}", member_id=str(i), borrowed_books={},
+                               history=[dict(history) for _ in range(5)], fines=0.0, accrued_fines={})
+
+    def slots_member(i):
+        member = Member(f"Member {i}", str(i))
+        member.history = [BorrowRecord.from_dict(history) for _ in range(5)]
+        return member
+
+    def measure(factory):
+        tracemalloc.start()
+        records = [factory(i) for i in range(num_records)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del records
+        return size / num_records
+
+    print(f"\nMemory benchmark ({num_records} records, bytes per record)")
+    print(f"Book   (__dict__): {measure(plain_book):8.0f}")
+    print(f"Book   (__slots__): {measure(slots_book):7.0f}")
+    print(f"Member (__dict__): {measure(plain_member):8.0f}")
+    print(f"Member (__slots__): {measure(slots_member):7.0f}")
+
+def benchmark_import(num_books=200000):
+    """Time a bulk catalog import against add_book in a loop"""
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = os.path.join(tmp, "catalog.csv")
+        with open(catalog, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CATALOG_FIELDS)
+            for i in range(num_books):
+                digits = f"978{rng.randrange(10**9):09d}"
+                check = -sum(int(d) * (1 if j % 2 == 0 else 3) for j, d in enumerate(digits)) % 10
+                writer.writerow([f"Title {i}", f"Author {i % 5000}", digits + str(check),
+                                 rng.choice(["Fiction", "Science", "History"]), rng.randint(1, 3)])
+
+        def fresh_library(prefix):
+            return Library(prefix, journal_path=os.path.join(tmp, f"{prefix}.journal"),
+                           books_file=os.path.join(tmp, f"{prefix}-books.json"),
+                           members_file=os.path.join(tmp, f"{prefix}-members.json"))
+
+        library = fresh_library("import")
+        result = library.import_catalog(catalog)
+        library.close()
+
+        rows = []
+        for chunk in read_catalog(catalog):
+            rows += _parse_catalog_chunk(chunk)[0]
+        library = fresh_library("loop")
+        start = time.perf_counter()
+        for title, author, isbn, category, copies in rows:
+            library.add_book(title, author, isbn, category, copies)
+        loop_time = time.perf_counter() - start
+        library.close()
+
+    print(f"\nImport benchmark ({num_books} rows)")
+    print(f"import_catalog:    {result['rows_per_sec']:.0f} rows/sec ({result['added']} new, {result['merged']} merged)")
+    print(f"add_book loop:     {num_books / loop_time:.0f} rows/sec")
+
+def check_loan_invariants(library):
+    """Return a list of problems: lost or double-lent copies, over-limit members"""
+    problems = []
+    loans = {}  # ISBN: member_ids holding it
+    for member in library.members.values():
+        if len(member.borrowed_books) > 3:
+            problems.append(f"member {member.member_id} holds {len(member.borrowed_books)} books")
+        for isbn in member.borrowed_books:
+            loans.setdefault(isbn, []).append(member.member_id)
+    for isbn, book in library.books.items():
+        holders = loans.get(isbn, [])
+        if book.available_copies < 0 or book.available_copies + len(holders) != book.total_copies:
+            problems.append(f"book {isbn}: {book.available_copies} available + {len(holders)} lent "
+                            f"!= {book.total_copies} copies")
+        if sorted(book.borrowers) != sorted(holders):
+            problems.append(f"book {isbn}: borrowers {book.borrowers} != holders {holders}")
+    return problems
+
+def stress_test_concurrency(num_threads=8, operations=20000, num_books=20, num_members=200, thread_safe=True):
+    """Hammer borrow/return from many threads, then check no copy was lost or double-lent"""
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible to expose races
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"journal_path": os.path.join(tmp, "library.journal"),
+                 "books_file": os.path.join(tmp, "books.json"),
+                 "members_file": os.path.join(tmp, "members.json")}
+        library = Library("Stress", group_commit=64, compact_every=5000,
+                          thread_safe=thread_safe, **paths)
+        isbns = [f"{i:013d}" for i in range(num_books)]
+        for isbn in isbns:
+            library.add_book(f"Title {isbn}", "Author", isbn, "Test", copies=3)
+        member_ids = [library.add_member(f"Member {i}")["member_id"] for i in range(num_members)]
+
+        def worker(seed):
+            rng = random.Random(seed)
+            for _ in range(operations // num_threads):
+                member_id, isbn = rng.choice(member_ids), rng.choice(isbns)
+                if rng.random() < 0.5:
+                    library.borrow_book(member_id, isbn)
+                else:
+                    library.return_book(member_id, isbn)
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        library.close()
+        sys.setswitchinterval(old_interval)
+
+        problems = check_loan_invariants(library)
+        reloaded = Library("Stress", **paths)  # The journal must replay to the same state
+        problems += check_loan_invariants(reloaded)
+        if {isbn: book.available_copies for isbn, book in reloaded.books.items()} != \
+                {isbn: book.available_copies for isbn, book in library.books.items()}:
+            problems.append("journal replay does not match the in-memory state")
+        reloaded.close()
+
+    mode = "thread-safe" if thread_safe else "unsynchronized"
+    print(f"\nStress test ({mode}, {num_threads} threads, {operations} operations, {elapsed:.2f}s)")
+    if problems:
+        print(f"FAILED: {len(problems)} problems, e.g. {problems[0]}")
+    else:
+        print("PASSED: no copies lost or double-lent")
+    return not problems
+
+def check_journal_replay(operations=2000):
+    """Replay the journal over a compaction a crash cut short, and check return records stay small"""
+    problems = []
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"journal_path": os.path.join(tmp, "library.journal"),
+                 "books_file": os.path.join(tmp, "books.json"),
+                 "members_file": os.path.join(tmp, "members.json")}
+        library = Library("Replay check", compact_every=10**9, **paths)
+        isbns = [f"{i:013d}" for i in range(20)]
+        for isbn in isbns:
+            library.add_book(f"Title {isbn}", "Author", isbn, "Test", copies=2)
+        member_ids = library.add_members([f"Member {i}" for i in range(30)])["member_ids"]
+        
+        def churn():
+            for _ in range(operations):
+                member_id, isbn = rng.choice(member_ids), rng.choice(isbns)
+                roll = rng.random()
+                if roll < 0.4:
+                    library.borrow_book(member_id, isbn)
+                elif roll < 0.8:
+                    library.return_book(member_id, isbn)
+                elif roll < 0.9:
+                    library.rate_book(isbn, rng.randint(1, 5))
+                elif roll < 0.95:
+                    library.pay_fine(member_id, library.members[member_id].fines)
+                else:
+                    library.accrue_fines(datetime.now() + timedelta(days=rng.randint(15, 40)))
+        
+        def state(lib):
+            return ({isbn: book.to_dict() for isbn, book in lib.books.items()},
+                    {id_: member.to_dict() for id_, member in lib.members.items()})
+        
+        churn()
+        library.save_data()
+        with open(paths["members_file"], "rb") as f:
+            stale_members = f.read()
+        churn()
+        with open(paths["journal_path"], "rb") as f:
+            journal = f.read()
+        library.save_data()
+        expected = state(library)
+        library.close()
+        
+        # Crash after books.json was replaced but before members.json was and the old journal removed
+        with open(paths["members_file"], "wb") as f:
+            f.write(stale_members)
+        with open(paths["journal_path"] + ".old", "wb") as f:
+            f.write(journal)
+        reloaded = Library("Replay check", **paths)
+        if state(reloaded) != expected:
+            problems.append("replaying over a half-written snapshot does not give the saved state")
+        reloaded.close()
+        
+        returns = [line for line in journal.splitlines() if b'"op":"return"' in line]
+        if not returns or max(map(len, returns)) > 200:
+            problems.append(f"return records up to {max(map(len, returns), default=0)} bytes")
+    
+    print("\nJournal replay check")
+    if problems:
+        print(f"FAILED: {len(problems)} problems, e.g. {problems[0]}")
+    else:
+        print("PASSED: each snapshot replays only the records it lacks")
+    return not problems
+
+def check_sqlite_migration():
+    """Migrate a JSON library with loans and history twice, then check the SQLite copy holds each row once"""
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"journal_path": os.path.join(tmp, "library.journal"),
+                 "books_file": os.path.join(tmp, "books.json"),
+                 "members_file": os.path.join(tmp, "members.json")}
+        library = Library("Migration check", **paths)
+        library.add_book("Dune", "Frank Herbert", "9780441013593", "Fiction", copies=2)
+        member_id = library.add_member("Reader")["member_id"]
+        library.borrow_book(member_id, "9780441013593")
+        library.return_book(member_id, "9780441013593")
+        library.borrow_book(member_id, "9780441013593")
+        library.close()
+        
+        db_path = os.path.join(tmp, "library.db")
+        first = migrate_json_to_sqlite(db_path, **paths)
+        second = migrate_json_to_sqlite(db_path, **paths)
+        if first["status"] != "success":
+            problems.append(f"first migration failed: {first['message']}")
+        if second["status"] != "error":
+            problems.append("second migration into a non-empty database was not refused")
+        
+        target = SQLiteLibrary("Migration check", db_path)
+        counts = {table: target.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("books", "members", "loans", "history")}
+        if counts != {"books": 1, "members": 1, "loans": 1, "history": 1}:
+            problems.append(f"rows after migrating twice: {counts}")
+        if not target.search_books("Dune"):
+            problems.append("migrated book is missing from the full-text index")
+        try:
+            target.save_data()
+        except sqlite3.Error as error:
+            problems.append(f"save_data() on SQLite: {error}")
+        target.close()
+    
+    print("\nSQLite migration check")
+    if problems:
+        print(f"FAILED: {len(problems)} problems, e.g. {problems[0]}")
+    else:
+        print("PASSED: migrating twice copies every row once")
+    return not problems
+
+def run_benchmarks():
+    """Run all library benchmarks"""
+    benchmark_search()
+    benchmark_overdue()
+    benchmark_memory()
+    benchmark_import()
+
+def main(backend="json"):
+    library = open_library("Community Library", backend)
     
     while True:
         print("\n=== Library Management System ===")
@@ -265,9 +2215,12 @@ def main():
         print("5. Search Books")
         print("6. Member Details")
         print("7. Pay Fine")
-        print("8. Exit")
+        print("8. Book Recommendations")
+        print("9. Rate a Book")
+        print("10. Top Rated Books")
+        print("11. Exit")
         
-        choice = input("\nEnter your choice (1-8): ")
+        choice = input("\nEnter your choice (1-11): ")
         
         if choice == "1":
             title = input("Enter book title: ")
@@ -303,6 +2256,10 @@ def main():
             query = input("Enter search term: ")
             search_by = input("Search by (title/author/category): ")
             results = library.search_books(query, search_by)
+            if not results:
+                results = library.search_books(query, search_by, limit=5, match="fuzzy")
+                if results:
+                    print("\nNo exact matches. Did you mean:")
             
             if results:
                 print("\nSearch Results:")
@@ -355,6 +2312,42 @@ def main():
                     print("No fine to pay!")
         
         elif choice == "8":
+            isbn = input("Enter a book ISBN (press Enter to use a member's history): ")
+            if isbn:
+                result = library.recommend_books(isbn=isbn)
+            else:
+                result = library.recommend_books(member_id=input("Enter member ID: "))
+            
+            if result['status'] == 'success' and result['recommendations']:
+                print("\nYou might also like:")
+                for book in result['recommendations']:
+                    print(f"- {book['title']} (ISBN: {book['isbn']})")
+            elif result['status'] == 'success':
+                print("\nNot enough borrowing history for recommendations yet.")
+            else:
+                print(f"\n{result['message']}")
+        
+        elif choice == "9":
+            isbn = input("Enter book ISBN: ")
+            try:
+                result = library.rate_book(isbn, int(input("Enter rating (1-5 stars): ")))
+                print(f"\n{result['message']}")
+            except ValueError:
+                print("Please enter a number from 1 to 5!")
+        
+        elif choice == "10":
+            category = input("Enter category (press Enter for all books): ") or None
+            books = library.top_rated(category)
+            if books:
+                print("\nTop Rated Books:")
+                for rank, book in enumerate(books, 1):
+                    print(f"{rank}. {book['title']} by {book['author']} - "
+                          f"{book['average']:.1f} stars ({book['count']} ratings)")
+            else:
+                print("\nNo rated books yet.")
+        
+        elif choice == "11":
+            library.close()
             print("Thank you for using the Library Management System!")
             break
         
@@ -362,4 +2355,20 @@ def main():
             print("Invalid choice! Please try again.")
 
 if __name__ == "__main__":
-    main()
+    if "--benchmark" in sys.argv:
+        run_benchmarks()
+    elif "--stress-test" in sys.argv:
+        sys.exit(0 if stress_test_concurrency() else 1)
+    elif "--check" in sys.argv:
+        sys.exit(0 if all([check_journal_replay(), check_sqlite_migration()]) else 1)
+    elif "--migrate" in sys.argv:
+        print(migrate_json_to_sqlite()["message"])
+    elif "--import" in sys.argv:
+        library = open_library("Community Library", "sqlite" if "--sqlite" in sys.argv else "json")
+        result = library.import_catalog(sys.argv[sys.argv.index("--import") + 1], progress=print)
+        library.close()
+        print(result["message"])
+        for error in result.get("errors", [])[:20]:
+            print(f"  {error}")
+    else:
+        main("sqlite" if "--sqlite" in sys.argv else "json")
@@ -0,0 +1,291 @@
+# Fixed-point Money in Integer Cents
+
+# Features:
+# 1. Exact integer-cent arithmetic (no float drift)
+# 2. Parsing from int, float, str and Decimal
+# 3. Banker's rounding (round half to even) for rates and interest
+# 4. Bulk rate application over array("q") columns of cents
+# 5. Benchmark against float and Decimal
+# 6. Amounts limited to what an array("q") column of cents holds
+
+import math
+import operator
+import sys
+import time
+from array import array
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+from fractions import Fraction
+from numbers import Real
+
+MIN_CENTS = -2 ** 63     # Range of an array("q") column of cents
+MAX_CENTS = 2 ** 63 - 1
+
+def to_cents(amount):
+    """Whole cents in an amount of dollars, rounding half to even (ValueError if invalid or out of range)"""
+    if isinstance(amount, Money):
+        cents = amount.cents
+    elif isinstance(amount, int):
+        cents = amount * 100
+    elif isinstance(amount, float):
+        if not math.isfinite(amount):
+            raise ValueError(f"Invalid amount: {amount}")
+        cents = amount * 100
+        nearest = round(cents)
+        # At most two decimals is the usual case, and needs no Decimal
+        cents = nearest if abs(cents - nearest) <= 1e-6 else _decimal_cents(repr(amount))
+    else:
+        cents = _decimal_cents(amount)
+    if not MIN_CENTS <= cents <= MAX_CENTS:
+        raise ValueError(f"Amount out of range: {amount!r}")
+    return cents
+
+def _decimal_cents(amount):
+    try:
+        return int((Decimal(amount) * 100).to_integral_value(rounding=ROUND_HALF_EVEN))
+    except (InvalidOperation, ValueError, TypeError):
+        raise ValueError(f"Invalid amount: {amount!r}") from None
+
+def div_half_even(numerator, denominator):
+    """numerator / denominator rounded half to even, in integers (denominator > 0)"""
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+def exact_rate(rate):
+    """A rate as an exact Fraction (floats are read as the decimal they print as)"""
+    if isinstance(rate, Fraction):
+        return rate
+    if isinstance(rate, float):
+        return Fraction(repr(rate))
+    return Fraction(rate)
+
+def apply_rate(cents, rate):
+    """cents * rate, rounded half to even to whole cents"""
+    rate = exact_rate(rate)
+    return div_half_even(cents * rate.numerator, rate.denominator)
+
+def apply_rate_all(cents, rate):
+    """apply_rate over a whole column of cents, returned as array("q")"""
+    rate = exact_rate(rate)
+    numerator, denominator = rate.numerator, rate.denominator
+    half = denominator // 2
+    if denominator % 2:
+        # No exact halves possible, so plain round-half-up is already half-even
+        return array("q", [(c * numerator + half) // denominator for c in cents])
+    return array("q", [div_half_even(c * numerator, denominator) for c in cents])
+
+class Money:
+    """An amount of money stored as an integer number of cents"""
+    __slots__ = ("cents",)
+
+    def __init__(self, amount=0):
+        self.cents = to_cents(amount)
+
+    @classmethod
+    def from_cents(cls, cents):
+        """Money for a whole number of cents"""
+        money = cls.__new__(cls)
+        money.cents = cents
+        return money
+
+    def __add__(self, other):
+        cents = other.cents if type(other) is Money else to_cents(other)
+        return Money.from_cents(self.cents + cents)
+
+    __radd__ = __add__  # Lets sum() start from 0
+
+    def __sub__(self, other):
+        cents = other.cents if type(other) is Money else to_cents(other)
+        return Money.from_cents(self.cents - cents)
+
+    def __rsub__(self, other):
+        return Money.from_cents(to_cents(other) - self.cents)
+
+    def __mul__(self, factor):
+        if isinstance(factor, int):
+            return Money.from_cents(self.cents * factor)
+        return Money.from_cents(apply_rate(self.cents, factor))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor):
+        """Money / number: Money rounded half to even to the cent; Money / Money: their exact ratio"""
+        if type(divisor) is Money:
+            return Fraction(self.cents, divisor.cents)
+        return Money.from_cents(apply_rate(self.cents, 1 / exact_rate(divisor)))
+
+    def __floordiv__(self, divisor):
+        """Money // number: Money rounded down to the cent; Money // Money: how many whole times it fits"""
+        if type(divisor) is Money:
+            return self.cents // divisor.cents
+        rate = 1 / exact_rate(divisor)
+        return Money.from_cents(self.cents * rate.numerator // rate.denominator)
+
+    def __round__(self, ndigits=None):
+        """round(money): whole dollars as an int; round(money, n): Money to n decimals; both half to even"""
+        if ndigits is None:
+            return div_half_even(self.cents, 100)
+        if ndigits >= 2:
+            return self
+        step = 10 ** (2 - ndigits)
+        return Money.from_cents(div_half_even(self.cents, step) * step)
+
+    def __neg__(self):
+        return Money.from_cents(-self.cents)
+
+    def __abs__(self):
+        return Money.from_cents(abs(self.cents))
+
+    def __bool__(self):
+        return self.cents != 0
+
+    def _compare(self, other, op):
+        """op(self, other), exact: against Money or any real number, without rounding it to cents"""
+        if type(other) is Money:
+            return op(self.cents, other.cents)
+        if isinstance(other, (Real, Decimal)):
+            return op(Fraction(self.cents, 100), other)
+        return NotImplemented
+
+    def __eq__(self, other):
+        return self._compare(other, operator.eq)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    def __hash__(self):
+        return hash(Fraction(self.cents, 100))  # The hash of the number it equals, whatever its type
+
+    def __float__(self):
+        return self.cents / 100
+
+    def __format__(self, spec):
+        # Any whole number of cents below 2**53 formats back exactly at two decimals
+        return format(self.cents / 100, spec or ".2f")
+
+    def __str__(self):
+        return format(self, ".2f")
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+def benchmark_money(operations=1_000_000):
+    """Deposits of $0.10 plus monthly interest: float, Decimal and integer-cent Money"""
+    print(f"\nMoney benchmark ({operations} deposits of 0.10, then 12 months of 2.5% interest)")
+    monthly = 2.5 / 100 / 12
+
+    start = time.perf_counter()
+    balance = 0.0
+    for _ in range(operations):
+        balance += 0.10
+    for _ in range(12):
+        balance += balance * monthly
+    float_time = time.perf_counter() - start
+    float_balance = balance
+
+    start = time.perf_counter()
+    balance = Decimal("0.00")
+    step = Decimal("0.10")
+    decimal_monthly = Decimal("2.5") / 100 / 12
+    for _ in range(operations):
+        balance += step
+    for _ in range(12):
+        balance += (balance * decimal_monthly).quantize(Decimal("0.01"), rounding=ROUND_HALF_EVEN)
+    decimal_time = time.perf_counter() - start
+    decimal_balance = balance
+
+    start = time.perf_counter()
+    cents = 0
+    step = to_cents(0.10)
+    for _ in range(operations):
+        cents += step
+    for _ in range(12):
+        cents += apply_rate(cents, Fraction(25, 12000))
+    money_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    balance = Money(0)
+    step = Money("0.10")
+    for _ in range(operations):
+        balance += step
+    object_time = time.perf_counter() - start
+
+    accounts = array("q", range(0, operations * 10, 10))
+    start = time.perf_counter()
+    apply_rate_all(accounts, Fraction(25, 12000))
+    bulk_time = time.perf_counter() - start
+
+    exact = Money.from_cents(cents)
+    print(f"float:          {float_time:6.3f}s  balance {float_balance!r} (drift {float_balance - float(exact):+.2e})")
+    print(f"Decimal:        {decimal_time:6.3f}s  balance {decimal_balance}")
+    print(f"integer cents:  {money_time:6.3f}s  balance {exact}")
+    print(f"Money objects:  {object_time:6.3f}s  (deposits only)")
+    print(f"apply_rate_all: {bulk_time:6.3f}s  for {operations} balances")
+
+def check_money():
+    """Return a list of problems with parsing, range limits, division, rounding and comparisons"""
+    problems = []
+    for amount in (10 ** 17, "1e30", float(2 ** 70), -(10 ** 17), "nan", "ten"):
+        try:
+            to_cents(amount)
+            problems.append(f"to_cents accepted {amount!r}")
+        except ValueError:
+            pass
+    if to_cents(MAX_CENTS // 100) != MAX_CENTS // 100 * 100:
+        problems.append("to_cents refused the largest whole-dollar amount in range")
+    expected = [
+        (Money("10.00") / 3, Money("3.33")), (Money("0.05") / 2, Money("0.02")), (Money("0.15") / 2, Money("0.08")),
+        (Money("-0.05") / 2, Money("-0.02")), (Money("10.00") / Money("4.00"), Fraction(5, 2)),
+        (Money("10.00") // 3, Money("3.33")), (Money("-10.00") // 3, Money("-3.34")),
+        (Money("10.00") // Money("3.00"), 3), (round(Money("2.50")), 2), (round(Money("3.50")), 4),
+        (round(Money("-2.50")), -2), (round(Money("12.25"), 1), Money("12.20")), (round(Money("12.35"), 1), Money("12.40")),
+        (round(Money("150.00"), -2), Money("200.00")), (round(Money("1.23"), 2), Money("1.23")),
+    ]
+    for position, (got, want) in enumerate(expected):
+        if got != want or type(got) is not type(want):
+            problems.append(f"case {position}: got {got!r}, expected {want!r}")
+    try:
+        Money(1) / 0
+        problems.append("Money / 0 did not raise")
+    except ZeroDivisionError:
+        pass
+    
+    comparisons = [
+        (Money("1.00") == 1.004, False), (Money("1.00") == 1, True), (Money("0.10") == 0.1, False),
+        (Money("0.10") == Fraction(1, 10), True), (Money("0.10") == Decimal("0.1"), True),
+        (Money("0.50") == 0.5, True), (Money("1.00") < 1.004, True), (Money("1.00") > 0.999, True),
+        (Money("1.00") == "1.00", False), (Money(1) < float("inf"), True), (Money(1) == float("nan"), False),
+    ]
+    for position, (got, want) in enumerate(comparisons):
+        if got is not want:
+            problems.append(f"comparison {position}: got {got}, expected {want}")
+    for money, number in ((Money(1), 1), (Money("0.50"), 0.5), (Money("0.10"), Fraction(1, 10)),
+                          (Money("0.10"), Decimal("0.1")), (Money("0.10"), 0.1)):
+        if (money == number) != ({money: True}.get(number) is True):
+            problems.append(f"hash and == disagree for {money!r} and {number!r}")
+    try:
+        Money(1) < "2"
+        problems.append("Money < str did not raise TypeError")
+    except TypeError:
+        pass
+    return problems
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_money()
+    elif "--check" in sys.argv:
+        problems = check_money()
+        print(f"FAILED: {len(problems)} problems, e.g. {problems[0]}" if problems else "PASSED: all money checks")
+        sys.exit(1 if problems else 0)
+    else:
+        print(Money("19.99") + 0.01, Money(100) * Fraction(25, 12000), sum([Money("0.10")] * 10))
@@ -0,0 +1,81 @@
+# Checksummed State Files without Pickle
+
+# Features:
+# 1. Plain data (dicts, lists, strings, numbers) as JSON, bytes values as raw blobs after it
+# 2. Magic/version header and CRC32 over the whole payload
+# 3. Nothing executable: loading a file can only build plain data
+# 4. Benchmark against pickle
+
+import json
+import pickle
+import struct
+import sys
+import time
+import zlib
+
+HEADER = struct.Struct("<8sIQ")  # Magic, CRC32 of the payload, length of the JSON part
+BYTES_KEY = "$bytes"             # {"$bytes": [start, length]} stands for a blob
+
+def dump_state(state, magic):
+    """File contents for state, which may hold bytes anywhere (dict keys must be strings)"""
+    blobs = []
+    offset = 0
+
+    def encode(value):
+        nonlocal offset
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            blobs.append(value)
+            start, offset = offset, offset + len(value)
+            return {BYTES_KEY: [start, len(value)]}
+        if isinstance(value, dict):
+            return {key: encode(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [encode(item) for item in value]
+        return value
+
+    text = json.dumps(encode(state), separators=(",", ":")).encode("utf-8")
+    payload = b"".join([text, *blobs])
+    return HEADER.pack(magic, zlib.crc32(payload), len(text)) + payload
+
+def load_state(data, magic):
+    """State from dump_state() output; ValueError if the magic, length or checksum do not match"""
+    if len(data) < HEADER.size:
+        raise ValueError("State file is truncated")
+    found, crc, length = HEADER.unpack_from(data)
+    payload = memoryview(data)[HEADER.size:]
+    if found != magic or length > len(payload) or zlib.crc32(payload) != crc:
+        raise ValueError(f"Not a valid {magic.decode('ascii', 'replace')} state file")
+    blobs = payload[length:]
+
+    def decode(value):
+        if isinstance(value, dict) and BYTES_KEY in value:
+            start, size = value[BYTES_KEY]
+            return bytes(blobs[start:start + size])
+        return value
+
+    return json.loads(bytes(payload[:length]), object_hook=decode)
+
+def benchmark_state(columns=1000, rows=2000):
+    """Write and read time for many array columns: dump_state/load_state against pickle"""
+    from array import array
+    state = {"seq": 1, "items": [{"name": f"item {i}", "column": array("q", range(rows)).tobytes()}
+                                 for i in range(columns)]}
+    print(f"\nState file benchmark ({columns} columns of {rows} int64 values)")
+    for name, dump, load in (("pickle", pickle.dumps, pickle.loads),
+                             ("dump_state", lambda s: dump_state(s, b"BENCHST1"),
+                              lambda d: load_state(d, b"BENCHST1"))):
+        start = time.perf_counter()
+        data = dump(state)
+        written = time.perf_counter() - start
+        start = time.perf_counter()
+        same = load(data) == state
+        read = time.perf_counter() - start
+        print(f"{name:<11} write {written * 1000:7.1f} ms  read {read * 1000:7.1f} ms  "
+              f"{len(data) / 2**20:6.1f} MB  ({'round-trips' if same else 'MISMATCH'})")
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        benchmark_state()
+    else:
+        data = dump_state({"name": "demo", "column": b"\x00\x01\x02"}, b"DEMOSTT1")
+        print(len(data), "bytes:", load_state(data, b"DEMOSTT1"))
@@ -1,12 +1,20 @@
 # To-Do List Application
 
+import re
+
 class TodoList:
     def __init__(self):
-        self.tasks = []
+        # Task ID -> task. IDs are never reused, and the dict keeps insertion (display) order,
+        # so looking up, completing and removing a task are O(1) and no other task's ID changes
+        self.tasks = {}
+        self.next_id = 1
     
     def add_task(self, task):
-        self.tasks.append({"task": task, "completed": False})
-        print(f"Task '{task}' added successfully!")
+        task_id = self.next_id
+        self.next_id += 1
+        self.tasks[task_id] = {"task": task, "completed": False}
+        print(f"Task '{task}' added successfully! (ID {task_id})")
+        return task_id
     
     def view_tasks(self):
         if not self.tasks:
@@ -14,23 +22,45 @@ class TodoList:
             return
         
         print("\nYour To-Do List:")
-        for i, task in enumerate(self.tasks, 1):
+        for task_id, task in self.tasks.items():
             status = "✓" if task["completed"] else " "
-            print(f"{i}. [{status}] {task['task']}")
+            print(f"{task_id}. [{status}] {task['task']}")
     
-    def mark_completed(self, task_index):
-        if 1 <= task_index <= len(self.tasks):
-            self.tasks[task_index-1]["completed"] = True
-            print(f"Task '{self.tasks[task_index-1]['task']}' marked as completed!")
+    def mark_completed(self, task_id):
+        task = self.tasks.get(task_id)
+        if task is not None:
+            task["completed"] = True
+            print(f"Task '{task['task']}' marked as completed!")
         else:
-            print("Invalid task number!")
+            print("Invalid task ID!")
+    
+    def mark_tasks_completed(self, task_ids):
+        completed = 0
+        for task_id in task_ids:
+            task = self.tasks.get(task_id)
+            if task is not None and not task["completed"]:
+                task["completed"] = True
+                completed += 1
+        print(f"{completed} tasks marked as completed!")
+        return completed
     
-    def remove_task(self, task_index):
-        if 1 <= task_index <= len(self.tasks):
-            removed_task = self.tasks.pop(task_index-1)
+    def remove_task(self, task_id):
+        removed_task = self.tasks.pop(task_id, None)
+        if removed_task is not None:
             print(f"Task '{removed_task['task']}' removed successfully!")
         else:
-            print("Invalid task number!")
+            print("Invalid task ID!")
+    
+    def remove_tasks(self, task_ids):
+        removed = sum(self.tasks.pop(task_id, None) is not None for task_id in task_ids)
+        print(f"{removed} tasks removed!")
+        return removed
+
+def read_ids(prompt):
+    try:
+        return [int(task_id) for task_id in re.split(r"[\s,]+", input(prompt).strip()) if task_id]
+    except ValueError:
+        return None
 
 def main():
     todo_list = TodoList()
@@ -39,8 +69,8 @@ def main():
         print("\n=== To-Do List Manager ===")
         print("1. Add Task")
         print("2. View Tasks")
-        print("3. Mark Task as Completed")
-        print("4. Remove Task")
+        print("3. Mark Tasks as Completed")
+        print("4. Remove Tasks")
         print("5. Exit")
         
         choice = input("\nEnter your choice (1-5): ")
@@ -54,19 +84,23 @@ def main():
         
         elif choice == "3":
             todo_list.view_tasks()
-            task_num = input("\nEnter task number to mark as completed: ")
-            try:
-                todo_list.mark_completed(int(task_num))
-            except ValueError:
-                print("Please enter a valid number!")
+            task_ids = read_ids("\nEnter task IDs to mark as completed (separated by spaces or commas): ")
+            if task_ids is None:
+                print("Please enter valid IDs!")
+            elif len(task_ids) == 1:
+                todo_list.mark_completed(task_ids[0])
+            elif task_ids:
+                todo_list.mark_tasks_completed(task_ids)
         
         elif choice == "4":
             todo_list.view_tasks()
-            task_num = input("\nEnter task number to remove: ")
-            try:
-                todo_list.remove_task(int(task_num))
-            except ValueError:
-                print("Please enter a valid number!")
+            task_ids = read_ids("\nEnter task IDs to remove (separated by spaces or commas): ")
+            if task_ids is None:
+                print("Please enter valid IDs!")
+            elif len(task_ids) == 1:
+                todo_list.remove_task(task_ids[0])
+            elif task_ids:
+                todo_list.remove_tasks(task_ids)
         
         elif choice == "5":
             print("Thank you for using To-Do List Manager!")